@@ -17,15 +17,26 @@ import TheiaMCR.errList as err
 import logging
 from os import path
 import TheiaMCR.rotatingLogFiles as rotLogFiles
+from TheiaMCR.comWorker import comWorker
+from TheiaMCR.comMetrics import comMetrics
+from TheiaMCR.positionJournal import positionJournal
+from TheiaMCR.moveTimeModel import moveTimeModel
+from TheiaMCR.motionTelemetry import motionTelemetry
+from TheiaMCR.mcrProtocol import (motorFrames, frameParser, hexFrame, moveFrame, parseSetup, pathFrame, responseID, 
+    MCR_NO_RESPONSE, MCR_IDEMPOTENT_COMMANDS, MCR_RELATIVE_MOVES, MCR_MOVE_COMMANDS, FW_REVISION_FRAME, BOARD_SN_FRAME, FAILED_RESPONSE)
+import functools
+import struct
 import sys
-from typing import overload
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, overload
 
 # create a logger instance for this module
 log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
 # internal constants used across the classes in this module.  
-MCR_REVISION = 'v.3.5.0'
+MCR_REVISION = 'v.3.6.0'
 
 RESPONSE_READ_TIME = 500                # (ms) max time for the MCR to post a response in the buffer
 MCR_FOCUS_MOTOR_ID = 0x01               # motor ID's as specified in the motor control documentation
@@ -43,6 +54,11 @@ MCR_IRC_SWITCH_TIME = 50              # (ms) switch time for IRC
 MCR_BACKLASH_OVERSHOOT = 60           # used to remove lens backlash, this should exceed lens maximum backlash amount
 MCR_HARDSTOP_TOLERANCE = 200          # additional move amount to be sure to pass home position from hard stop (works best to prevent motor reversing if >100 steps)
 MCR_MOVE_REST_TIME = 0.010            # (s) rest time between moves
+MCR_TRUSTED_STEP_BUDGET = 20000       # (steps) relative steps allowed in trusted position mode before moveAbs re-references at the PI
+MCR_TRUSTED_MOVE_BUDGET = 100         # relative moves allowed in trusted position mode before moveAbs re-references at the PI
+MCR_RETRY_ATTEMPTS = 3                # sends of an idempotent command without response (1: no retries)
+MCR_RETRY_BACKOFF = 0.05              # (s) wait before the first retry, doubled for each next retry
+MCR_RETRY_BACKOFF_MAX = 0.4           # (s) maximum wait before a retry
 
 ##### unhandled exception handlier ###############################
 def unhandledException(exc_type, exc_value, exc_traceback):
@@ -59,6 +75,62 @@ def unhandledException(exc_type, exc_value, exc_traceback):
         log.error("Unhandled exception occurred before MCRControl initialization:", exc_info=(exc_type, exc_value, exc_traceback))
 sys.excepthook = unhandledException
 
+##### command retries #############################################
+def commandAttempts(cmd:bytes, retryAttempts:int) -> int:
+    ''' number of sends of a command without response (only the idempotent commands are sent again) '''
+    return retryAttempts if cmd[0] in MCR_IDEMPOTENT_COMMANDS else 1
+
+def retryBackoff(attempt:int) -> float:
+    ''' (s) wait before the next send of a command after the attempt number (1: first send) had no response '''
+    return min(MCR_RETRY_BACKOFF * 2 ** (attempt - 1), MCR_RETRY_BACKOFF_MAX)
+
+##### raiseErrors mode ############################################
+def failedCode(result:int) -> bool:
+    ''' raisesErrors failOn: the function returned a negative error code '''
+    return result < 0
+
+def failedResult(result) -> bool:
+    ''' raisesErrors failOn: the function returned False or an empty result '''
+    return not result
+
+def failedSetup(result:tuple) -> bool:
+    ''' raisesErrors failOn: the motor setup tuple is not valid (first element False) '''
+    return not result[0]
+
+def raisesErrors(failOn:Callable[[Any], bool] | None=None, failCode:int=err.ERR_NO_COMMUNICATION):
+    '''
+    Decorator of the public board and motor functions for the MCRControl raiseErrors mode.  A failed call raises the 
+    errList exception of the error (e.g. errList.MCRMoveError) instead of returning the error.  The call failed if 
+    failOn(result) is True or if the calling thread saved an error in the board error recorder (MCRControl.errors) 
+    during the call.  Only the outer call raises (e.g. a failed home() inside focusInit() is raised by focusInit()).  
+    Without raiseErrors the function is called directly.  
+    ### input: 
+    - failOn: (optional, None: only the saved errors) function of the result that is True if the call failed 
+        (failedCode, failedResult, failedSetup)
+    - failCode: (optional, err_no_communication) error code raised if the call failed without saving an error
+    '''
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            board = getattr(self, 'parent', self)
+            if not board.raiseErrors or board.errors.inCall():
+                return func(self, *args, **kwargs)
+            board.errors.startCall()
+            try:
+                result = func(self, *args, **kwargs)
+            finally:
+                errors = board.errors.endCall()
+            failed = failOn is not None and failOn(result)
+            if failed or errors:
+                if failed and type(result) is int and result < 0:
+                    errNum = result
+                else:
+                    errNum = errors[0][0] if errors else failCode
+                raise err.exception(errNum, func.__qualname__, errors)
+            return result
+        return wrapper
+    return decorator
+
 ##### wrapper functions to check for initialization ##############
 class MCRInitFailed:
     '''
@@ -75,9 +147,15 @@ class MCRInitFailed:
     currentSpeed = 0
     homingSpeed = 0
     respectLimits = False
+    raiseErrors = False
+
+    def __init__(self, raiseErrors:bool=False):
+        self.raiseErrors = raiseErrors
 
     def __getattr__(self, name):
         def method(*args, **kwargs):
+            if self.raiseErrors:
+                raise err.MCRNotInitError(err.ERR_NOT_INIT, name)
             MCRControl.log.error(f'{name} cannot be executed because MCRBoard is not initialized.')
             err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine())
             return err.ERR_NOT_INIT
@@ -105,7 +183,7 @@ class MCRControl():
         return instance
 
     # MCRInit
-    def __init__(self, serialPortName:str, moduleDebugLevel:bool=False, communicationDebugLevel:bool=False, logFiles:bool=True):
+    def __init__(self, serialPortName:str, moduleDebugLevel:bool=False, communicationDebugLevel:bool=False, logFiles:bool=True, ioThread:bool=False, journal:bool|str=False, telemetry:bool|str=False, raiseErrors:bool=False, backgroundLog:bool=False):
         '''
         This class is used for interacting with the Theia MCR motor control boards. 
         Initialize the MCR board (this class) before any commands can be sent.  
@@ -115,12 +193,27 @@ class MCRControl():
 
         This is the top level class for all interactions with the MCR600 series boards
         ### input: 
-        - serialPortName: the serial port name of the board (e.g. "com21" or "/dev/ttyAMA0").   
+        - serialPortName: the serial port name of the board (e.g. "com21" or "/dev/ttyAMA0") or "mcrsim://<name>" for a simulated board (see mcrSimulator.py).   
         - moduleDebugLevel (optional boolean: False): Set true to set the level to DEBUG for the console stream instead of the default of INFO
         - communicationDebugLevel (optional boolean: False): Set true to print the serial port communication to the console (and all debug level logs).  This is not recommended for production use.  
         - logFiles (optional boolean: True): Set true to create log files for the MCR board.  The log files will be created in the user directory.  
+        - backgroundLog (optional boolean: False): Set true to write the log file records in a background writer thread (see rotatingLogFiles) 
+            so the commands don't wait for slow storage.  The queued records are written by close().  Otherwise each record is written when it is logged.  
+        - ioThread (optional boolean: False): Set true to use a dedicated serial port I/O thread for the board.  Commands from several threads 
+            are then sent back-to-back and their responses are matched as they arrive (e.g. read the board while a motor moves).  
+            Otherwise the commands from different threads are sent one at a time.  
+        - journal (optional boolean or folder: False): Set true (or to a folder name) to keep the motor positions in a position journal file 
+            for this board (see positionJournal.py).  Focus, zoom, and iris initialization with move=True then restore the last known 
+            step instead of homing if the last move was completed and the motor configuration is unchanged.  
+        - telemetry (optional boolean or folder: False): Set true (or to a folder name) to record every command (motor, opcode, target, 
+            speed, predicted and actual time, outcome) in daily binary telemetry files for this board (see motionTelemetry.py and 
+            telemetryAnalyzer.py).  
+        - raiseErrors (optional boolean: False): Set true to raise the errList exceptions (MCRError subclasses e.g. MCRMoveError, 
+            MCRCommError) when a board or motor function fails instead of returning the error code.  The successful calls return 
+            their normal values.  The errors are recorded in the error recorders but not logged a second time by errList.  
+            A failed board initialization raises the exception from this constructor.  
         ### Public functions: 
-        - __init__(self, com:str, moduleDebugLevel:bool=False, communicationDebugLevel:bool=False, logFiles:bool=True)
+        - __init__(self, com:str, moduleDebugLevel:bool=False, communicationDebugLevel:bool=False, logFiles:bool=True, ioThread:bool=False, journal:bool|str=False, telemetry:bool|str=False, raiseErrors:bool=False, backgroundLog:bool=False)
         - focusInit(self, steps:int, pi:int, move:bool=True, accel:int=0) -> bool
         - zoomInit(self, steps:int, pi:int, move:bool=True, accel:int=0) -> bool
         - irisInit(self, steps:int, move:bool=True) -> bool
@@ -133,6 +226,16 @@ class MCRControl():
         - boardInitialized: set to True with this instance of the class (this board) is initialized and com port is open
         - boardCommunicationState: set to True (in MCRCom._sendCmd()) when the board communication is successful
         - boardCommunicationRestarts: counts the number of times communication with the board has been restarted
+        - metrics: serial command metrics (comMetrics).  metrics.snapshot() returns a dictionary and metrics.prometheus() 
+            returns Prometheus text format.  
+        - journal: position journal (positionJournal) or None if the journal is not used
+        - telemetry: command telemetry stream (motionTelemetry) or None if telemetry is not recorded
+        - raiseErrors: errors are raised as errList exceptions (see raiseErrors input)
+        - retryAttempts: number of times an idempotent command (read FW/SN, read/write motor setup, 0x73 move) is sent if 
+            there is no response, with a backoff wait between the attempts (1: no retries).  A relative move (0x62, 0x66) without 
+            response is not sent again, the motor positionResync flag is set instead.  
+        - errors: errors of this board (errList.errorRecorder).  errors.errors has the last errors and errors.count(code) 
+            the number of errors of each code.  The errors are also recorded in errList.finalError.  
         ### Sub-classes: 
         - motor
         - controllerClass
@@ -141,18 +244,18 @@ class MCRControl():
         (c)2023-2025 Theia Technologies
         www.TheiaTech.com
         '''
-        self.focus: MCRControl.motor | MCRInitFailed = MCRInitFailed()
-        self.zoom: MCRControl.motor | MCRInitFailed = MCRInitFailed()
-        self.iris: MCRControl.motor | MCRInitFailed = MCRInitFailed()
-        self.IRC: MCRControl.motor | MCRInitFailed = MCRInitFailed()
-        self.MCRBoard: MCRControl.controllerClass | MCRInitFailed = MCRInitFailed()
+        self.focus: MCRControl.motor | MCRInitFailed = MCRInitFailed(raiseErrors)
+        self.zoom: MCRControl.motor | MCRInitFailed = MCRInitFailed(raiseErrors)
+        self.iris: MCRControl.motor | MCRInitFailed = MCRInitFailed(raiseErrors)
+        self.IRC: MCRControl.motor | MCRInitFailed = MCRInitFailed(raiseErrors)
+        self.MCRBoard: MCRControl.controllerClass | MCRInitFailed = MCRInitFailed(raiseErrors)
 
         # Check if THIS instance has been initialized already
         if hasattr(self, '_instanceInitialized') and self._instanceInitialized:
             # Instance was already initialized - check if it's for the same port
             if hasattr(self, 'serialPortName') and self.serialPortName == serialPortName:
                 # Same port, already initialized - nothing to do
-                MCRControl.log.debug(f'MCRControl already initialized for {serialPortName}')
+                MCRControl.log.debug('MCRControl already initialized for %s', serialPortName)
                 return
             # Different port - this shouldn't happen with singleton pattern, but handle it
             MCRControl.log.warning(f'Unexpected: Instance initialized for {self.serialPortName} but called with {serialPortName}')
@@ -165,15 +268,28 @@ class MCRControl():
         self.boardCommunicationRestarts = 0
         self.serialPort = None
         self.serialPortName = serialPortName
+        self.ioThread = ioThread
+        self.comWorker: comWorker | None = None
+        self._motionLock = threading.Lock()         # one motor move command (or move group) in flight per board
+        self.metrics = comMetrics({'port': serialPortName})
+        self.journal: positionJournal | None = None
+        self.telemetry: motionTelemetry | None = None
+        self.retryAttempts = MCR_RETRY_ATTEMPTS
+        self.errors = err.errorRecorder()
+        self.errors.logErrors = not raiseErrors
+        self.raiseErrors = raiseErrors
+        if raiseErrors:
+            self.errors.startCall()
         
         MCRControl.communicationDebugLevel = communicationDebugLevel
         if communicationDebugLevel: moduleDebugLevel = True
-        loggingInitSuccess = self._initLogging(moduleDebugLevel, logFiles, serialPortName) 
+        loggingInitSuccess = self._initLogging(moduleDebugLevel, logFiles, serialPortName, backgroundLog) 
 
         # open the com port
         self.com = self.MCRCom(parent=self, serialPortName=serialPortName)
         comInitSuccess = self.com.initialized
         self.serialPort = self.com.serialPort
+        self.comWorker = self.com.comWorker
 
         # set the initialized flag to allow readFWRevision to be called
         if comInitSuccess >= 0:
@@ -181,12 +297,16 @@ class MCRControl():
             self.MCRBoard = self.controllerClass(parent=self)
             # send a test command to the board to read FW version
             response = self.MCRBoard.readFWRevision()
-            if response == None or int(response.rsplit('.', -1)[0]) < 5:
+            if not response or int(response.rsplit('.', -1)[0]) < 5:
                 MCRControl.log.error("Error: No response received from MCR controller")
-                err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.errors)
                 comInitSuccess = err.ERR_NO_COMMUNICATION
             else:
                 self.boardCommunicationState = True
+                if journal:
+                    self._openJournal(None if journal is True else journal)
+                if telemetry:
+                    self._openTelemetry(None if telemetry is True else telemetry)
         self.boardInitialized = True if comInitSuccess >= 0 else False        # set initialization state
 
         # ultimate success
@@ -195,13 +315,18 @@ class MCRControl():
             self._instanceInitialized = True  # Mark instance as fully initialized
         else:
             MCRControl.log.error('MCRControl initialization failed')
-            err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine())
-            self.focus = MCRInitFailed()
-            self.zoom = MCRInitFailed()
-            self.iris = MCRInitFailed()
-            self.MCRBoard = MCRInitFailed()
+            err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), self.errors)
+            self.focus = MCRInitFailed(raiseErrors)
+            self.zoom = MCRInitFailed(raiseErrors)
+            self.iris = MCRInitFailed(raiseErrors)
+            self.MCRBoard = MCRInitFailed(raiseErrors)
             MCRControl.MCRInitialized = False
             self._instanceInitialized = False  # Mark initialization as failed
+            if raiseErrors:
+                errors = self.errors.endCall()
+                raise err.exception(errors[0][0], 'MCRControl', errors)
+        if raiseErrors:
+            self.errors.endCall()
 
     # Motor initialization
     @overload
@@ -209,6 +334,7 @@ class MCRControl():
     @overload
     def focusInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1) -> bool: ...
 
+    @raisesErrors(failedResult, err.ERR_NOT_INIT)
     def focusInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1, slowHome:bool | None=None) -> bool:  
         '''
         Initialize the parameters of the motor.  This must be called after the board is initialized.  
@@ -229,7 +355,7 @@ class MCRControl():
             MCRControl.log.warning(f'focusInit can\'t be called because board isn\'t initialized')
             return False
         
-        MCRControl.log.debug(f'_init,{MCR_FOCUS_MOTOR_ID}')
+        MCRControl.log.debug('_init,%s', MCR_FOCUS_MOTOR_ID)
         self.focus = self.motor(self, MCR_FOCUS_MOTOR_ID, steps, pi, move=move, accel=accel, homingSpeed=homingSpeed)
         return self.focus.initialized
 
@@ -238,6 +364,7 @@ class MCRControl():
     @overload
     def zoomInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1) -> bool: ...
 
+    @raisesErrors(failedResult, err.ERR_NOT_INIT)
     def zoomInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1, slowHome:bool | None=None) -> bool: 
         '''
         Initialize the parameters of the motor.  This must be called after the board is initialized.  
@@ -257,10 +384,11 @@ class MCRControl():
             MCRControl.log.warning(f'zoomInit can\'t be called because board isn\'t initialized')
             return False
         
-        MCRControl.log.debug(f'_init,{MCR_ZOOM_MOTOR_ID}')
+        MCRControl.log.debug('_init,%s', MCR_ZOOM_MOTOR_ID)
         self.zoom = self.motor(self, MCR_ZOOM_MOTOR_ID, steps, pi, move=move, accel=accel, homingSpeed=homingSpeed)
         return self.zoom.initialized
     
+    @raisesErrors(failedResult, err.ERR_NOT_INIT)
     def irisInit(self, steps:int, move:bool=True, homingSpeed:int=-1) -> bool:
         '''
         Initialize the parameters of the motor.  This must be called after the board is initialized.  
@@ -275,11 +403,12 @@ class MCRControl():
             MCRControl.log.warning(f'irisInit can\'t be called because board isn\'t initialized')
             return False
         
-        MCRControl.log.debug(f'_init,{MCR_IRIS_MOTOR_ID}')
+        MCRControl.log.debug('_init,%s', MCR_IRIS_MOTOR_ID)
         self.iris = self.motor(self, MCR_IRIS_MOTOR_ID, steps, pi=0, move=move, accel=0, homingSpeed=homingSpeed)
         return self.iris.initialized
 
     # IRCInit
+    @raisesErrors(failedResult, err.ERR_NOT_INIT)
     def IRCInit(self) -> bool:
         '''
         Initialize the parameters of the IRC motor.  
@@ -292,7 +421,7 @@ class MCRControl():
             MCRControl.log.warning(f'IRCInit can\'t be called because board isn\'t initialized')
             return False
         
-        MCRControl.log.debug(f'_init,{MCR_IRC_MOTOR_ID}')
+        MCRControl.log.debug('_init,%s', MCR_IRC_MOTOR_ID)
         self.IRC = self.motor(self, MCR_IRC_MOTOR_ID, pi=0, steps=1000, move=False)
         return self.IRC.initialized
     
@@ -313,19 +442,25 @@ class MCRControl():
         Close the MCR board and release the serial port and other resources.
         '''
         MCRControl.log.debug('_close (exit)')
-        if self.com.initialized:
+        if self.com.initialized >= 0:
+            if self.comWorker: self.comWorker.close()
+            self.comWorker = None
             if self.serialPort: self.serialPort.close()
             self.serialPort = None
-            self.com.initialized = False
+            self.com.initialized = err.ERR_NOT_INIT
 
         if self.MCRBoard: 
-            self.MCRBoard = MCRInitFailed()
+            self.MCRBoard = MCRInitFailed(self.raiseErrors)
         if self.focus: 
-            self.focus = MCRInitFailed()
+            self.focus = MCRInitFailed(self.raiseErrors)
         if self.zoom: 
-            self.zoom = MCRInitFailed()
+            self.zoom = MCRInitFailed(self.raiseErrors)
         if self.iris: 
-            self.iris = MCRInitFailed()
+            self.iris = MCRInitFailed(self.raiseErrors)
+
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
 
         if self.fileLogHandler:
             self.fileLogHandler.close()
@@ -341,9 +476,50 @@ class MCRControl():
         # Remove from instances cache if present
         if hasattr(self, 'serialPortName') and self.serialPortName in MCRControl._instances:
             del MCRControl._instances[self.serialPortName]
-            MCRControl.log.debug(f'Removed {self.serialPortName} from instances cache')
+            MCRControl.log.debug('Removed %s from instances cache', self.serialPortName)
+
+    # open the position journal
+    def _openJournal(self, directory:str | None=None) -> bool:
+        '''
+        Read the board serial number and open the position journal of the board.  
+        ### input: 
+        - directory: (optional, default journal folder) journal folder
+        ### return: 
+        [True if the journal is open]
+        '''
+        sn = self.MCRBoard.readBoardSN()
+        if sn == '':
+            MCRControl.log.warning('Position journal not used because the board serial number could not be read')
+            return False
+        try:
+            self.journal = positionJournal(sn, directory)
+        except OSError as e:
+            MCRControl.log.warning(f'Position journal not used ({e})')
+            return False
+        MCRControl.log.info(f'Position journal {self.journal.filename}')
+        return True
+
+    # open the telemetry stream
+    def _openTelemetry(self, directory:str | None=None) -> bool:
+        '''
+        Open the command telemetry stream of the board (files named by the board serial number or, if it can't be 
+        read, the serial port name).  
+        ### input: 
+        - directory: (optional, default telemetry folder) telemetry folder
+        ### return: 
+        [True if the telemetry stream is open]
+        '''
+        sn = self.MCRBoard.readBoardSN()
+        try:
+            self.telemetry = motionTelemetry(sn if sn != '' else self.serialPortName, directory)
+        except OSError as e:
+            MCRControl.log.warning(f'Telemetry not recorded ({e})')
+            return False
+        MCRControl.log.info(f'Telemetry folder {self.telemetry.directory}')
+        return True
 
     # check and reopen board communication via serial port
+    @raisesErrors(failedResult)
     def checkBoardCommunication(self) -> bool:
         '''
         Check the communication with the MCR board.  If the communication is not successful, 
@@ -353,16 +529,109 @@ class MCRControl():
         '''
         boardCommunication = self.com._verifyCommunication()
         return boardCommunication
+
+    # move several motors at the same time
+    @raisesErrors(failedCode)
+    def moveGroup(self, targets:dict) -> int:
+        '''
+        Move several motors to absolute step positions at the same time.  The move commands for all the motors are sent 
+        before waiting for the move responses so the total time is the longest single move instead of the sum of the moves.  
+        Each motor follows the same moves as motor.moveAbs (move away from the PI if needed, firmware 0x73 move, then 
+        additional steps past the PI if the limits are not respected).  When one motor's move is complete, its next move is sent
+        while the other motors are still moving.  
+        The move responses don't include the motor ID so each response is matched to the moving motor that is expected to 
+        finish first.  A lost or failed response can't be attributed to one motor: if any motor move failed, all the motors 
+        in the group are marked as not referenced to the PI (positionReferenced False, position journal entry removed) and 
+        must be re-synced (home or moveAbs).  
+        ### input: 
+        - targets: {motor: target step} (e.g. {MCR.focus: 6000, MCR.zoom: 1000, MCR.iris: 40})
+        ### return: 
+        [
+            OK = 0 | 
+            err_bad_move: if any motor move failed | 
+            err_range: if a target step is negative |  
+            err_not_supported: (function not supported by one of the motors) | 
+            err_not_init: (one of the motors is not initialized)
+        ]
+        '''
+        if MCRControl.log.isEnabledFor(logging.DEBUG):
+            MCRControl.log.debug('_moveGroup,%s', ",".join(f"{motor.motorID}:{step}" for motor, step in targets.items() if hasattr(motor, "motorID")))
+        if not self.boardInitialized: 
+            MCRControl.log.warning(f'moveGroup can\'t be called because board isn\'t initialized')
+            return err.ERR_NOT_INIT
+
+        # check the targets and build the move commands for each motor
+        moves = {}
+        finalSteps = {}
+        for motor, step in targets.items():
+            if not motor.initialized:
+                MCRControl.log.error('moveGroup cannot be executed because the motor is not initialized.')
+                err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), self.errors)
+                return err.ERR_NOT_INIT
+            if motor.motorID not in MCR_STEPPER_MOTORS_IDS: 
+                MCRControl.log.warning(f'"moveGroup" function not supported by motor {motor.motorID}')
+                return err.ERR_NOT_SUPPORTED
+            if step < 0:
+                MCRControl.log.warning("Warning: Target step cannot be negative")
+                return err.ERR_RANGE
+            step, additionalMoveSteps = motor._absTarget(step)
+            finalSteps[motor.motorID] = (motor, step)
+
+            # (command byte string, wait time (ms), expected move time (s)) for each move of this motor
+            speed = motor.currentSpeed
+            position = motor.currentStep
+            sequence = []
+            awaySteps = motor._awaySteps()
+            if awaySteps != 0:
+                cmd, n, waitTime = motor._moveCommand(awaySteps, speed)
+                sequence.append((moveFrame(cmd, motor.motorID, n, speed), waitTime, motor.moveModel.predict(n, speed) / 1000))
+                position += awaySteps
+            for cmd, n, waitTime in motor._moveToCommands(step, speed, position):
+                moveTime = motor.moveModel.predict(motor._moveToSteps(cmd, n, position), speed) / 1000
+                sequence.append((moveFrame(cmd, motor.motorID, n, speed), waitTime, moveTime))
+            if additionalMoveSteps != 0:
+                cmd, n, waitTime = motor._moveCommand(additionalMoveSteps, speed)
+                sequence.append((moveFrame(cmd, motor.motorID, n, speed), waitTime, motor.moveModel.predict(n, speed) / 1000))
+            moves[motor.motorID] = sequence
+
+        # move all motors
+        for motor, _ in finalSteps.values():
+            motor._journalMoving()
+        results = self.com._sendMoveGroup(moves)
+
+        # a failed response may belong to any motor of the group (see the move response matching)
+        groupSuccess = all(results.values())
+        retVal = err.ERR_OK
+        for motorID, (motor, step) in finalSteps.items():
+            motor._setReferenced(groupSuccess)
+            if not results[motorID]:
+                MCRControl.log.error(f"Error: motor 0x{motorID:02X} move command failed (timed out or bad response)")
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.errors)
+                retVal = err.ERR_BAD_MOVE
+                continue
+            if not groupSuccess:
+                MCRControl.log.warning(f'Motor 0x{motorID:02X} position needs a re-sync (home or moveAbs) after the failed group move')
+            motor.currentStep = step
+            MCRControl.log.debug('_finalStep,%s,,%s', motorID, motor.currentStep)
+            motor._savePosition()
+
+        if retVal != err.ERR_OK:
+            # check the board is still connected and communication is possible.  
+            MCRControl.log.warning('Rechecking MCR board communication...')
+            boardCommunication = self.com._verifyCommunication()
+            MCRControl.log.warning(f'...Communication with MCR board {"re-established" if boardCommunication else "failed"}')
+        return retVal
     
     ############ internal functions ##############################################################
     # set up logging 
-    def _initLogging(self, consoleLog:bool, fileLog:bool, serialPortName:str='') -> bool:
+    def _initLogging(self, consoleLog:bool, fileLog:bool, serialPortName:str='', background:bool=False) -> bool:
         '''
         Set up the console log and file logging as required. If the file log handler fails to initialize, logging will continue without file output.
         ### input:  
         - consoleLog: set true to see DEBUG level values in the console, otherwise it will be set to INFO level.  
         - fileLog: set true to save logs to a file. 
         - serialPortName: (optional: '') the serial port name for the log file
+        - background: (optional: False) write the log file records in a background writer thread
         ### return:
         - bool: True if logging setup was successful, False otherwise
         '''
@@ -377,7 +646,7 @@ class MCRControl():
                     nullHandlers = [h for h in MCRControl.log.handlers if isinstance(h, logging.NullHandler)]
                     for handler in nullHandlers:
                         MCRControl.log.removeHandler(handler)
-                    self.fileLogHandler = rotLogFiles.rotatingLogFiles(MCRControl.log, nameKey=serialPortName)
+                    self.fileLogHandler = rotLogFiles.rotatingLogFiles(MCRControl.log, nameKey=serialPortName, background=background)
                     MCRControl.log.info(f'Log file path {path.split(self.fileLogHandler.filenames[0])[0]}')
                 except Exception as e:
                     MCRControl.log.error(f'Failed to set up file logging: {e}')
@@ -434,10 +703,13 @@ class MCRControl():
             - home(self) -> int
             - moveAbs(self, step:int) -> int
             - moveRel(self, steps:int, correctForBL:bool=True) -> int
+            - predictMoveTime(self, step:int) -> float
             - state(self, state:int) -> int   (only applicable to IRC)
             - setMotorSpeed(self, speed) -> int
             - setRespectLimits(self, state:bool)
-            - readMotorSetup(self) -> Tuple[bool, int, bool, bool, int, int, int, int]
+            - setTrustedPosition(self, state:bool, stepBudget:int=MCR_TRUSTED_STEP_BUDGET, moveBudget:int=MCR_TRUSTED_MOVE_BUDGET) -> int
+            - readMotorSetup(self, refresh:bool=False) -> Tuple[bool, int, bool, bool, int, int, int, int]
+            - invalidateMotorSetup(self)
             - writeMotorSetup(self, useWideFarStop:bool, useTeleNearStop:bool, maxSteps:int, minSpeed:int, maxSpeed:int) -> bool
             ### input: 
             - motorID: byte value for the motor (0x01 ~ 0x04).  See the motor control documentation.  
@@ -447,7 +719,7 @@ class MCRControl():
                 - 0x04: IRC (DC motor)
             - steps: maximum number of steps
             - pi: pi location in step number
-            - move: (optional, True) move motor to home position after initializing
+            - move: (optional, True) move motor to home position after initializing (or restore the position journal step, see MCRControl journal)
             - accel: (optional, 0) motor acceleration steps.  Check the documentation to see if acceleration is supported in the firmware.  
             - homingSpeed: (optional, -1) speed to use when homing the motor (will be set to default speed if out of range)
             ### instance variables
@@ -458,6 +730,11 @@ class MCRControl():
             - PIStep (step position of the photo interrupter limit switch)
             - maxSteps
             - respectLimits (set True to prevent motor from exceeding limits)
+            - trustedPosition (set with setTrustedPosition to use relative moves for moveAbs)
+            - positionReferenced (True after the motor is referenced at the PI by home or moveAbs)
+            - positionResync (True after a relative move without response: the motor may or may not have moved.  Cleared by home or moveAbs)
+            - stepsSinceHome, movesSinceHome (relative steps and moves since the PI reference)
+            - moveModel (move time model used for the move command wait times, see moveTimeModel)
             ### low level and beta variables
             - acceleration (motor acceleration steps, currently not implemented in hardware)
             ### Private functions:
@@ -465,11 +742,59 @@ class MCRControl():
             '''
             self.parent = parent
             self.com = parent.MCRCom(parent)
+            speedRange = self._initParameters(motorID, steps, pi, accel, homingSpeed)
+
+            # initialize the motor control board instance for sending the commands
+            self.MCRBoard = MCRControl.controllerClass(parent=self.parent)
+            # check the position journal against the board motor configuration before it is initialized
+            journalEntry = None
+            if move and self.parent.journal is not None and motorID in MCR_STEPPER_MOTORS_IDS:
+                journalEntry = self._journalEntry()
+            success = self._motorInit(pi=self.PIStep, steps=self.maxSteps, speedRange=speedRange)
+            if not success:
+                MCRControl.log.error('Motor not initialized')
+                err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), self.parent.errors)
+            else:
+                error = err.ERR_OK
+            self.initialized = success
+
+            # move the motor to the home position (PI limit switch) or restore the journal position
+            if move and motorID != MCR_IRC_MOTOR_ID:
+                if success and journalEntry is not None:
+                    self._restorePosition(journalEntry)
+                else:
+                    error = self.home()
+                    if error != 0:
+                        err.saveError(error, err.MOD_MCR, err.errLine(), self.parent.errors)
+
+        # set the motor parameters
+        def _initParameters(self, motorID:int, steps:int, pi:int, accel:int=0, homingSpeed:int=-1) -> int:
+            '''
+            Set the motor instance variables (no communication with the board).  
+            ### input: 
+            - see __init__
+            ### return: 
+            [speed range for _motorInit]
+            '''
             self.motorID = motorID
             self.PIStep = pi
             self.currentStep = 0
             self.maxSteps = steps
             self.respectLimits = True
+            # trusted position mode (see setTrustedPosition)
+            self.trustedPosition = False
+            self.trustedStepBudget = MCR_TRUSTED_STEP_BUDGET
+            self.trustedMoveBudget = MCR_TRUSTED_MOVE_BUDGET
+            self.positionReferenced = False
+            self.positionResync = False
+            self.stepsSinceHome = 0
+            self.movesSinceHome = 0
+            # cached board motor configuration (motor type, wide/far stop, tele/near stop, max steps, min speed, max speed)
+            self._motorSetup: tuple[int, bool, bool, int, int, int] | None = None
+            # preallocated command frames
+            self.frames = motorFrames(motorID, 0x01 if motorID == MCR_IRC_MOTOR_ID else 0x00)
+            # move time model (learned from the completed relative moves)
+            self.moveModel = moveTimeModel()
             # set acceleration
             self.acceleration = accel << 3 | 0x01
 
@@ -495,24 +820,10 @@ class MCRControl():
             else:
                 self.currentSpeed = MCR_IRC_DEFAULT_SPEED
                 self.homingSpeed = MCR_IRC_DEFAULT_SPEED
-
-            # initialize the motor control board instance for sending the commands
-            self.MCRBoard = MCRControl.controllerClass(parent=self.parent)
-            success = self._motorInit(pi=self.PIStep, steps=self.maxSteps, speedRange=speedRange)
-            if not success:
-                MCRControl.log.error('Motor not initialized')
-                err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine())
-            else:
-                error = err.ERR_OK
-            self.initialized = success
-
-            # move the motor to the home position (PI limit switch)
-            if move and motorID != MCR_IRC_MOTOR_ID:
-                error = self.home()
-                if error != 0:
-                    err.saveError(error, err.MOD_MCR, err.errLine())
+            return speedRange
 
         # Home
+        @raisesErrors(failedCode)
         def home(self) -> int:
             '''
             Send the motor to the PI location using the 0x73 firmware moveAbs command (TheiaMCR v.3.4).  
@@ -530,7 +841,7 @@ class MCRControl():
                 err_not_supported: (function not supported by this motor)
             ]
             '''
-            MCRControl.log.debug(f'_home,{self.motorID}')
+            MCRControl.log.debug('_home,%s', self.motorID)
             if self.motorID not in MCR_STEPPER_MOTORS_IDS: 
                 MCRControl.log.warning(f'"home" function not supported by motor {self.motorID}')
                 return err.ERR_NOT_SUPPORTED
@@ -544,10 +855,9 @@ class MCRControl():
 
             homeSpeed = self.homingSpeed if self.motorID in MCR_FOCUS_ZOOM_MOTORS_IDS else MCR_IRIS_DEFAULT_SPEED
             # if the step count is beyond the PI position, move back a bit first
-            if (self.PISide == 1 and self.currentStep > self.PIStep) or (self.PISide == -1 and self.currentStep < self.PIStep):
-                # move away from PI first
-                awaySteps = abs(self.currentStep - self.PIStep) + MCR_HARDSTOP_TOLERANCE
-                self._motorMove(steps=-awaySteps * self.PISide, speed=self.homingSpeed, acceleration=self.acceleration)
+            awaySteps = self._awaySteps()
+            if awaySteps != 0:
+                self._motorMove(steps=awaySteps, speed=self.homingSpeed, acceleration=self.acceleration)
                 time.sleep(MCR_MOVE_REST_TIME)
             
             # move the motor to home PI position
@@ -556,14 +866,17 @@ class MCRControl():
             # reset the respect limit state
             if setIgnoreLimitsToFalse: self.setRespectLimits(False)
             self.currentStep = self.PIStep
+            self._setReferenced(success)
             if not success:
                 MCRControl.log.error(f"Error: Motor 0x{self.motorID:02X} move error")
-                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine())
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
                 return err.ERR_BAD_MOVE
-            MCRControl.log.debug(f'_finalStep,{self.motorID},,{self.currentStep}')
+            MCRControl.log.debug('_finalStep,%s,,%s', self.motorID, self.currentStep)
+            self._savePosition()
             return err.ERR_OK
         
         # moveAbs
+        @raisesErrors(failedCode)
         def moveAbs(self, step:int) -> int:
             '''
             Move the motor to the home position then to the absolute step number using the built-in firmware function 0x73 (TheiaMCR v.3.4).  The step must be an integer
@@ -572,6 +885,9 @@ class MCRControl():
             1) move to the PI position using the 0x73 command
             2) move the additional steps beyond the PI position if needed.
 
+            In trusted position mode (see setTrustedPosition) the motor moves directly from the current step with a backlash 
+            corrected relative move (moveRel) while the position is trusted.  
+
             ### input: 
             - step: the final target step to move to.
             ### return: 
@@ -582,7 +898,7 @@ class MCRControl():
                 err_not_supported: (function not supported by this motor)
             ]
             '''
-            MCRControl.log.debug(f'_moveAbs,{self.motorID},{step}')
+            MCRControl.log.debug('_moveAbs,%s,%s', self.motorID, step)
             if self.motorID not in MCR_STEPPER_MOTORS_IDS: 
                 MCRControl.log.warning(f'"moveAbs" function not supported by motor {self.motorID}')
                 return err.ERR_NOT_SUPPORTED
@@ -591,34 +907,26 @@ class MCRControl():
                 MCRControl.log.warning("Warning: Target step cannot be negative")
                 return err.ERR_RANGE
             
-            # check for limits
-            if step > self.maxSteps:
-                MCRControl.log.warning(f'Warning: Target step exceeds max steps and will be limited to {self.maxSteps})')
-                step = self.maxSteps
-            elif step < 0:
-                MCRControl.log.warning("Warning: Target step cannot be negative and will be limited to 0")
-                step = 0
-            
-            # check if step is past PI position
-            additionalMoveSteps = 0
-            if (self.PISide == 1 and step > self.PIStep) or (self.PISide == -1 and step < self.PIStep):
-                if self.respectLimits:
-                    MCRControl.log.warning("Warning: Target step exceeds PI position and respectLimits is True. Motor will stop at PI position.")
-                    additionalMoveSteps = 0
-                else:
-                    additionalMoveSteps = step - self.PIStep
+            # check for limits and moves past the PI position
+            step, additionalMoveSteps = self._absTarget(step)
+
+            # trusted position: move directly from the current step
+            relSteps = self._trustedSteps(step)
+            if relSteps is not None:
+                MCRControl.log.debug('_trustedMove,%s,%s', self.motorID, relSteps)
+                return self.moveRel(relSteps)
 
             # if the current step count is beyond the PI position, move back a bit first
-            if (self.PISide == 1 and self.currentStep > self.PIStep) or (self.PISide == -1 and self.currentStep < self.PIStep):
-                # move away from PI first
-                awaySteps = abs(self.currentStep - self.PIStep) + MCR_HARDSTOP_TOLERANCE
-                self._motorMove(steps=-awaySteps * self.PISide, speed=self.currentSpeed, acceleration=self.acceleration)
+            awaySteps = self._awaySteps()
+            if awaySteps != 0:
+                self._motorMove(steps=awaySteps, speed=self.currentSpeed, acceleration=self.acceleration)
                 time.sleep(MCR_MOVE_REST_TIME)
 
             # move to absolute position 
             success = self._motorMoveTo(finalStep=step, speed=self.currentSpeed, acceleration=self.acceleration)
+            self._setReferenced(success)
             if not success:
-                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine())
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
                 return err.ERR_BAD_MOVE
             
             # move additional steps if needed (beyond PI position)
@@ -626,15 +934,18 @@ class MCRControl():
                 time.sleep(MCR_MOVE_REST_TIME)
                 success = self._motorMove(steps=additionalMoveSteps, speed=self.currentSpeed, acceleration=self.acceleration)
                 if not success:
-                    err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine())
+                    self._setReferenced(False)
+                    err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
                     return err.ERR_BAD_MOVE
                 
             # the step counter has been reset since the motor triggered the PI home position
             self.currentStep = step
-            MCRControl.log.debug(f'_finalStep,{self.motorID},,{self.currentStep}')
+            MCRControl.log.debug('_finalStep,%s,,%s', self.motorID, self.currentStep)
+            self._savePosition()
             return err.ERR_OK
         
         # moveRel
+        @raisesErrors(failedCode)
         def moveRel(self, steps:int, correctForBL:bool=True) -> int:
             '''
             Move the motor by a number of steps.  This can be positive or negative movement.  
@@ -657,7 +968,7 @@ class MCRControl():
                 err_not_supported: (function not supported by this motor)
             ]
             '''
-            MCRControl.log.debug(f'_moveRel,{self.motorID},{steps}')
+            MCRControl.log.debug('_moveRel,%s,%s', self.motorID, steps)
             if self.motorID not in MCR_STEPPER_MOTORS_IDS: 
                 MCRControl.log.warning(f'"moveRel" function not supported by motor {self.motorID}')
                 return err.ERR_NOT_SUPPORTED
@@ -670,30 +981,66 @@ class MCRControl():
             if self.respectLimits and (limit != 0):
                 MCRControl.log.warning(f'Limiting focus relative steps to {steps}')
 
-            # move the motor
+            # move the motor (with backlash correction moves if needed)
             success = False
-            blCorrection = MCR_BACKLASH_OVERSHOOT
-            if correctForBL and (steps * self.PISide > 0):
-                # moving towards PI, add backlash adjustment and keep any moves within PI limit or min/max limits
-                blCorrection = max(0,min(MCR_BACKLASH_OVERSHOOT, self.PIStep * ((self.PIStep if self.respectLimits else (self.maxSteps if self.PIStep > 0 else 0)) - (steps + self.currentStep))))
-
-                success = self._motorMove(steps + self.PISide * blCorrection, self.currentSpeed, self.acceleration)
-                if blCorrection > 0: 
-                    # move back by the BL correction amount
+            moves = self._relMoves(steps, correctForBL)
+            for i, moveSteps in enumerate(moves):
+                if i > 0: 
                     time.sleep(MCR_MOVE_REST_TIME)
-                    success = self._motorMove(-self.PISide * blCorrection, self.currentSpeed, self.acceleration)
-            else:
-                # no need for backlash adjustment
-                success = self._motorMove(steps, self.currentSpeed, self.acceleration)
+                success = self._motorMove(moveSteps, self.currentSpeed, self.acceleration)
                 
             self.currentStep += steps
+            self._countRelMoves(moves, success)
             if not success:
-                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine())
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
                 return err.ERR_BAD_MOVE
-            MCRControl.log.debug(f'_finalStep,{self.motorID},,{self.currentStep}')
+            MCRControl.log.debug('_finalStep,%s,,%s', self.motorID, self.currentStep)
+            self._savePosition()
             return err.ERR_OK
         
+        # predictMoveTime
+        def predictMoveTime(self, step:int) -> float:
+            '''
+            Predict the time for moveAbs(step) from the current position with the move time model (see moveModel).  
+            The prediction includes all the motor moves (move away from the PI, move through the PI, additional steps 
+            or the trusted position moves) and the rest time between the moves.  Until the model is calibrated by 
+            the first moves the nominal time (steps / speed) is used.  
+            ### input: 
+            - step: the target step
+            ### return: 
+            [
+                (ms) predicted move time | 
+                err_range: if the target step is negative |  
+                err_not_supported: (function not supported by this motor)
+            ]
+            '''
+            if self.motorID not in MCR_STEPPER_MOTORS_IDS: 
+                MCRControl.log.warning(f'"predictMoveTime" function not supported by motor {self.motorID}')
+                return err.ERR_NOT_SUPPORTED
+            if step < 0:
+                MCRControl.log.warning("Warning: Target step cannot be negative")
+                return err.ERR_RANGE
+
+            step, additionalMoveSteps = self._absTarget(step)
+            speed = self.currentSpeed
+            relSteps = self._trustedSteps(step)
+            if relSteps is not None:
+                moves = [abs(m) for m in self._relMoves(relSteps)] if relSteps != 0 else []
+            else:
+                moves = []
+                position = self.currentStep
+                awaySteps = self._awaySteps()
+                if awaySteps != 0:
+                    moves.append(abs(awaySteps))
+                    position += awaySteps
+                moves += [self._moveToSteps(cmd, n, position) for cmd, n, _ in self._moveToCommands(step, speed, position)]
+                if additionalMoveSteps != 0:
+                    moves.append(abs(additionalMoveSteps))
+            moveTime = sum(self.moveModel.predict(n, speed) for n in moves)
+            return moveTime + max(0, len(moves) - 1) * MCR_MOVE_REST_TIME * 1000
+
         # IRCState
+        @raisesErrors(failedCode)
         def state(self, state:int) -> int:
             '''
             Set the IRC state to either visible or clear filter (or other options depending on the lens model)
@@ -704,7 +1051,7 @@ class MCRControl():
             ### return: 
             [new state (1 | 2) | error code] (error code <0)
             '''
-            MCRControl.log.debug(f'_state,{self.motorID},{state}')
+            MCRControl.log.debug('_state,%s,%s', self.motorID, state)
             if self.motorID != MCR_IRC_MOTOR_ID: 
                 MCRControl.log.warning(f'"state" function not supported by motor {self.motorID}')
                 return err.ERR_NOT_SUPPORTED
@@ -718,6 +1065,7 @@ class MCRControl():
             return state
         
         # setRespectLimits
+        @raisesErrors()
         def setRespectLimits(self, state:bool):
             '''
             Set the flag to stop motor moves at the PI limits or to continue past the limits.  In some cases
@@ -738,7 +1086,43 @@ class MCRControl():
             self._regardLimits(state, self.PISide)
             return self.respectLimits
 
+        # setTrustedPosition
+        @raisesErrors(failedCode)
+        def setTrustedPosition(self, state:bool, stepBudget:int=MCR_TRUSTED_STEP_BUDGET, moveBudget:int=MCR_TRUSTED_MOVE_BUDGET) -> int:
+            '''
+            Set trusted position mode.  In this mode moveAbs moves directly from the current step with a backlash corrected 
+            relative move instead of moving through the PI position with the firmware 0x73 command.  The position is trusted 
+            after the motor is referenced at the PI (home or moveAbs) until the relative steps or moves since the reference 
+            exceed the budget, a move fails, or the current step is outside the range or beyond the PI position.  Then moveAbs 
+            uses the PI referenced move again (and resets the budget).  Lost steps are not detected, the budget limits the 
+            error that can build up between the PI references.  
+            ### input: 
+            - state: set True to use trusted position mode
+            - stepBudget (optional, MCR_TRUSTED_STEP_BUDGET): relative steps allowed since the PI reference
+            - moveBudget (optional, MCR_TRUSTED_MOVE_BUDGET): relative moves allowed since the PI reference
+            ### globals: 
+            - set trustedPosition, trustedStepBudget, trustedMoveBudget
+            ### return: 
+            [
+                OK = 0 |
+                err_range: budget out of range | 
+                err_not_supported: (function not supported by this motor)
+            ]
+            '''
+            if self.motorID not in MCR_STEPPER_MOTORS_IDS: 
+                MCRControl.log.warning(f'"setTrustedPosition" function not supported by motor {self.motorID}')
+                return err.ERR_NOT_SUPPORTED
+            if stepBudget < 0 or moveBudget < 0:
+                MCRControl.log.warning(f'Requested trusted position budget ({stepBudget} steps, {moveBudget} moves) must not be negative')
+                return err.ERR_RANGE
+            self.trustedPosition = state
+            self.trustedStepBudget = stepBudget
+            self.trustedMoveBudget = moveBudget
+            MCRControl.log.debug('_trustedPosition,%s,%s,%s,%s', self.motorID, state, stepBudget, moveBudget)
+            return err.ERR_OK
+
         # setMotorSpeed
+        @raisesErrors(failedCode)
         def setMotorSpeed(self, speed) -> int:
             '''
             Set the motor speed.  This is not stored on the board (only in this module) but it should be in the speed range stored on the board EEPROM.  
@@ -761,10 +1145,11 @@ class MCRControl():
                     MCRControl.log.warning(f'Requested speed {speed} is outside range 10-200')
                     return err.ERR_RANGE
             self.currentSpeed = speed
-            MCRControl.log.debug(f'_finalSpeed,{self.motorID},,{self.currentSpeed}')
+            MCRControl.log.debug('_finalSpeed,%s,,%s', self.motorID, self.currentSpeed)
             return err.ERR_OK
 
         # setHomingSpeed
+        @raisesErrors(failedCode)
         def setHomingSpeed(self, speed) -> int:
             '''
             Set the motor speed used when seaking the photointerrupter home position for focus/zoom motors.  This is not 
@@ -789,20 +1174,25 @@ class MCRControl():
                     MCRControl.log.warning(f'Requested speed {speed} is outside range 10-200')
                     return err.ERR_RANGE
             self.homingSpeed = speed
-            MCRControl.log.debug(f'_homingSpeed,{self.motorID},,{self.homingSpeed}')
+            MCRControl.log.debug('_homingSpeed,%s,,%s', self.motorID, self.homingSpeed)
             return err.ERR_OK
 
         # read/write motor configurations to EEPROM
         # MCRReadConfig
-        def readMotorSetup(self) -> tuple[bool, int, bool, bool, int, int, int, int]:
+        @raisesErrors(failedSetup)
+        def readMotorSetup(self, refresh:bool=False) -> tuple[bool, int, bool, bool, int, int, int, int]:
             '''
-            Read the configuration of the motor.  The configuration includes: 
+            Read the configuration of the motor.  The configuration is read from the board the first time (or if refresh is True) 
+            and kept in the motor instance.  After that it is returned from the cached copy which is updated by writeMotorSetup, 
+            setRespectLimits, and motor initialization (see invalidateMotorSetup).  The configuration includes: 
             - motor type: stepper (0) or DC (1)
             - use wide/far (left) stop: True/False
             - use tele/near (right) stop: True/False
             - max steps: maximum number of steps in the range of the motor
             - min speed: (pps) minimum speed
             - max speed: (pps) maximum speed
+            ### input: 
+            - refresh (optional, False): set True to read the configuration from the board instead of the cached copy
             ### return: 
             [
                 success: True if MCR returned a valid response,
@@ -815,54 +1205,53 @@ class MCRControl():
                 OK | error value
             ]
             '''            
-            command = bytearray(3)
-            command[0] = 0x67
-            command[1] = self.motorID
-            command[2] = 0x0D
-            response = self.com._sendCmd(command)
+            if self._motorSetup is not None and not refresh:
+                return True, *self._motorSetup, err.ERR_OK
+            response = self.com._sendCmd(self.frames.readSetup)
+            return self._parseMotorSetup(response)
+
+        # invalidate the cached motor configuration
+        def invalidateMotorSetup(self):
+            '''
+            Clear the cached motor configuration so the next readMotorSetup (or setRespectLimits) reads it from the board.  
+            Use this if the board configuration may have been changed outside of this motor instance.  
+            '''
+            MCRControl.log.debug('_invalidateMotorSetup,%s', self.motorID)
+            self._motorSetup = None
 
+        def _parseMotorSetup(self, response:bytes) -> tuple[bool, int, bool, bool, int, int, int, int]:
+            '''
+            Parse the read motor setup (0x67) response.  
+            ### input: 
+            - response: response byte string from the board
+            ### return: 
+            [see readMotorSetup]
+            '''
             # Check against invalid motor id
             # [0x67, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x0D]
+            self._motorSetup = None
             if response[1] == 0xFF:
                 MCRControl.log.error("Error: controller responded with invalid motor id")
-                err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.parent.errors)
                 return False, -1, False, False, -1, -1, -1, err.ERR_NO_COMMUNICATION
 
             try:
                 # Parse the response
-                (
-                    commandId,
-                    motorId,
-                    motorType,
-                    useWideFarStop,
-                    useTeleNearStop,
-                    maxStepsMsb,
-                    maxStepsLsb,
-                    minSpeedMsb,
-                    minSpeedLsb,
-                    maxSpeedMsb,
-                    maxSpeedLsb,
-                    _,  # carriage return
-                ) = response
-            except ValueError as e:
+                self._motorSetup = parseSetup(response)
+            except struct.error as e:
                 MCRControl.log.error(f"Failed to parse read motor values response [{', '.join([f'{int(x):02X}' for x in response])}] ({e})")
                 if self.parent.boardCommunicationState:
                     # no response or incorrect response from the board
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.parent.errors)
                     return False, -1, False, False, -1, -1, -1, err.ERR_NO_COMMUNICATION
                 else:
                     # serial port communication is not initialized
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
                     return False, -1, False, False, -1, -1, -1, err.ERR_SERIAL_PORT
-            
-            # combine the MSB and LSB bytes to get values
-            maxSteps = (maxStepsMsb << 8) | maxStepsLsb
-            minSpeed = (minSpeedMsb << 8) | minSpeedLsb
-            maxSpeed = (maxSpeedMsb << 8) | maxSpeedLsb
-            
-            return True, int(motorType), bool(useWideFarStop), bool(useTeleNearStop), int(maxSteps), int(minSpeed), int(maxSpeed), err.ERR_OK
+            return True, *self._motorSetup, err.ERR_OK
 
         # MCRWriteConfig
+        @raisesErrors(failedResult)
         def writeMotorSetup(self, useWideFarStop:bool, useTeleNearStop:bool, maxSteps:int, minSpeed:int, maxSpeed:int) -> bool:
             '''
             Write the configuration of the motor.  This is stored in the controller board memory for each motor and will
@@ -876,38 +1265,54 @@ class MCRControl():
             ### return: 
             [True] if MCR returned a valid response
             '''
-            MCRControl.log.debug(f'_writeMotorSetup,{self.motorID},{useWideFarStop},{useTeleNearStop},{maxSteps},{minSpeed},{maxSpeed}')
-            # check the motor type (stepper or DC)
-            motorType = 0x01 if self.motorID == MCR_IRC_MOTOR_ID else 0x00
-
-            # structure the command
-            command = bytearray(12)
-            command[0] = 0x63
-            command[1] = self.motorID
-            command[2] = motorType
-            command[3] = int(useWideFarStop)
-            command[4] = int(useTeleNearStop)
-            command[5] = (maxSteps >> 8) & 0xFF
-            command[6] = maxSteps & 0xFF
-            command[7] = (minSpeed >> 8) & 0xFF
-            command[8] = minSpeed & 0xFF
-            command[9] = (maxSpeed >> 8) & 0xFF
-            command[10] = maxSpeed & 0xFF
-            command[11] = 0x0D
+            MCRControl.log.debug('_writeMotorSetup,%s,%s,%s,%s,%s,%s', self.motorID, useWideFarStop, useTeleNearStop, maxSteps, minSpeed, maxSpeed)
+            command = self._motorSetupFrame(useWideFarStop, useTeleNearStop, maxSteps, minSpeed, maxSpeed)
             response = self.com._sendCmd(command)
+            return self._checkWriteMotorSetup(command, response)
 
+        def _motorSetupFrame(self, useWideFarStop:bool, useTeleNearStop:bool, maxSteps:int, minSpeed:int, maxSpeed:int) -> bytearray:
+            '''
+            Format the write motor setup (0x63) command byte string in the preallocated motor frame (see mcrProtocol.motorFrames).  
+            ### input: 
+            - see writeMotorSetup
+            ### return: 
+            [command byte string]
+            '''
+            return self.frames.setup(bool(useWideFarStop), bool(useTeleNearStop), int(maxSteps), int(minSpeed), int(maxSpeed))
+
+        def _checkWriteMotorSetup(self, command:bytes, response:bytes) -> bool:
+            '''
+            Check the write motor setup (0x63) response and update the cached motor configuration.  
+            ### input: 
+            - command: command byte string sent to the board
+            - response: response byte string from the board
+            ### return: 
+            [True] if MCR returned a valid response
+            '''
             # check the response
             if response[1] != 0x00:
                 MCRControl.log.error("Error: Write motor values failed")
+                self._motorSetup = None
                 if self.parent.boardCommunicationState:
                     # no response or incorrect response from the board
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.parent.errors)
                 else:
                     # serial port communication is not initialized
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
                 return False
+            self._motorSetup = self._setupFromFrame(command)
             return True
 
+        def _setupFromFrame(self, command:bytes) -> tuple[int, bool, bool, int, int, int]:
+            '''
+            Get the motor configuration from a write motor setup (0x63) command byte string for the cached copy.  
+            ### input: 
+            - command: command byte string sent to the board
+            ### return: 
+            [motor type, use wide/far stop, use tele/near stop, max steps, min speed, max speed]
+            '''
+            return parseSetup(command)
+
         ############ internal functions ##############################################################
         # checkLimits
         def _checkLimits(self, steps:int, limitStep:bool=False) -> tuple[int, int]:
@@ -954,6 +1359,187 @@ class MCRControl():
                 retVal = -2
             return retVal, retSteps
         
+        # absTarget
+        def _absTarget(self, step:int) -> tuple[int, int]:
+            '''
+            Limit an absolute target step to the motor range and find the steps to move past the PI position (if the 
+            limits are not respected).  
+            ### input: 
+            - step: target step
+            ### return: 
+            [
+                limited target step,
+                additional steps to move after reaching the PI position (0 if the target is not past the PI)
+            ]
+            '''
+            if step > self.maxSteps:
+                MCRControl.log.warning(f'Warning: Target step exceeds max steps and will be limited to {self.maxSteps})')
+                step = self.maxSteps
+            elif step < 0:
+                MCRControl.log.warning("Warning: Target step cannot be negative and will be limited to 0")
+                step = 0
+            
+            # check if step is past PI position
+            additionalMoveSteps = 0
+            if (self.PISide == 1 and step > self.PIStep) or (self.PISide == -1 and step < self.PIStep):
+                if self.respectLimits:
+                    MCRControl.log.warning("Warning: Target step exceeds PI position and respectLimits is True. Motor will stop at PI position.")
+                    additionalMoveSteps = 0
+                else:
+                    additionalMoveSteps = step - self.PIStep
+            return step, additionalMoveSteps
+
+        # awaySteps
+        def _awaySteps(self) -> int:
+            '''
+            Steps to move away from the PI position before homing if the current step is beyond the PI position. 
+            ### return: 
+            [signed steps to move | 0 if the current step is not beyond the PI position]
+            '''
+            if (self.PISide == 1 and self.currentStep > self.PIStep) or (self.PISide == -1 and self.currentStep < self.PIStep):
+                return -(abs(self.currentStep - self.PIStep) + MCR_HARDSTOP_TOLERANCE) * self.PISide
+            return 0
+
+        # stepRange
+        def _stepRange(self) -> tuple[int, int]:
+            '''
+            Step range the motor can move to: 0 to the PI step (or PI step to max steps) if the limits are respected, 
+            otherwise 0 to max steps.  
+            ### return: 
+            [low step, high step]
+            '''
+            if self.motorID not in MCR_FOCUS_ZOOM_MOTORS_IDS or not self.respectLimits:
+                return 0, self.maxSteps
+            return (0, self.PIStep) if self.PISide == 1 else (self.PIStep, self.maxSteps)
+
+        # relMoves
+        def _relMoves(self, steps:int, correctForBL:bool=True, position:int|None=None) -> list[int]:
+            '''
+            Split a relative move into the motor moves needed for backlash correction.  When moving towards the PI the 
+            motor overshoots by the backlash amount (limited by the PI or min/max steps) and then moves back.  
+            ### input: 
+            - steps: number of steps to move (already limited by _checkLimits)
+            - correctForBL (optional, True): set true to compensate for backlash
+            - position (optional, currentStep): step position at the start of the move
+            ### return: 
+            [list of relative step moves]
+            '''
+            if correctForBL and (steps * self.PISide > 0):
+                position = self.currentStep if position is None else position
+                # moving towards PI, add backlash adjustment and keep any moves within PI limit or min/max limits
+                blCorrection = max(0,min(MCR_BACKLASH_OVERSHOOT, self.PIStep * ((self.PIStep if self.respectLimits else (self.maxSteps if self.PIStep > 0 else 0)) - (steps + position))))
+                if blCorrection > 0:
+                    # move back by the BL correction amount
+                    return [steps + self.PISide * blCorrection, -self.PISide * blCorrection]
+            # no need for backlash adjustment
+            return [steps]
+
+        # trustedSteps
+        def _trustedSteps(self, step:int) -> int | None:
+            '''
+            Check if the current position is trusted for a direct move to the target step (see setTrustedPosition).  
+            ### input: 
+            - step: target step (limited by _absTarget)
+            ### return: 
+            [relative steps to the target | None if the move must be referenced at the PI]
+            '''
+            if not self.trustedPosition or not self.positionReferenced:
+                return None
+            # range check: the step counter must be in the range and not beyond the PI position
+            if self.currentStep < 0 or self.currentStep > self.maxSteps or self._awaySteps() != 0:
+                MCRControl.log.debug('_trustedRange,%s,%s', self.motorID, self.currentStep)
+                return None
+            if self.respectLimits and self.motorID in MCR_FOCUS_ZOOM_MOTORS_IDS and (step - self.PIStep) * self.PISide > 0:
+                step = self.PIStep
+            relSteps = step - self.currentStep
+            if self.movesSinceHome >= self.trustedMoveBudget or self.stepsSinceHome + abs(relSteps) > self.trustedStepBudget:
+                MCRControl.log.debug('_trustedBudget,%s,%s,%s', self.motorID, self.stepsSinceHome, self.movesSinceHome)
+                return None
+            return relSteps
+
+        # setReferenced
+        def _setReferenced(self, success:bool):
+            '''
+            Update the PI reference state after a move through the PI position (home or moveAbs).  
+            ### input: 
+            - success: True if the move was successful
+            '''
+            self.positionReferenced = success
+            if success:
+                self.positionResync = False
+            self.stepsSinceHome = 0
+            self.movesSinceHome = 0
+            if not success:
+                self._savePosition()
+
+        # countRelMoves
+        def _countRelMoves(self, moves:list[int], success:bool):
+            '''
+            Add relative moves to the trusted position budget counters.  A failed move clears the PI reference.  
+            ### input: 
+            - moves: relative step moves (see _relMoves)
+            - success: True if the moves were successful
+            '''
+            self.stepsSinceHome += sum(abs(m) for m in moves)
+            self.movesSinceHome += 1
+            if not success:
+                self.positionReferenced = False
+                self._savePosition()
+
+        # journalEntry
+        def _journalEntry(self) -> dict | None:
+            '''
+            Get the position journal entry of the motor if it is valid for the current board motor configuration 
+            (read from the board before the motor initialization).  
+            ### return: 
+            [journal entry | None if the position is not restored]
+            '''
+            journal = self.parent.journal
+            if journal is None or journal.entry(self.motorID) is None:
+                return None
+            setup = self.readMotorSetup(refresh=True)
+            if not setup[0]:
+                return None
+            return journal.restore(self.motorID, self.maxSteps, self.PIStep, (setup[1], *setup[4:7]))
+
+        # restorePosition
+        def _restorePosition(self, entry:dict):
+            '''
+            Set the motor position from the position journal entry instead of homing the motor.  
+            ### input: 
+            - entry: journal entry (see _journalEntry)
+            '''
+            self.currentStep = entry['step']
+            self.positionReferenced = True
+            self.stepsSinceHome = entry['stepsSinceHome']
+            self.movesSinceHome = entry['movesSinceHome']
+            MCRControl.log.info(f'Motor 0x{self.motorID:02X} position {self.currentStep} restored from the position journal')
+            MCRControl.log.debug('_finalStep,%s,,%s', self.motorID, self.currentStep)
+
+        # journalMoving
+        def _journalMoving(self):
+            '''
+            Mark the motor as moving in the position journal (before a move command is sent).  
+            '''
+            if self.parent.journal is not None:
+                self.parent.journal.moving(self.motorID)
+
+        # savePosition
+        def _savePosition(self):
+            '''
+            Save the current step in the position journal after a move.  The journal entry is removed if the position
+            is not referenced at the PI (failed move or motor initialized without homing).  
+            '''
+            journal = self.parent.journal
+            if journal is None or self.motorID not in MCR_STEPPER_MOTORS_IDS:
+                return
+            if not self.positionReferenced or self._motorSetup is None:
+                journal.invalidate(self.motorID)
+                return
+            setup = self._motorSetup
+            journal.update(self.motorID, self.currentStep, self.maxSteps, self.PIStep, (setup[0], *setup[3:6]), 
+                self.stepsSinceHome, self.movesSinceHome)
+
         # MCRMotorInit
         def _motorInit(self, steps:int, pi:int, speedRange:int) -> bool:
             '''
@@ -971,62 +1557,41 @@ class MCRControl():
             '''
             steps = int(steps)
             pi = int(pi)
-            motorType = 0x01 if self.motorID == MCR_IRC_MOTOR_ID else 0x00
-
-            cmd = bytearray(12)
-            cmd[0] = 0x63
-            cmd[1] = self.motorID
-            cmd[2] = motorType
-            cmd[3] = 0
-            cmd[4] = 0
-            cmd[11] = 0x0D
 
             if speedRange == 1:
                 # focus/zoom motor speed range.  min (100) and max (1500) speeds
-                cmd[7] = 0
-                cmd[8] = 0x64
-                cmd[9] = 0x05
-                cmd[10] = 0xDC
+                minSpeed, maxSpeed = 100, 1500
             elif speedRange == 2:
                 # iris motor speed range.  min (10) and max (200) speeds
-                cmd[7] = 0
-                cmd[8] = 0x0A
-                cmd[9] = 0
-                cmd[10] = 0xC8
+                minSpeed, maxSpeed = 10, 200
             else: 
                 # IRC motor speed range.  min (10) and max (1000) speeds (in steps per second)
-                cmd[7] = 0
-                cmd[8] = 0x0A
-                cmd[9] = 0x03
-                cmd[10] = 0xE8
+                minSpeed, maxSpeed = 10, 1000
             
+            useWideFarStop = useTeleNearStop = False
             if self.motorID in MCR_FOCUS_ZOOM_MOTORS_IDS:
                 # check for stop positions: wide/far at high motor steps. wide/far are at low motor steps
                 # check if PI is closer to low (0) or high (max) side
                 if (steps - pi) < pi:
                     # use left stop (max)
-                    cmd[3] = 1
+                    useWideFarStop = True
                 else:
                     # use right stop (0)
-                    cmd[4] = 1
-
-            # max steps
-            # convert integers to bytes and copy
-            bSteps = int(steps).to_bytes(2, 'big')
-            cmd[5] = bSteps[0]
-            cmd[6] = bSteps[1]
+                    useTeleNearStop = True
 
             # send the command
-            response = bytearray(12)
+            cmd = self._motorSetupFrame(useWideFarStop, useTeleNearStop, steps, minSpeed, maxSpeed)
             response = self.com._sendCmd(cmd)
 
             success = True
+            self._motorSetup = self._setupFromFrame(cmd)
             if response[1] == 0x01:
                 MCRControl.log.error("Error: Motor init failed")
+                self._motorSetup = None
                 if self.parent.boardCommunicationState:
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.parent.errors)
                 else:
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
                 success = False
             return success
         
@@ -1048,23 +1613,61 @@ class MCRControl():
                 MCRControl.log.error("Error: final step must be positive for absolute move")
                 return False
             
+            success = False
+            for cmd, step, waitTime in self._moveToCommands(finalStep, speed):
+                success = self._motorMoveCommand(FWCommand=cmd, steps=step, speed=speed, acceleration=acceleration, waitTime=waitTime)
+            return success
+
+        def _moveToCommands(self, finalStep:int, speed:int, position:int|None=None) -> list[tuple[int, int, int]]:
+            '''
+            Firmware commands for an absolute move (see _motorMoveTo).  
+            ### input:  
+            - finalStep: final step position to move to (must be positive)
+            - speed: (pps) motor speed
+            - position: (optional, currentStep) step position at the start of the 0x73 move
+            ### return: 
+            [list of (FW command, steps, wait time (ms))]
+            '''
+            commands = []
             if self.motorID is MCR_IRIS_MOTOR_ID:
                 # move iris home first
-                waitTime = int((self.maxSteps / speed) * 1000 * 1.15)
-                success = self._motorMoveCommand(FWCommand = 0x66, steps = self.maxSteps, speed = speed, waitTime = waitTime)
+                waitTime = self.moveModel.deadline(self.maxSteps, speed, int((self.maxSteps / speed) * 1000 * 1.15))
+                commands.append((0x66, self.maxSteps, waitTime))
                 if finalStep == 0:
-                    return success
+                    return commands
                 cmd = 0x62
                 step = finalStep
             else:
                 cmd = 0x73
                 step = abs(self.PIStep - finalStep)
 
-            # maximum wait time is the full range plus the distance to the final step plus 30% extra time
-            waitTime = int(((step + self.maxSteps) / speed) * 1000 * 1.30)  
+            # maximum wait time is the full range plus the distance to the final step plus 30% extra time.  With the
+            # move time model the wait time is for the distance to the PI (full range if the position is not referenced).
+            fallback = int(((step + self.maxSteps) / speed) * 1000 * 1.30)
+            waitTime = self.moveModel.deadline(self._moveToSteps(cmd, step, position, referenced=True), speed, fallback)
+            commands.append((cmd, step, waitTime))
+            return commands
 
-            success = self._motorMoveCommand(FWCommand=cmd, steps=step, speed=speed, acceleration=acceleration, waitTime=waitTime)
-            return success
+        def _moveToSteps(self, FWCommand:int, steps:int, position:int|None=None, referenced:bool=False) -> int:
+            '''
+            Motor steps moved by an absolute move firmware command.  The 0x73 command moves to the PI first.  
+            ### input:  
+            - FWCommand: firmware command byte
+            - steps: command steps
+            - position: (optional, currentStep) step position at the start of the move
+            - referenced: (optional, False) use the full range to the PI if the position is not referenced at the PI
+            ### return: 
+            [motor steps]
+            '''
+            if FWCommand != 0x73:
+                return steps
+            position = self.currentStep if position is None else position
+            if (position - self.PIStep) * self.PISide > 0:
+                # the motor moves away from the PI first (see _awaySteps)
+                position = self.PIStep - self.PISide * MCR_HARDSTOP_TOLERANCE
+            if referenced and not self.positionReferenced:
+                return self.maxSteps + steps
+            return abs(position - self.PIStep) + steps
 
         def _motorMove(self, steps:int, speed:int, acceleration:int=0) -> bool:
             '''
@@ -1084,6 +1687,19 @@ class MCRControl():
             ### return: 
             [success]
             '''
+            cmd, steps, waitTime = self._moveCommand(steps, speed)
+            success = self._motorMoveCommand(FWCommand=cmd, steps=steps, speed=speed, acceleration=acceleration, waitTime=waitTime)
+            return success
+
+        def _moveCommand(self, steps:int, speed:int) -> tuple[int, int, int]:
+            '''
+            Firmware command for a relative move (see _motorMove).  
+            ### input: 
+            - steps: number of steps to move (positive or negative)
+            - speed: (pps) motor speed
+            ### return: 
+            [FW command, unsigned steps, wait time (ms)]
+            '''
             if self.motorID is MCR_IRIS_MOTOR_ID:
                 # reverse iris step direction
                 if steps >= 0:
@@ -1101,11 +1717,9 @@ class MCRControl():
                     # move negative towards near/tele
                     cmd = 0x62
                     steps = abs(steps)
-            # maximum wait time is the full range plus the distance to the final step plus 15% extra time
-            waitTime = int((steps / speed) * 1000 * 1.15)  
-            
-            success = self._motorMoveCommand(FWCommand=cmd, steps=steps, speed=speed, acceleration=acceleration, waitTime=waitTime)
-            return success
+            # maximum wait time is the move time plus 15% extra time until the move time model is calibrated
+            waitTime = self.moveModel.deadline(steps, speed, int((steps / speed) * 1000 * 1.15))
+            return cmd, steps, waitTime
 
         def _motorMoveCommand(self, FWCommand:int, steps:int, speed:int, acceleration:int=0, waitTime:int=0) -> bool:
             '''
@@ -1119,33 +1733,30 @@ class MCRControl():
             ### return: 
             [success]
             '''
-            steps = int(steps)
-            speed = int(speed)
-
-            cmd = bytearray(8)
-            cmd[0] = FWCommand
-            cmd[1] = self.motorID
-            cmd[4] = 1
-            cmd[7] = 0x0D
-            
-            # steps and speed
-            # convert integers to bytes and copy
-            bSteps = int(steps).to_bytes(2, 'big')
-            cmd[2] = bSteps[0]
-            cmd[3] = bSteps[1]
-            
-            bSpeed = int(speed).to_bytes(2, 'big')
-            cmd[5] = bSpeed[0]
-            cmd[6] = bSpeed[1]
+            cmd = self.frames.move(FWCommand, int(steps), int(speed))
+            self._journalMoving()
+            # motor steps for the move time model (0x73 moves through the PI are only known if the position is referenced)
+            moveSteps = self._moveToSteps(FWCommand, steps) if FWCommand != 0x73 or self.positionReferenced else None
 
             # send the command
-            response = bytearray(12)
-            response = self.com._sendCmd(cmd, waitTime)
-            MCRControl.log.debug(f'--wait time: {waitTime} ms: {(waitTime / 1200):.0f}')#########################
+            predicted = self.moveModel.predict(moveSteps, speed) if moveSteps is not None else None
+            response, attempts, duration = self.com._sendCmdStatus(cmd, waitTime, moveSteps, predicted)
+            responded = response is not None
+            if not responded:
+                response = FAILED_RESPONSE
+            MCRControl.log.debug('--wait time: %s ms', waitTime)
 
             success = True
+            if response[1] == 0x00 and moveSteps is not None and attempts == 1:
+                # only the first attempt times the move (a retry includes the timeouts and the backoff)
+                self.moveModel.observe(moveSteps, speed, duration)
             if response[1] != 0x00:
                 MCRControl.log.error(f"Error: motor 0x{self.motorID:02X} move command failed (timed out or bad response)")
+                if FWCommand in MCR_RELATIVE_MOVES and not responded:
+                    # the move may have been done: don't send it again, the position needs a PI reference
+                    MCRControl.log.warning(f'Motor 0x{self.motorID:02X} position needs a re-sync (home or moveAbs)')
+                    self.positionResync = True
+                    self.parent.metrics.resync(self.motorID)
 
                 # check the board is still connected and communication is possible.  
                 MCRControl.log.warning('Rechecking MCR board communication...')
@@ -1153,7 +1764,7 @@ class MCRControl():
                 MCRControl.log.warning(f'...Communication with MCR board {"re-established" if boardCommunication else "failed"}')
 
                 if not self.parent.boardCommunicationState:
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
                 success = False
 
             return success
@@ -1177,60 +1788,27 @@ class MCRControl():
                 MCRControl.log.info('Motor has no limit switch')
                 return False
             
-            # read the current motor state so step and speed ranges don't have to be changed.  
-            getCmd = bytearray(3)
-            getCmd[0] = 0x67
-            getCmd[1] = self.motorID
-            getCmd[2] = 0x0D
-
-            res = bytearray(12)
-            res = self.com._sendCmd(getCmd)
-            if len(res) == 0: 
-                # no response from board for current state
-                MCRControl.log.warning("Warning: no response from MCR board")
-                if self.parent.boardCommunicationState:
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
-                else:
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
-                return False
-            # exctract the proper response if the variable res includes more than one response
-            for i in range(len(res)):
-                if res[i] == getCmd[0]:
-                    res = res[i:i+12]
-                    break
-            if len(res) > 12: 
-                MCRControl.log.warning("Warning: MCR board response too long ({})".format(":".join("{:02x}".format(c) for c in res)))
-                if self.parent.boardCommunicationState:
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
-                else:
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
-                return False
-            setCmd = bytearray(12)
-            for i, b in enumerate(res):
-                setCmd[i] = b
-            setCmd[0] = 0x63
-            setCmd[3] = 0
-            setCmd[4] = 0
-
-            if state:
-                if PISide == 1:
-                    # use left stop (max)
-                    setCmd[3] = 1
-                else:
-                    # use right stop (0)
-                    setCmd[4] = 1
-            
-            # send the modified command
-            response = bytearray(12)
+            # the step and speed ranges are not changed (from the cached motor setup, read from the board if not cached)
+            if self._motorSetup is None:
+                success = self.readMotorSetup(refresh=True)[0]
+                if not success:
+                    MCRControl.log.warning("Warning: no response from MCR board")
+                    return False
+            _, _, _, maxSteps, minSpeed, maxSpeed = self._motorSetup
+
+            # use left stop (max) if PI is on the high side, otherwise use right stop (0)
+            setCmd = self._motorSetupFrame(state and PISide == 1, state and PISide != 1, maxSteps, minSpeed, maxSpeed)
             response = self.com._sendCmd(setCmd)
 
             if response[1] != 0x00:
                 MCRControl.log.error("Error: write motor configuration failed")
+                self._motorSetup = None
                 if self.parent.boardCommunicationState:
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.parent.errors)
                 else:
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
                 return False
+            self._motorSetup = self._setupFromFrame(setCmd)
             return True
 
 
@@ -1262,6 +1840,7 @@ class MCRControl():
 
         # ----------- board information --------------------
         # get the FW revision from the board
+        @raisesErrors(failedResult)
         def readFWRevision(self) -> str:
             '''
             Get FW revision on the board. 
@@ -1273,18 +1852,14 @@ class MCRControl():
                 MCRControl.log.warning(f'readFWRevision can\'t be called because board isn\'t initialized')
                 return ''
 
-            response = ""
-            cmd = bytearray(2)
-            cmd[0] = 0x76
-            cmd[1] = 0x0D
-            response = self.com._sendCmd(cmd)
+            response = self.com._sendCmd(FW_REVISION_FRAME)
             fw = ''
-            if response == None:
+            if response == None or response[0] != FW_REVISION_FRAME[0]:
                 MCRControl.log.error("Error: No resonse received from MCR controller")
                 if self.parent.boardCommunicationState:
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.parent.errors)
                 else:
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
             else:
                 fw = (".".join("{:x}".format(c) for c in response))
                 fw = fw[3:-2]
@@ -1292,6 +1867,7 @@ class MCRControl():
             return fw
 
         # get the board SN
+        @raisesErrors(failedResult)
         def readBoardSN(self) -> str:
             '''
             Get the serial number of the board. 
@@ -1304,18 +1880,14 @@ class MCRControl():
                 MCRControl.log.warning(f'readBoardSN can\'t be called because board isn\'t initialized')
                 return ''
 
-            response = ""
-            cmd = bytearray(2)
-            cmd[0] = 0x79
-            cmd[1] = 0x0D
-            response = self.com._sendCmd(cmd)
+            response = self.com._sendCmd(BOARD_SN_FRAME)
             sn = ''
-            if response == None:
+            if response == None or response[0] != 0x79 or len(response) < 7:
                 MCRControl.log.error("Error: No resonse received from MCR controller")
                 if self.parent.boardCommunicationState:
-                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.parent.errors)
                 else:
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
             else:
                 sn = f'{response[1]:02x}{response[2]:02x}'
                 sn = sn[:-1]
@@ -1324,6 +1896,7 @@ class MCRControl():
             return sn
         
         # communication path
+        @raisesErrors(failedResult)
         def setCommunicationPath(self, path:int|str) -> bool:
             '''
             Set the communication path to I2C (0), USB (1), or UART (2).  
@@ -1358,11 +1931,7 @@ class MCRControl():
                 newPath = path
 
             # set the new path
-            cmd = bytearray(3)
-            cmd[0] = 0x6B
-            cmd[1] = newPath
-            cmd[2] = 0x0D
-            self.com._sendCmd(cmd)
+            self.com._sendCmd(pathFrame(newPath))
             MCRControl.log.info(f'New comm path set ({newPath})')
             return True
 
@@ -1423,7 +1992,8 @@ class MCRControl():
             '''
             This class controlls the serial port and sends user commands to the MCR600 series board over USB serial protocol.  
             The controller board class variable 'serialPort' must be set before any functions are available. 
-            The serial port name is formatted as a vitual com port ("com4" or "/dev/ttyUSB0")
+            The serial port name is formatted as a vitual com port ("com4" or "/dev/ttyUSB0") or a pyserial URL 
+            (e.g. "mcrsim://board1" for the simulated board, see mcrSimulator.py)
 
             ### input:  
             - parent: the parent MCRControl class instance so all communications go through the same serial port 
@@ -1433,22 +2003,27 @@ class MCRControl():
             ### global variables:  
             - serialPort is set at the MCRControl class level
             - boardCommunicationState: push the serial port state up to MCRControl class.  True if the serial port is open and communication is possible, False otherwise
+            - comWorker: serial port I/O worker for the opened port (set at the MCRControl class level)
             '''
             self.parent = parent
             self.serialPort = None
+            self.comWorker = None
             self.serialPortException = None  # Store exception details
             self.parent.boardCommunicationState = False
+            if serialPortName.startswith('mcrsim://'):
+                import TheiaMCR.mcrSimulator        # registers the mcrsim:// URL handler
             if self.parent.serialPort is None:
                 try:
-                    self.serialPort = serial.Serial(
-                        port=serialPortName,
+                    self.serialPort = serial.serial_for_url(
+                        serialPortName,
                         baudrate=115200,
                         bytesize=8,
                         timeout=0.1,
                         stopbits=serial.STOPBITS_ONE,
                     )
+                    self.comWorker = comWorker(self.serialPort, frameParser(), MCR_NO_RESPONSE, threaded=self.parent.ioThread, metrics=self.parent.metrics)
                     success = 0
-                    MCRControl.log.debug(f"Serial communication opened on {serialPortName} successfully")
+                    MCRControl.log.debug('Serial communication opened on %s successfully', serialPortName)
                 except serial.SerialException as e:
                     self.serialPortException = str(e)  # Store exception message
                     error_msg = str(e).lower()
@@ -1459,7 +2034,7 @@ class MCRControl():
                     else:
                         MCRControl.log.error("Serial port not open {}".format(e))
                     
-                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine())
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
                     success = err.ERR_SERIAL_PORT
                 self.initialized = success
 
@@ -1467,18 +2042,34 @@ class MCRControl():
         def _verifyCommunication(self) -> bool:
             ''' 
             Verify communication with the MCR board by calling the readFWRevision function and reading the result.  
-            If the verification fails, try to reinitialize the serial port.
+            If the verification fails, try to reinitialize the serial port and verify the communication again.
             Always refer to the parent serial port and port name to make sure it is the correct instance for the port.  
+            ### return: 
+            [True if the board responded]
             '''
             # Send a command to read the firmware revision
-            cmd = bytearray([0x76, 0x0D])
-            response = self._sendCmd(cmd)
+            response = self._sendCmd(FW_REVISION_FRAME)
+            if response[0] != FW_REVISION_FRAME[0]:
+                if not self._restartPort():
+                    return False
+                # check the communication again on the reopened serial port
+                response = self._sendCmd(FW_REVISION_FRAME)
+                if response[0] != FW_REVISION_FRAME[0]:
+                    return False
+            MCRControl.log.info('MCR communication verified: %s', hexFrame(response))
+            return True
 
-            if response[1] == 0x00:
-                MCRControl.log.error(f"MCR communication verified: {':'.join(f'{b:02x}' for b in response)}")
-                return True
-            
+        # restart the serial port
+        def _restartPort(self) -> bool:
+            '''
+            Close and reopen the serial port of the board.  
+            ### return: 
+            [True if the serial port was reopened]
+            '''
             # Attempt to reinitialize the serial port
+            if self.parent.comWorker is not None:
+                self.parent.comWorker.close()
+                self.parent.comWorker = None
             if self.parent.serialPort is not None:
                 try:
                     self.parent.serialPort.close()
@@ -1492,92 +2083,179 @@ class MCRControl():
             self.restartCom = self.parent.MCRCom(self.parent, self.parent.serialPortName)
             if self.restartCom.initialized >= 0: 
                 self.parent.serialPort = self.restartCom.serialPort
+                self.parent.comWorker = self.restartCom.comWorker
                 self.parent.boardCommunicationRestarts += 1
             return self.restartCom.initialized == 0
 
         # MCRSendCmd
-        def _sendCmd(self, cmd, waitTime:int=10) -> bytearray:
+        def _sendCmd(self, cmd, waitTime:int=10, moveSteps:int|None=None, predicted:float|None=None) -> bytes:
             '''
             Send the command through the com port over USB connection to the board.  This function should be 
             chnged for UART or I2C communication protocol instead of USB.  
             Send the byte string to the MCR-IQ board.  
             ### input: 
             - cmd: byte string to send
-            - waitTime (optional): (ms) wait before checking for a response
+            - waitTime (optional): (ms) expected command (move) time.  The response is read as soon as it arrives, up to waitTime + RESPONSE_READ_TIME.  
+            - moveSteps, predicted (optional): motor steps and (ms) predicted time of a move command for the telemetry stream.  
+                The predicted time (or else the wait time) is used to match the move response.  
+            The idempotent commands (MCR_IDEMPOTENT_COMMANDS) are sent again if there is no response, up to 
+            MCRControl.retryAttempts times with a backoff wait (MCR_RETRY_BACKOFF doubled for each retry, up to 
+            MCR_RETRY_BACKOFF_MAX).  The serial port is reopened before a retry if the connection was lost.  
             ### return: 
-            [return byte string from MCR]
+            [return byte string from MCR | FAILED_RESPONSE [0x74, 0x01, 0x0D] if there was no response]
             ### globals:  
             - set self.parent.boardCommunicationState to True if the serial port is open and communication is possible, False otherwise
             '''
-            response = bytearray(12)
+            response, _, _ = self._sendCmdStatus(cmd, waitTime, moveSteps, predicted)
+            return FAILED_RESPONSE if response is None else response
+
+        # MCRSendCmd with the attempt status
+        def _sendCmdStatus(self, cmd, waitTime:int=10, moveSteps:int|None=None, predicted:float|None=None) -> tuple[bytes | None, int, float]:
+            '''
+            Send the command with the retries of the idempotent commands (see _sendCmd).  
+            ### return: 
+            [return byte string from MCR | None if there was no response, number of attempts, (ms) duration of the last attempt]
+            '''
+            attempts = commandAttempts(cmd, self.parent.retryAttempts)
+            response, portLost, duration = self._sendOnce(cmd, waitTime, moveSteps, predicted)
+            attempt = 1
+            while response is None and attempt < attempts:
+                backoff = retryBackoff(attempt)
+                attempt += 1
+                MCRControl.log.warning('Retrying command 0x%02X in %.0f ms (attempt %d of %d)', cmd[0], backoff * 1000, attempt, attempts)
+                time.sleep(backoff)
+                if portLost and not self._restartPort():
+                    break
+                self.parent.metrics.retry(cmd)
+                response, portLost, duration = self._sendOnce(cmd, waitTime, moveSteps, predicted)
+            return response, attempt, duration
+
+        # send a command once
+        def _sendOnce(self, cmd, waitTime:int, moveSteps:int|None, predicted:float|None) -> tuple[bytes | None, bool, float]:
+            '''
+            Send the command and wait for the response (see _sendCmd).  
+            ### return: 
+            [response byte string | None if there was no response, True if the serial port connection was lost, 
+            (ms) time from sending the command to the response (without waiting for another move of the board)]
+            '''
             # check if the serial port is defined
-            if isinstance(self.parent.serialPort, str):
+            worker = self.parent.comWorker
+            if isinstance(self.parent.serialPort, str) or worker is None:
                 MCRControl.log.error("Serial port not open")
-                response = bytearray([0x74, 0x01, 0x0D])
                 self.parent.boardCommunicationState = False
-                return response
-
-            # send the string
-            if MCRControl.communicationDebugLevel: MCRControl.log.debug("   -> {}".format(":".join("{:02x}".format(c) for c in cmd)))
+                return None, False, 0.0
+
+            # send the string and wait until the full response frame arrives or the move time plus read time expires.  
+            # The move responses don't include the motor ID so only one move is in flight for the board (the other 
+            # commands overlap the move with the I/O thread).  
+            if MCRControl.communicationDebugLevel: MCRControl.log.debug('   -> %s', hexFrame(cmd))
+            moveTime = (predicted if predicted is not None else waitTime) / 1000
+            with self.parent._motionLock if cmd[0] in MCR_MOVE_COMMANDS else nullcontext():
+                startTime = time.monotonic()
+                with worker.transaction():
+                    future = worker.submit(cmd, responseID(cmd[0]), (waitTime + RESPONSE_READ_TIME) / 1000, moveTime, waitTime)
+                    try:
+                        worker.wait([future])
+                    except serial.SerialException:
+                        pass
+                duration = (time.monotonic() - startTime) * 1000
+            portError = None
             try:
-                self.parent.serialPort.write(cmd)
-            except (serial.SerialException, AttributeError) as e:
-                MCRControl.log.error("Serial port not open ({})".format(e))
-                response = bytearray([0x74, 0x01, 0x0D])
+                response = future.result()
+            except serial.SerialException as e:
+                response = None
+                portError = e
+            if self.parent.telemetry is not None:
+                self.parent.telemetry.command(cmd, response, duration, moveSteps, predicted)
+            if portError is not None:
+                MCRControl.log.error("Serial port connection lost {}".format(portError))
                 self.parent.boardCommunicationState = False
-                return response
-
-            # wait for a response (wait first then check for the response)
-            readSuccess = False
-            startTime = time.time() * 1000
-            while(time.time() * 1000 - waitTime < startTime): 
-                # wait until finished moving (waitTime milliseconds) or until PI triggers serial port buffer response
-                try:
-                    if self.parent.serialPort.in_waiting > 0: 
-                        break
-                except serial.SerialException as e:
-                    MCRControl.log.error("Serial port connection lost {}".format(e))
-                    response = bytearray([0x74, 0x01, 0x0D])
-                    self.parent.boardCommunicationState = False
-                    return response
-                time.sleep(0.1)
-
-            # check for commands that don't generate responses, force successful response
-            if cmd[0] == 0x6B:
-                # set communication path
-                response = bytearray([0x6B, 0x00, 0x0D])
-                self.parent.boardCommunicationState = True
-                return response
-            ##### additional commands can be added here #####
-
-            # read the response
-            startTime = time.time() * 1000
-            while (time.time() * 1000 - RESPONSE_READ_TIME < startTime): 
-                # Wait until there is data waiting in the serial buffer
-                try:
-                    if (self.parent.serialPort.in_waiting > 0):
-                        # Read data out of the buffer until a carraige return / new line is found or until 12 bytes are read
-                        response = self.parent.serialPort.readline()
-                        readSuccess = True
-                        break
-                except serial.SerialException as e:
-                    MCRControl.log.error("Serial port connection lost {}".format(e))
-                    response = bytearray([0x74, 0x01, 0x0D])
-                    self.parent.boardCommunicationState = False
-                    return response
-                time.sleep(0.1)
+                return None, True, duration
 
-            if not readSuccess:
+            if response is None:
                 # timed out
                 MCRControl.log.warning("MCR send command timed out without response")
-                response = bytearray([0x74, 0x01, 0x0D])
                 self.parent.boardCommunicationState = False
-                return response
+                return None, False, duration
 
             # return response
-            if MCRControl.communicationDebugLevel: MCRControl.log.debug("  <- None") if response == None else MCRControl.log.debug("   <- {}".format(":".join("{:02x}".format(c) for c in response)))
+            if MCRControl.communicationDebugLevel: MCRControl.log.debug('   <- %s', hexFrame(response))
             self.parent.boardCommunicationState = True
-            return response
+            return response, False, duration
+
+        # send moves to several motors
+        def _sendMoveGroup(self, moves:dict[int, list[tuple[bytearray, int, float]]]) -> dict[int, bool]:
+            '''
+            Send move command sequences to several motors at the same time.  The first move of each motor is sent 
+            immediately.  When a move response is received, the next move of that motor is sent (after MCR_MOVE_REST_TIME).  
+            The move responses [0x74, status, 0x0D] don't include the motor ID so each response is matched to the motor 
+            that is expected to finish first.  
+            ### input: 
+            - moves: {motor ID: [(command byte string, wait time (ms), expected move time (s)), ...]}
+            ### return: 
+            {motor ID: success}
+            ### globals:  
+            - set self.parent.boardCommunicationState
+            '''
+            results = {motorID: False for motorID in moves}
+            worker = self.parent.comWorker
+            if isinstance(self.parent.serialPort, str) or worker is None:
+                MCRControl.log.error("Serial port not open")
+                self.parent.boardCommunicationState = False
+                return results
+            pending = {motorID: list(sequence) for motorID, sequence in moves.items() if len(sequence) > 0}
+            inFlight = {}           # {future: motor ID}
+            telemetry = self.parent.telemetry
+            sent = {}               # {future: (command, expected move time (s), send time)} for the telemetry stream
+
+            def send(motorID:int):
+                cmd, waitTime, moveTime = pending[motorID].pop(0)
+                if MCRControl.communicationDebugLevel: MCRControl.log.debug('   -> %s', hexFrame(cmd))
+                future = worker.submit(cmd, responseID(cmd[0]), (waitTime + RESPONSE_READ_TIME) / 1000, moveTime, waitTime)
+                inFlight[future] = motorID
+                if telemetry is not None:
+                    sent[future] = (bytes(cmd), moveTime, time.monotonic())
+
+            def record(future, response:bytes | None):
+                if telemetry is not None:
+                    cmd, moveTime, startTime = sent.pop(future)
+                    telemetry.command(cmd, response, (time.monotonic() - startTime) * 1000, predicted=moveTime * 1000)
+
+            with self.parent._motionLock, worker.transaction():
+                for motorID in pending:
+                    send(motorID)
+
+                while inFlight:
+                    # the worker matches each response to the motor that is expected to finish first
+                    try:
+                        done = worker.waitAny(list(inFlight))
+                    except serial.SerialException:
+                        done = [f for f in inFlight if f.done()]
+                    for future in done:
+                        motorID = inFlight.pop(future)
+                        try:
+                            response = future.result()
+                        except serial.SerialException as e:
+                            record(future, None)
+                            MCRControl.log.error("Serial port connection lost {}".format(e))
+                            self.parent.boardCommunicationState = False
+                            continue
+                        record(future, response)
+                        if response is None:
+                            MCRControl.log.warning(f"MCR motor 0x{motorID:02X} move timed out without response")
+                            self.parent.boardCommunicationState = False
+                            continue
+
+                        if MCRControl.communicationDebugLevel: MCRControl.log.debug('   <- %s', hexFrame(response))
+                        self.parent.boardCommunicationState = True
+                        if response[1] != 0x00:
+                            continue
+                        if pending[motorID]:
+                            time.sleep(MCR_MOVE_REST_TIME)
+                            send(motorID)
+                        else:
+                            results[motorID] = True
+            return results
         
 if __name__ == "__main__":
     print("TheiaMCR")
\ No newline at end of file
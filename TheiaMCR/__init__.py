@@ -8,5 +8,15 @@ __credits__ = 'Theia Technologies'
 
 #from TheiaMCR.TheiaMCR import *
 from .TheiaMCR import MCRControl
+from .asyncMCR import AsyncMCRControl
+from .mcrFleet import MCRFleet, LENS_PROFILES
+from .autoFocus import AutoFocus
+from .approachPlan import ApproachPlan
+from .lensSequence import LensSequence
+try:
+    from .trackingCurve import TrackingCurve, loadCurve, addCurve
+except ImportError:
+    # tracking curves require NumPy (pip install TheiaMCR[tracking])
+    pass
 from .errList import *
 from .rotatingLogFiles import *
\ No newline at end of file
@@ -0,0 +1,113 @@
+# Unidirectional approach planner for the MCR600 series boards
+# A batch of target steps (e.g. focus steps to visit for a focus sweep) is ordered so every target is approached
+# moving away from the PI.  Moves away from the PI are one motor move.  Only a move towards the PI (a direction
+# reversal) is backlash corrected with the overshoot and move back (see motor.moveRel) so the whole batch needs at
+# most one corrected move instead of one for each target approached towards the PI.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.0 261018
+
+from __future__ import annotations
+import time
+from typing import Any, Callable
+import TheiaMCR.errList as err
+from TheiaMCR.TheiaMCR import MCRControl, MCR_MOVE_REST_TIME
+
+class ApproachPlan():
+    log = MCRControl.log
+
+    def __init__(self, motor:MCRControl.motor, targets:list[int], reorder:bool=True):
+        '''
+        Plan the moves to visit a batch of target steps with one motor.  With reorder the targets are sorted in the
+        direction away from the PI (the first target is the closest to the PI).  Without reorder the targets are
+        visited in the given order and each move towards the PI is backlash corrected.  The targets are limited to
+        the motor range (0 ~ PI step if the limits are respected, otherwise 0 ~ max steps).
+
+        Use:
+        plan = ApproachPlan(MCR.focus, [5200, 4800, 5000, 5100])
+        plan.commands, plan.predictTime()
+        for visit in plan.run(callback=lambda step: camera.grab()):
+            visit['target'], visit['step'], visit['moveTime']
+        ### input:
+        - motor: initialized stepper motor (e.g. MCR.focus)
+        - targets: target steps
+        - reorder: (optional, True) sort the targets so all the targets are approached moving away from the PI
+        ### public functions:
+        - predictTime(self) -> float
+        - run(self, callback:Callable[[int], Any]|None=None) -> list[dict]
+        ### variables:
+        - order: targets in the visit order (limited to the motor range)
+        - moves: planned moves [(target, relative steps, motor moves)] from the current step when planned
+        - commands: number of motor move commands of the plan
+        '''
+        self.motor = motor
+        self.moves: list[tuple[int, int, list[int]]] = []
+        self.commands = 0
+        limited = [int(step) for step in targets]
+        if not motor.initialized:
+            # run() reports the error
+            self.order = limited
+            return
+        low, high = motor._stepRange()
+        limited = [min(max(step, low), high) for step in limited]
+        if limited != [int(step) for step in targets]:
+            ApproachPlan.log.warning(f'Approach plan targets limited to the motor range {low} ~ {high}')
+        if reorder:
+            # away from the PI is decreasing steps if the PI is at the high end of the range
+            limited.sort(reverse=(motor.PISide == 1))
+        self.order = limited
+        position = motor.currentStep
+        for step in self.order:
+            self.moves.append((step, step - position, motor._relMoves(step - position, position=position) if step != position else []))
+            position = step
+        self.commands = sum(len(moves) for _, _, moves in self.moves)
+
+    def predictTime(self) -> float:
+        '''
+        Predict the time of the moves with the motor move time model (see motor.predictMoveTime).
+        ### return:
+        [(ms) predicted time of the moves (not including the callback time)]
+        '''
+        speed = self.motor.currentSpeed
+        total = 0.0
+        for _, _, moves in self.moves:
+            total += sum(self.motor.moveModel.predict(m, speed) for m in moves)
+            total += max(0, len(moves) - 1) * MCR_MOVE_REST_TIME * 1000
+        return total
+
+    def run(self, callback:Callable[[int], Any] | None=None) -> list[dict]:
+        '''
+        Visit the targets.  The moves are recalculated from the current step (in case the motor moved after planning).
+        ### input:
+        - callback: (optional) function called with the step at each target (e.g. capture an image)
+        ### return:
+        [
+            {'target', 'step': step counter after the move, 'result': OK = 0 | error code, 'commands': motor moves,
+            'moveTime': (s) move time, 'callbackTime': (s), 'value': callback result}
+            for each target visited (the visits stop at the first failed move)
+        ]
+        '''
+        motor = self.motor
+        visits = []
+        if not motor.initialized:
+            ApproachPlan.log.error('ApproachPlan cannot be executed because the motor is not initialized.')
+            err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), motor.parent.errors)
+            return [{'target': self.order[0] if self.order else None, 'step': motor.currentStep, 'result': err.ERR_NOT_INIT,
+                'commands': 0, 'moveTime': 0.0, 'callbackTime': 0.0, 'value': None}]
+        for target in self.order:
+            steps = target - motor.currentStep
+            commands = len(motor._relMoves(steps)) if steps != 0 else 0
+            moveStart = time.monotonic()
+            result = motor.moveRel(steps) if steps != 0 else err.ERR_OK
+            visit = {'target': target, 'step': motor.currentStep, 'result': result, 'commands': commands,
+                'moveTime': time.monotonic() - moveStart, 'callbackTime': 0.0, 'value': None}
+            visits.append(visit)
+            if result != err.ERR_OK:
+                ApproachPlan.log.error(f'Approach plan move to step {target} failed')
+                break
+            if callback is not None:
+                callbackStart = time.monotonic()
+                visit['value'] = callback(motor.currentStep)
+                visit['callbackTime'] = time.monotonic() - callbackStart
+        return visits
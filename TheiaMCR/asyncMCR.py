@@ -0,0 +1,835 @@
+# Theia Technologies MCR asyncio control module
+# This module allows an asyncio application to control the MCR600 series lens control boards without blocking
+# the event loop during motor moves.  The motor functions are coroutines and use the same command byte strings
+# as the MCRControl class.  One event loop can drive several boards (one AsyncMCRControl instance per serial port).
+# See more information at https://github.com/cliquot22/TheiaMCR
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+from __future__ import annotations
+import asyncio
+import threading
+import time
+import serial
+import TheiaMCR.errList as err
+from TheiaMCR.comMetrics import comMetrics
+from TheiaMCR.comWorker import WORKER_LATE_RESPONSE_TIME
+from TheiaMCR.motionTelemetry import motionTelemetry
+from TheiaMCR.mcrProtocol import (frameParser, hexFrame, responseID, FRAME_GAP_TIME, MCR_NO_RESPONSE, MCR_MOTOR_ID_RESPONSES,
+    MCR_RELATIVE_MOVES, FW_REVISION_FRAME, BOARD_SN_FRAME, FAILED_RESPONSE)
+from TheiaMCR.TheiaMCR import (MCRControl, commandAttempts, retryBackoff, RESPONSE_READ_TIME, MCR_FOCUS_MOTOR_ID, MCR_ZOOM_MOTOR_ID,
+    MCR_IRIS_MOTOR_ID, MCR_IRC_MOTOR_ID, MCR_FOCUS_ZOOM_MOTORS_IDS, MCR_STEPPER_MOTORS_IDS, MCR_IRIS_DEFAULT_SPEED, MCR_IRC_DEFAULT_SPEED,
+    MCR_IRC_SWITCH_TIME, MCR_MOVE_REST_TIME, MCR_RETRY_ATTEMPTS)
+
+##### initialization check ########################################
+class asyncMCRInitFailed:
+    '''
+    Coroutine version of MCRInitFailed.  Any motor function returns ERR_NOT_INIT when the board or motor is not initialized.
+    '''
+    initialized = False
+    currentStep = 0
+    PIStep = 0
+    PISide = -1
+    maxSteps = 0
+    currentSpeed = 0
+    homingSpeed = 0
+    respectLimits = False
+
+    def __getattr__(self, name):
+        async def method(*args, **kwargs):
+            MCRControl.log.error(f'{name} cannot be executed because MCRBoard is not initialized.')
+            err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine())
+            return err.ERR_NOT_INIT
+        return method
+
+##### asyncio serial transport ####################################
+class serialTransport(asyncio.Transport):
+    def __init__(self, loop:asyncio.AbstractEventLoop, protocol:asyncio.Protocol, serialPort:serial.Serial):
+        '''
+        Asyncio transport for a pyserial port.  A reader thread blocks on the serial port and passes the received bytes
+        to the protocol in the event loop.  This works for Windows and Linux ports (no file descriptor polling).
+        ### input:
+        - loop: the running event loop
+        - protocol: protocol receiving the data (MCRProtocol)
+        - serialPort: open pyserial port
+        '''
+        super().__init__()
+        self._loop = loop
+        self._protocol = protocol
+        self._serialPort = serialPort
+        self._closing = False
+        self._lostError: Exception | None = None      # write error reported by the reader thread
+        self._readerThread = threading.Thread(target=self._readLoop, name=f'TheiaMCR reader {serialPort.port}', daemon=True)
+        self._protocol.connection_made(self)
+        self._readerThread.start()
+
+    def _readLoop(self):
+        '''
+        (reader thread) Read the serial port until the transport is closed or the port is lost.
+        '''
+        exc = None
+        while not self._closing:
+            try:
+                data = self._serialPort.read(max(1, self._serialPort.in_waiting))
+            except (serial.SerialException, TypeError, AttributeError) as e:
+                # TypeError/AttributeError are raised by pyserial when the port is closed during a read
+                exc = None if self._closing else e
+                break
+            if data:
+                self._loop.call_soon_threadsafe(self._protocol.data_received, data)
+        if exc is None:
+            exc = self._lostError
+        self._closing = True
+        try:
+            self._serialPort.close()
+        except serial.SerialException:
+            pass
+        try:
+            self._loop.call_soon_threadsafe(self._protocol.connection_lost, exc)
+        except RuntimeError:
+            # event loop is already closed
+            pass
+
+    def write(self, data:bytes):
+        '''
+        Write the data to the serial port.  Command frames are short so the write does not block the event loop.
+        A write error stops the reader thread, which reports the lost connection to the protocol.
+        '''
+        if self._closing:
+            return
+        try:
+            self._serialPort.write(data)
+        except serial.SerialException as e:
+            self._lostError = e
+            self._closing = True
+            if hasattr(self._serialPort, 'cancel_read'):
+                self._serialPort.cancel_read()
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self):
+        '''
+        Stop the reader thread.  The serial port is closed by the reader thread.
+        '''
+        if self._closing:
+            return
+        self._closing = True
+        if hasattr(self._serialPort, 'cancel_read'):
+            self._serialPort.cancel_read()
+
+##### MCR protocol ################################################
+class MCRProtocol(asyncio.Protocol):
+    def __init__(self):
+        '''
+        Split the received bytes into MCR response frames (see frameParser).  Only one command is in flight per board
+        so a frame that starts with the response ID of the pending command is its response.  Bytes received while no
+        command is pending are discarded.  The response of a command that timed out is still expected for
+        WORKER_LATE_RESPONSE_TIME (see comWorker): the late response is discarded and the next command with the same
+        response waits for it (lateResponse) so it can't be completed with the late response.
+        '''
+        self.transport: serialTransport | None = None
+        self.parser = frameParser()
+        self.frameStart = 0.0                   # (monotonic time) first byte of the last frame received (for the metrics)
+        self._pending: tuple[int, asyncio.Future] | None = None
+        self._late: tuple[int, int | None, float, asyncio.Future] | None = None    # (response ID, motor ID, expiry time, arrived)
+        self._gapTimer: asyncio.TimerHandle | None = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data:bytes):
+        self._cancelGapTimer()
+        if self.parser.pending == 0:
+            self.frameStart = time.monotonic()
+        self._checkFrames(self.parser.feed(data, self._expected()))
+        if self.parser.pending > 0:
+            # discard an incomplete frame if the rest of the frame doesn't arrive
+            self._gapTimer = asyncio.get_running_loop().call_later(FRAME_GAP_TIME, self._resync)
+
+    def connection_lost(self, exc):
+        self.transport = None
+        self._cancelGapTimer()
+        if self._pending is not None and not self._pending[1].done():
+            self._pending[1].set_exception(exc if exc is not None else serial.SerialException('serial port closed'))
+
+    def expect(self, cmdID:int, future:asyncio.Future):
+        '''
+        Set the pending command.  A response that is already in the buffer completes the future immediately.
+        ### input:
+        - cmdID: command byte sent to the board
+        - future: completed with the response frame
+        '''
+        self._pending = (cmdID, future)
+        self._checkFrames(self.parser.feed(b'', self._expected()))
+
+    def clear(self):
+        ''' Clear the pending command (after the response or a timeout). '''
+        self._pending = None
+
+    def timedOut(self, cmd:bytes):
+        '''
+        The command timed out: discard its response if it arrives in the next WORKER_LATE_RESPONSE_TIME.
+        '''
+        self._late = (*self._responseKey(cmd), time.monotonic() + WORKER_LATE_RESPONSE_TIME, asyncio.get_running_loop().create_future())
+
+    async def lateResponse(self, cmd:bytes):
+        '''
+        Wait until the late response of a command that timed out with the same response as the command arrived or
+        the time expired.
+        '''
+        late = self._late
+        if late is None or late[:2] != self._responseKey(cmd):
+            return
+        remaining = late[2] - time.monotonic()
+        if remaining > 0:
+            try:
+                await asyncio.wait_for(asyncio.shield(late[3]), remaining)
+            except asyncio.TimeoutError:
+                pass
+        if self._late is late:
+            self._late = None
+
+    def _responseKey(self, cmd:bytes) -> tuple[int, int | None]:
+        ''' response ID and motor ID (None if the response doesn't include the motor ID) of a command '''
+        rid = responseID(cmd[0])
+        return rid, cmd[1] if rid in MCR_MOTOR_ID_RESPONSES and len(cmd) > 1 else None
+
+    def _expected(self) -> set[int]:
+        expected = {responseID(self._pending[0])} if self._pending is not None else set()
+        if self._late is not None and time.monotonic() < self._late[2]:
+            expected.add(self._late[0])
+        return expected
+
+    def _resync(self):
+        self._gapTimer = None
+        self._checkFrames(self.parser.resync(self._expected()))
+
+    def _cancelGapTimer(self):
+        if self._gapTimer is not None:
+            self._gapTimer.cancel()
+            self._gapTimer = None
+
+    def _checkFrames(self, frames:list[bytes]):
+        for frame in frames:
+            late = self._late
+            if late is not None and late[0] == frame[0] and (late[1] is None or (len(frame) > 1 and frame[1] == late[1])):
+                self._late = None
+                if time.monotonic() < late[2]:
+                    AsyncMCRControl.log.debug('Late response discarded %s', hexFrame(frame))
+                    late[3].set_result(frame)
+                    continue
+            if self._pending is not None and not self._pending[1].done():
+                self._pending[1].set_result(frame)
+                self._pending = None
+            else:
+                AsyncMCRControl.log.warning("Unexpected response discarded {}".format(":".join("{:02x}".format(c) for c in frame)))
+
+#####################################################################################
+# AsyncMCRControl class
+class AsyncMCRControl():
+    log = MCRControl.log
+
+    def __init__(self, serialPortName:str, telemetry:bool|str=False):
+        '''
+        This class is the asyncio version of MCRControl.  The board and motor functions are coroutines so the event
+        loop keeps running while the motors move.  The serial port is opened with open() (or 'async with').
+        Logging is shared with MCRControl (MCRControl.log).
+
+        Use:
+        async with AsyncMCRControl('com4') as MCR:
+            await MCR.focusInit(8390, 7959)
+            await MCR.focus.moveAbs(6000)
+        ### input:
+        - serialPortName: the serial port name of the board (e.g. "com21" or "/dev/ttyAMA0").
+        - telemetry (optional boolean or folder: False): Set true (or to a folder name) to record every command in the
+            telemetry files of the board when it is opened (see MCRControl telemetry).
+        ### Public functions:
+        - open(self) -> bool
+        - close(self)
+        - focusInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1) -> bool
+        - zoomInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1) -> bool
+        - irisInit(self, steps:int, move:bool=True, homingSpeed:int=-1) -> bool
+        - IRCInit(self) -> bool
+        - readFWRevision(self) -> str
+        - readBoardSN(self) -> str
+        ### instance variables
+        - boardInitialized: set to True when the com port is open and the board responded
+        - boardCommunicationState: set to True when the board communication is successful
+        - retryAttempts: number of times an idempotent command is sent if the board doesn't respond (see MCRControl).
+            The serial port is not reopened: the retries stop if the serial port connection is lost.
+        - metrics: serial command metrics (comMetrics, see MCRControl)
+        - telemetry: command telemetry stream (motionTelemetry) or None if telemetry is not recorded
+        - errors: errors of this board (errList.errorRecorder, see MCRControl)
+        ### Sub-classes:
+        - motor
+        '''
+        self.focus: AsyncMCRControl.motor | asyncMCRInitFailed = asyncMCRInitFailed()
+        self.zoom: AsyncMCRControl.motor | asyncMCRInitFailed = asyncMCRInitFailed()
+        self.iris: AsyncMCRControl.motor | asyncMCRInitFailed = asyncMCRInitFailed()
+        self.IRC: AsyncMCRControl.motor | asyncMCRInitFailed = asyncMCRInitFailed()
+        self.serialPortName = serialPortName
+        self.boardInitialized = False
+        self.boardCommunicationState = False
+        self._transport: serialTransport | None = None
+        self._protocol = MCRProtocol()
+        self._cmdLock: asyncio.Lock | None = None
+        self.retryAttempts = MCR_RETRY_ATTEMPTS
+        self.metrics = comMetrics({'port': serialPortName})
+        self.telemetry: motionTelemetry | None = None
+        self._telemetryFolder = telemetry
+        self.errors = err.errorRecorder()
+        self.raiseErrors = False                    # errors are returned (the MCRControl raiseErrors mode is not supported)
+        self.journal = None                         # the position journal is not supported
+
+    async def __aenter__(self) -> AsyncMCRControl:
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    # open the board
+    async def open(self) -> bool:
+        '''
+        Open the serial port and confirm communication by reading the board firmware version.
+        ### return:
+        [True if the board is initialized]
+        '''
+        loop = asyncio.get_running_loop()
+        self._cmdLock = asyncio.Lock()
+        if self.serialPortName.startswith('mcrsim://'):
+            import TheiaMCR.mcrSimulator            # registers the mcrsim:// URL handler
+        try:
+            serialPort = await loop.run_in_executor(None, lambda: serial.serial_for_url(
+                self.serialPortName,
+                baudrate=115200,
+                bytesize=8,
+                timeout=0.1,
+                stopbits=serial.STOPBITS_ONE,
+            ))
+        except serial.SerialException as e:
+            AsyncMCRControl.log.error("Serial port not open {}".format(e))
+            err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.errors)
+            return False
+        AsyncMCRControl.log.debug('Serial communication opened on %s successfully', self.serialPortName)
+        self._transport = serialTransport(loop, self._protocol, serialPort)
+        self.boardInitialized = True
+
+        response = await self.readFWRevision()
+        if response == '' or int(response.rsplit('.', -1)[0]) < 5:
+            AsyncMCRControl.log.error("Error: No response received from MCR controller")
+            err.saveError(err.ERR_NO_COMMUNICATION, err.MOD_MCR, err.errLine(), self.errors)
+            await self.close()
+            return False
+        if self._telemetryFolder:
+            await self._openTelemetry(None if self._telemetryFolder is True else self._telemetryFolder)
+        return True
+
+    # open the telemetry stream
+    async def _openTelemetry(self, directory:str | None=None) -> bool:
+        '''
+        Open the command telemetry stream of the board (see MCRControl._openTelemetry).
+        ### return:
+        [True if the telemetry stream is open]
+        '''
+        sn = await self.readBoardSN()
+        try:
+            self.telemetry = motionTelemetry(sn if sn != '' else self.serialPortName, directory)
+        except OSError as e:
+            AsyncMCRControl.log.warning(f'Telemetry not recorded ({e})')
+            return False
+        AsyncMCRControl.log.info(f'Telemetry folder {self.telemetry.directory}')
+        return True
+
+    # close the board
+    async def close(self):
+        '''
+        Close the serial port and release the motors.
+        '''
+        AsyncMCRControl.log.debug('_close (exit)')
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
+        self.focus = asyncMCRInitFailed()
+        self.zoom = asyncMCRInitFailed()
+        self.iris = asyncMCRInitFailed()
+        self.IRC = asyncMCRInitFailed()
+        self.boardInitialized = False
+        self.boardCommunicationState = False
+
+    # Motor initialization
+    async def focusInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1) -> bool:
+        '''
+        Initialize the focus motor (see MCRControl.focusInit).
+        '''
+        self.focus = await self._motorInit(MCR_FOCUS_MOTOR_ID, steps, pi, move, accel, homingSpeed)
+        return self.focus.initialized
+
+    async def zoomInit(self, steps:int, pi:int, move:bool=True, accel:int=0, homingSpeed:int=-1) -> bool:
+        '''
+        Initialize the zoom motor (see MCRControl.zoomInit).
+        '''
+        self.zoom = await self._motorInit(MCR_ZOOM_MOTOR_ID, steps, pi, move, accel, homingSpeed)
+        return self.zoom.initialized
+
+    async def irisInit(self, steps:int, move:bool=True, homingSpeed:int=-1) -> bool:
+        '''
+        Initialize the iris motor (see MCRControl.irisInit).
+        '''
+        self.iris = await self._motorInit(MCR_IRIS_MOTOR_ID, steps, 0, move, 0, homingSpeed)
+        return self.iris.initialized
+
+    async def IRCInit(self) -> bool:
+        '''
+        Initialize the IRC motor (see MCRControl.IRCInit).
+        '''
+        self.IRC = await self._motorInit(MCR_IRC_MOTOR_ID, 1000, 0, False)
+        return self.IRC.initialized
+
+    async def _motorInit(self, motorID:int, steps:int, pi:int, move:bool, accel:int=0, homingSpeed:int=-1) -> AsyncMCRControl.motor | asyncMCRInitFailed:
+        '''
+        Create and initialize a motor instance.
+        ### return:
+        [motor instance | asyncMCRInitFailed if the board isn't initialized]
+        '''
+        if not self.boardInitialized:
+            AsyncMCRControl.log.warning(f'motor {motorID} init can\'t be called because board isn\'t initialized')
+            return asyncMCRInitFailed()
+        AsyncMCRControl.log.debug('_init,%s', motorID)
+        motor = self.motor(self, motorID, steps, pi, accel=accel, homingSpeed=homingSpeed)
+        await motor._init(move)
+        return motor
+
+    # ----------- board information --------------------
+    async def readFWRevision(self) -> str:
+        '''
+        Get FW revision on the board (see MCRControl.controllerClass.readFWRevision).
+        ### return:
+        [string representing the FW revision (ex. '5.3.1.0.0') or '' if error reading the board FW]
+        '''
+        response = await self._sendCmd(FW_REVISION_FRAME)
+        if response[0] != 0x76:
+            AsyncMCRControl.log.error("Error: No resonse received from MCR controller")
+            return ''
+        fw = (".".join("{:x}".format(c) for c in response))[3:-2]
+        AsyncMCRControl.log.info(f"FW revision: {fw}")
+        return fw
+
+    async def readBoardSN(self) -> str:
+        '''
+        Get the serial number of the board (see MCRControl.controllerClass.readBoardSN).
+        ### return:
+        [string with serial number or '' if error reading the board]
+        '''
+        response = await self._sendCmd(BOARD_SN_FRAME)
+        if response[0] != 0x79:
+            AsyncMCRControl.log.error("Error: No resonse received from MCR controller")
+            return ''
+        sn = f'{response[1]:02x}{response[2]:02x}'[:-1]
+        sn += f'-{response[-4]:02x}{response[-3]:02x}{response[-2]:02x}'
+        AsyncMCRControl.log.info(f"Board serial number {sn}")
+        return sn
+
+    # verify communication
+    async def _verifyCommunication(self) -> bool:
+        '''
+        Verify communication with the board by reading the FW revision (see MCRControl.MCRCom._verifyCommunication).
+        The serial port is not reopened if the board doesn't respond: close and open the board again.
+        ### return:
+        [True if the board responded]
+        '''
+        response = await self._sendCmd(FW_REVISION_FRAME)
+        if response[0] != FW_REVISION_FRAME[0]:
+            return False
+        AsyncMCRControl.log.info('MCR communication verified: %s', hexFrame(response))
+        return True
+
+    # send a command
+    async def _sendCmd(self, cmd:bytes, waitTime:int=10, moveSteps:int | None=None, predicted:float | None=None) -> bytes:
+        '''
+        Send the command byte string and wait (without blocking the event loop) for the response frame.
+        Commands to the same board are sent one at a time.
+        The idempotent commands are sent again if there is no response, up to retryAttempts times with the backoff wait
+        of MCRControl (see MCRControl.MCRCom._sendCmd).  The serial port is not reopened before a retry.
+        ### input:
+        - cmd: byte string to send
+        - waitTime (optional): (ms) expected command (move) time.  The response is awaited up to waitTime + RESPONSE_READ_TIME.
+        - moveSteps, predicted (optional): motor steps and (ms) predicted time of a move command for the telemetry stream
+        ### return:
+        [response byte string | [0x74, 0x01, 0x0D] if there was no response]
+        ### globals:
+        - set boardCommunicationState
+        '''
+        response, _, _ = await self._sendCmdStatus(cmd, waitTime, moveSteps, predicted)
+        return FAILED_RESPONSE if response is None else response
+
+    # send a command with the attempt status
+    async def _sendCmdStatus(self, cmd:bytes, waitTime:int=10, moveSteps:int | None=None, predicted:float | None=None) -> tuple[bytes | None, int, float]:
+        '''
+        Send the command with the retries of the idempotent commands (see _sendCmd).
+        ### return:
+        [return byte string from MCR | None if there was no response, number of attempts, (ms) duration of the last attempt]
+        '''
+        attempts = commandAttempts(cmd, self.retryAttempts)
+        response, duration = await self._sendOnce(cmd, waitTime, moveSteps, predicted)
+        attempt = 1
+        while response is None and attempt < attempts and self._transport is not None and not self._transport.is_closing():
+            backoff = retryBackoff(attempt)
+            attempt += 1
+            AsyncMCRControl.log.warning('Retrying command 0x%02X in %.0f ms (attempt %d of %d)', cmd[0], backoff * 1000, attempt, attempts)
+            await asyncio.sleep(backoff)
+            self.metrics.retry(cmd)
+            response, duration = await self._sendOnce(cmd, waitTime, moveSteps, predicted)
+        return response, attempt, duration
+
+    # send a command once
+    async def _sendOnce(self, cmd:bytes, waitTime:int, moveSteps:int | None, predicted:float | None) -> tuple[bytes | None, float]:
+        '''
+        Send the command and wait for the response (see _sendCmd).
+        ### return:
+        [response byte string | None if there was no response, (ms) time from sending the command to the response]
+        '''
+        if self._cmdLock is None:
+            AsyncMCRControl.log.error("Serial port not open")
+            return None, 0.0
+        async with self._cmdLock:
+            if self._transport is None or self._transport.is_closing():
+                AsyncMCRControl.log.error("Serial port not open")
+                self.boardCommunicationState = False
+                return None, 0.0
+            await self._protocol.lateResponse(cmd)
+
+            if MCRControl.communicationDebugLevel: AsyncMCRControl.log.debug('   -> %s', hexFrame(cmd))
+            future = asyncio.get_running_loop().create_future()
+            self._transport.write(cmd)
+            writeTime = time.monotonic()
+            if self._transport.is_closing():
+                # the write failed (the reader thread reports the lost connection)
+                AsyncMCRControl.log.error("Serial port connection lost")
+                self._record(cmd, None, 'error', waitTime, None, moveSteps, predicted)
+                self.boardCommunicationState = False
+                return None, 0.0
+            if cmd[0] in MCR_NO_RESPONSE:
+                # set communication path does not generate a response
+                self._record(cmd, MCR_NO_RESPONSE[cmd[0]], 'ok', waitTime, writeTime, moveSteps, predicted)
+                self.boardCommunicationState = True
+                return MCR_NO_RESPONSE[cmd[0]], (time.monotonic() - writeTime) * 1000
+            self._protocol.expect(cmd[0], future)
+            try:
+                response = await asyncio.wait_for(future, (waitTime + RESPONSE_READ_TIME) / 1000)
+            except asyncio.TimeoutError:
+                AsyncMCRControl.log.warning("MCR send command timed out without response")
+                self._protocol.timedOut(cmd)
+                self._record(cmd, None, 'timeout', waitTime, writeTime, moveSteps, predicted)
+                self.boardCommunicationState = False
+                return None, (time.monotonic() - writeTime) * 1000
+            except serial.SerialException as e:
+                AsyncMCRControl.log.error("Serial port connection lost {}".format(e))
+                self._record(cmd, None, 'error', waitTime, writeTime, moveSteps, predicted)
+                self.boardCommunicationState = False
+                return None, (time.monotonic() - writeTime) * 1000
+            finally:
+                self._protocol.clear()
+            self._record(cmd, response, 'ok', waitTime, writeTime, moveSteps, predicted)
+
+        if MCRControl.communicationDebugLevel: AsyncMCRControl.log.debug('   <- %s', hexFrame(response))
+        self.boardCommunicationState = True
+        return response, (time.monotonic() - writeTime) * 1000
+
+    def _record(self, cmd:bytes, response:bytes | None, outcome:str, waitTime:int, writeTime:float | None, moveSteps:int | None, predicted:float | None):
+        '''
+        Record a completed command in the command metrics and the telemetry stream.
+        ### input:
+        - cmd: command byte string
+        - response: response frame | None if there was no response
+        - outcome: 'ok' | 'timeout' | 'error'
+        - waitTime: (ms) command wait time
+        - writeTime: (monotonic time) command written or None if the write failed
+        - moveSteps, predicted: motor steps and (ms) predicted time of a move command (or None)
+        '''
+        endTime = time.monotonic()
+        bytesRead = len(response) if response is not None and cmd[0] not in MCR_NO_RESPONSE else 0
+        firstByteTime = max(writeTime, self._protocol.frameStart) if bytesRead > 0 and writeTime is not None else None
+        self.metrics.record(cmd, bytesRead, outcome, waitTime, writeTime, firstByteTime, endTime)
+        if self.telemetry is not None:
+            self.telemetry.command(cmd, response, (endTime - writeTime) * 1000 if writeTime is not None else 0.0, moveSteps, predicted)
+
+    ######################################################################################################
+    # Motor definition class
+    class motor(MCRControl.motor):
+        def __init__(self, parent:AsyncMCRControl, motorID:int, steps:int, pi:int, accel:int=0, homingSpeed:int=-1):
+            '''
+            Coroutine version of the MCRControl.motor class.  The move functions (home, moveAbs, moveRel, state),
+            setRespectLimits, readMotorSetup and writeMotorSetup must be awaited.  The setting functions (setMotorSpeed,
+            setHomingSpeed) and the instance variables are the same as MCRControl.motor.
+            The motor is initialized on the board by AsyncMCRControl (focusInit, etc).
+            '''
+            self.parent = parent
+            self.initialized = False
+            self._speedRange = self._initParameters(motorID, steps, pi, accel, homingSpeed)
+
+        async def _init(self, move:bool):
+            '''
+            Initialize the motor on the board and move to the home position.
+            ### input:
+            - move: move the motor to the home position after initializing
+            '''
+            self.initialized = await self._motorInit(pi=self.PIStep, steps=self.maxSteps, speedRange=self._speedRange)
+            if not self.initialized:
+                MCRControl.log.error('Motor not initialized')
+                err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), self.parent.errors)
+            if move and self.motorID != MCR_IRC_MOTOR_ID:
+                error = await self.home()
+                if error != 0:
+                    err.saveError(error, err.MOD_MCR, err.errLine(), self.parent.errors)
+
+        # Home
+        async def home(self) -> int:
+            '''
+            Send the motor to the PI location (see MCRControl.motor.home).
+            ### return:
+            [OK = 0 | err_bad_move | err_not_supported]
+            '''
+            MCRControl.log.debug('_home,%s', self.motorID)
+            if self.motorID not in MCR_STEPPER_MOTORS_IDS:
+                MCRControl.log.warning(f'"home" function not supported by motor {self.motorID}')
+                return err.ERR_NOT_SUPPORTED
+
+            setIgnoreLimitsToFalse = False
+            if not self.respectLimits:
+                setIgnoreLimitsToFalse = True
+                await self.setRespectLimits(True)
+
+            homeSpeed = self.homingSpeed if self.motorID in MCR_FOCUS_ZOOM_MOTORS_IDS else MCR_IRIS_DEFAULT_SPEED
+            awaySteps = self._awaySteps()
+            if awaySteps != 0:
+                await self._motorMove(steps=awaySteps, speed=self.homingSpeed, acceleration=self.acceleration)
+                await asyncio.sleep(MCR_MOVE_REST_TIME)
+            success = await self._motorMoveTo(finalStep=self.PIStep, speed=homeSpeed, acceleration=self.acceleration)
+
+            if setIgnoreLimitsToFalse: await self.setRespectLimits(False)
+            self.currentStep = self.PIStep
+            self._setReferenced(success)
+            if not success:
+                MCRControl.log.error(f"Error: Motor 0x{self.motorID:02X} move error")
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
+                return err.ERR_BAD_MOVE
+            MCRControl.log.debug('_finalStep,%s,,%s', self.motorID, self.currentStep)
+            return err.ERR_OK
+
+        # moveAbs
+        async def moveAbs(self, step:int) -> int:
+            '''
+            Move the motor to the absolute step number (see MCRControl.motor.moveAbs).
+            ### return:
+            [OK = 0 | err_bad_move | err_range | err_not_supported]
+            '''
+            MCRControl.log.debug('_moveAbs,%s,%s', self.motorID, step)
+            if self.motorID not in MCR_STEPPER_MOTORS_IDS:
+                MCRControl.log.warning(f'"moveAbs" function not supported by motor {self.motorID}')
+                return err.ERR_NOT_SUPPORTED
+            if step < 0:
+                MCRControl.log.warning("Warning: Target step cannot be negative")
+                return err.ERR_RANGE
+
+            step, additionalMoveSteps = self._absTarget(step)
+            relSteps = self._trustedSteps(step)
+            if relSteps is not None:
+                MCRControl.log.debug('_trustedMove,%s,%s', self.motorID, relSteps)
+                return await self.moveRel(relSteps)
+
+            awaySteps = self._awaySteps()
+            if awaySteps != 0:
+                await self._motorMove(steps=awaySteps, speed=self.currentSpeed, acceleration=self.acceleration)
+                await asyncio.sleep(MCR_MOVE_REST_TIME)
+
+            success = await self._motorMoveTo(finalStep=step, speed=self.currentSpeed, acceleration=self.acceleration)
+            self._setReferenced(success)
+            if not success:
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
+                return err.ERR_BAD_MOVE
+            if additionalMoveSteps != 0:
+                await asyncio.sleep(MCR_MOVE_REST_TIME)
+                success = await self._motorMove(steps=additionalMoveSteps, speed=self.currentSpeed, acceleration=self.acceleration)
+                if not success:
+                    self._setReferenced(False)
+                    err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
+                    return err.ERR_BAD_MOVE
+
+            self.currentStep = step
+            MCRControl.log.debug('_finalStep,%s,,%s', self.motorID, self.currentStep)
+            return err.ERR_OK
+
+        # moveRel
+        async def moveRel(self, steps:int, correctForBL:bool=True) -> int:
+            '''
+            Move the motor by a number of steps (see MCRControl.motor.moveRel).
+            ### return:
+            [OK = 0 | err_bad_move | err_not_supported]
+            '''
+            MCRControl.log.debug('_moveRel,%s,%s', self.motorID, steps)
+            if self.motorID not in MCR_STEPPER_MOTORS_IDS:
+                MCRControl.log.warning(f'"moveRel" function not supported by motor {self.motorID}')
+                return err.ERR_NOT_SUPPORTED
+            if steps == 0:
+                return err.ERR_OK
+
+            limit, steps = self._checkLimits(steps, self.respectLimits)
+            if self.respectLimits and (limit != 0):
+                MCRControl.log.warning(f'Limiting focus relative steps to {steps}')
+
+            success = False
+            moves = self._relMoves(steps, correctForBL)
+            for i, moveSteps in enumerate(moves):
+                if i > 0:
+                    await asyncio.sleep(MCR_MOVE_REST_TIME)
+                success = await self._motorMove(moveSteps, self.currentSpeed, self.acceleration)
+
+            self.currentStep += steps
+            self._countRelMoves(moves, success)
+            if not success:
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), self.parent.errors)
+                return err.ERR_BAD_MOVE
+            MCRControl.log.debug('_finalStep,%s,,%s', self.motorID, self.currentStep)
+            return err.ERR_OK
+
+        # IRCState
+        async def state(self, state:int) -> int:
+            '''
+            Set the IRC state (see MCRControl.motor.state).
+            ### return:
+            [new state (1 | 2) | error code] (error code <0)
+            '''
+            MCRControl.log.debug('_state,%s,%s', self.motorID, state)
+            if self.motorID != MCR_IRC_MOTOR_ID:
+                MCRControl.log.warning(f'"state" function not supported by motor {self.motorID}')
+                return err.ERR_NOT_SUPPORTED
+            sw = MCR_IRC_SWITCH_TIME if state != 1 else -MCR_IRC_SWITCH_TIME
+            success = await self._motorMove(steps=sw, speed=MCR_IRC_DEFAULT_SPEED)
+            if not success: return err.ERR_BAD_MOVE
+            return state
+
+        # setRespectLimits
+        async def setRespectLimits(self, state:bool):
+            '''
+            Set the flag to stop motor moves at the PI limits (see MCRControl.motor.setRespectLimits).
+            ### return:
+            [state (T/F) or None if motor doesn't have PI]
+            '''
+            if self.motorID not in MCR_FOCUS_ZOOM_MOTORS_IDS:
+                MCRControl.log.info('No PI for this motor')
+                return None
+            MCRControl.log.info(f'PI limit for {"focus" if self.motorID == MCR_FOCUS_MOTOR_ID else "zoom"} set to {state}')
+            self.respectLimits = state
+            await self._regardLimits(state, self.PISide)
+            return self.respectLimits
+
+        # read/write motor configurations to EEPROM
+        async def readMotorSetup(self, refresh:bool=False) -> tuple[bool, int, bool, bool, int, int, int, int]:
+            '''
+            Read the configuration of the motor (see MCRControl.motor.readMotorSetup).
+            '''
+            if self._motorSetup is not None and not refresh:
+                return True, *self._motorSetup, err.ERR_OK
+            response = await self.parent._sendCmd(self.frames.readSetup)
+            return self._parseMotorSetup(response)
+
+        async def writeMotorSetup(self, useWideFarStop:bool, useTeleNearStop:bool, maxSteps:int, minSpeed:int, maxSpeed:int) -> bool:
+            '''
+            Write the configuration of the motor (see MCRControl.motor.writeMotorSetup).
+            '''
+            MCRControl.log.debug('_writeMotorSetup,%s,%s,%s,%s,%s,%s', self.motorID, useWideFarStop, useTeleNearStop, maxSteps, minSpeed, maxSpeed)
+            command = self._motorSetupFrame(useWideFarStop, useTeleNearStop, maxSteps, minSpeed, maxSpeed)
+            response = await self.parent._sendCmd(command)
+            return self._checkWriteMotorSetup(command, response)
+
+        ############ internal functions ##############################################################
+        async def _motorInit(self, steps:int, pi:int, speedRange:int) -> bool:
+            '''
+            Initialize the motor steps and speeds on the board (see MCRControl.motor._motorInit).
+            '''
+            speeds = {1: (100, 1500), 2: (10, 200)}.get(speedRange, (10, 1000))
+            useWideFarStop = useTeleNearStop = False
+            if self.motorID in MCR_FOCUS_ZOOM_MOTORS_IDS:
+                useWideFarStop = (steps - pi) < pi
+                useTeleNearStop = not useWideFarStop
+            command = self._motorSetupFrame(useWideFarStop, useTeleNearStop, int(steps), speeds[0], speeds[1])
+            response = await self.parent._sendCmd(command)
+            self._motorSetup = self._setupFromFrame(command)
+            if response[1] == 0x01:
+                MCRControl.log.error("Error: Motor init failed")
+                self._motorSetup = None
+                err.saveError(err.ERR_NO_COMMUNICATION if self.parent.boardCommunicationState else err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
+                return False
+            return True
+
+        async def _motorMoveTo(self, finalStep:int, speed:int, acceleration:int=0) -> bool:
+            '''
+            Move to an absolute step position using the built-in FW function 0x73 (see MCRControl.motor._motorMoveTo).
+            '''
+            if finalStep < 0:
+                MCRControl.log.error("Error: final step must be positive for absolute move")
+                return False
+            success = False
+            for cmd, step, waitTime in self._moveToCommands(finalStep, speed):
+                success = await self._motorMoveCommand(FWCommand=cmd, steps=step, speed=speed, acceleration=acceleration, waitTime=waitTime)
+            return success
+
+        async def _motorMove(self, steps:int, speed:int, acceleration:int=0) -> bool:
+            '''
+            Move the motor by a number of steps (see MCRControl.motor._motorMove).
+            '''
+            cmd, steps, waitTime = self._moveCommand(steps, speed)
+            return await self._motorMoveCommand(FWCommand=cmd, steps=steps, speed=speed, acceleration=acceleration, waitTime=waitTime)
+
+        async def _motorMoveCommand(self, FWCommand:int, steps:int, speed:int, acceleration:int=0, waitTime:int=0) -> bool:
+            '''
+            Send the move command and await the move response.
+            ### return:
+            [success]
+            '''
+            moveSteps = self._moveToSteps(FWCommand, steps) if FWCommand != 0x73 or self.positionReferenced else None
+            predicted = self.moveModel.predict(moveSteps, speed) if moveSteps is not None else None
+            response, attempts, duration = await self.parent._sendCmdStatus(self.frames.move(FWCommand, int(steps), int(speed)), waitTime, moveSteps, predicted)
+            responded = response is not None
+            if not responded:
+                response = FAILED_RESPONSE
+            if response[1] == 0x00 and moveSteps is not None and attempts == 1:
+                # only the first attempt times the move (a retry includes the timeouts and the backoff)
+                self.moveModel.observe(moveSteps, speed, duration)
+            if response[1] != 0x00:
+                MCRControl.log.error(f"Error: motor 0x{self.motorID:02X} move command failed (timed out or bad response)")
+                if FWCommand in MCR_RELATIVE_MOVES and not responded:
+                    # the move may have been done: don't send it again, the position needs a PI reference
+                    MCRControl.log.warning(f'Motor 0x{self.motorID:02X} position needs a re-sync (home or moveAbs)')
+                    self.positionResync = True
+                    self.parent.metrics.resync(self.motorID)
+                await self.parent._verifyCommunication()
+                if not self.parent.boardCommunicationState:
+                    err.saveError(err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
+                return False
+            return True
+
+        async def _regardLimits(self, state:bool=True, PISide:int=1) -> bool:
+            '''
+            Set the regard limits flag in the board software (see MCRControl.motor._regardLimits).  The step and speed
+            ranges are not changed (from the cached motor setup).
+            '''
+            success, _, _, _, maxSteps, minSpeed, maxSpeed, _ = await self.readMotorSetup()
+            if not success:
+                return False
+            command = self._motorSetupFrame(state and PISide == 1, state and PISide != 1, maxSteps, minSpeed, maxSpeed)
+            response = await self.parent._sendCmd(command)
+            if response[1] != 0x00:
+                MCRControl.log.error("Error: write motor configuration failed")
+                self._motorSetup = None
+                err.saveError(err.ERR_NO_COMMUNICATION if self.parent.boardCommunicationState else err.ERR_SERIAL_PORT, err.MOD_MCR, err.errLine(), self.parent.errors)
+                return False
+            self._motorSetup = self._setupFromFrame(command)
+            return True
@@ -0,0 +1,203 @@
+# Contrast autofocus for the MCR600 series boards
+# Coarse-to-fine search of the focus step with the best image sharpness.  The sharpness is measured by a user
+# function (e.g. the variance of the Laplacian of a camera image).  Each search level scans the focus steps moving
+# away from the PI so the moves don't need backlash correction (one corrected move to the start of each level).
+# With a separate capture function the sharpness of an image is calculated while the motor moves to the next step.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.0 261018
+# v.1.0.1 261018 bug: start or end alone was ignored (the other limit is the motor range limit)
+
+from __future__ import annotations
+import concurrent.futures
+import time
+from typing import Any, Callable
+import TheiaMCR.errList as err
+from TheiaMCR.TheiaMCR import MCRControl, MCR_STEPPER_MOTORS_IDS
+
+AF_LEVELS = (200, 40, 8)                # (steps) default probe spacing of the search levels (coarse to fine)
+
+class AutoFocus():
+    log = MCRControl.log
+
+    def __init__(self, motor:MCRControl.motor, sharpness:Callable[[Any], float], capture:Callable[[int], Any] | None=None,
+            levels:tuple[int, ...]=AF_LEVELS, stopRatio:float=0.0):
+        '''
+        Autofocus search for a focus (or zoom) motor.  The first level scans the search range with the coarse probe
+        spacing.  Each next level scans the window around the best step of the previous level (+/- the previous
+        spacing) with a finer spacing.  The motor ends at the best step.
+
+        Use:
+        af = AutoFocus(MCR.focus, sharpness=lambda step: camera.sharpness())
+        result = af.run()
+        result['step'], result['moves'], result['time']
+
+        Overlap the sharpness calculation with the next move:
+        af = AutoFocus(MCR.focus, sharpness=varianceOfLaplacian, capture=lambda step: camera.grab())
+        ### input:
+        - motor: initialized stepper motor (e.g. MCR.focus)
+        - sharpness: sharpness function (larger is sharper).  Called with the focus step or, if capture is set, with
+            the captured image (in a background thread while the motor moves to the next step).
+        - capture: (optional) image capture function called with the focus step when the motor is at the step
+        - levels: (optional, AF_LEVELS) probe spacing of each level (steps, coarse to fine)
+        - stopRatio: (optional, 0: scan the full window) stop a level scan when the sharpness falls below this
+            fraction of the best sharpness of the level (the sharpness peak was passed)
+        ### public functions:
+        - run(self, start:int|None=None, end:int|None=None) -> dict
+        '''
+        self.motor = motor
+        self.sharpness = sharpness
+        self.capture = capture
+        self.levels = tuple(max(1, int(step)) for step in levels)
+        self.stopRatio = stopRatio
+        self._pool = None
+
+    def run(self, start:int | None=None, end:int | None=None) -> dict:
+        '''
+        Find the sharpest step and move the motor to it.
+        ### input:
+        - start, end: (optional, motor range 0 ~ PI step (respectLimits) or max steps) search range limits (either
+            limit can be set alone)
+        ### return:
+        {
+            'result': OK = 0 | err_bad_move | err_not_init | err_not_supported | err_range (search range outside the motor range),
+            'step': best step (None if failed), 'sharpness': best sharpness,
+            'probes': sharpness measurements, 'moves': motor move commands,
+            'time': (s) total time, 'moveTime': (s) time moving, 'captureTime': (s) time in the capture function,
+            'waitTime': (s) time waiting for the sharpness results,
+            'scores': {step: sharpness}
+        }
+        '''
+        startTime = time.monotonic()
+        report = {'result': err.ERR_OK, 'step': None, 'sharpness': None, 'probes': 0, 'moves': 0,
+            'time': 0.0, 'moveTime': 0.0, 'captureTime': 0.0, 'waitTime': 0.0, 'scores': {}}
+        motor = self.motor
+        if not motor.initialized:
+            AutoFocus.log.error('AutoFocus cannot be executed because the motor is not initialized.')
+            err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), motor.parent.errors)
+            report['result'] = err.ERR_NOT_INIT
+            return report
+        if motor.motorID not in MCR_STEPPER_MOTORS_IDS:
+            AutoFocus.log.warning(f'"AutoFocus" not supported by motor {motor.motorID}')
+            report['result'] = err.ERR_NOT_SUPPORTED
+            return report
+
+        low, high = motor._stepRange()
+        if start is not None and end is not None:
+            start, end = min(start, end), max(start, end)
+        if start is not None:
+            low = max(low, start)
+        if end is not None:
+            high = min(high, end)
+        if low > high:
+            AutoFocus.log.warning(f'AutoFocus search range {start} ~ {end} is outside the motor range')
+            report['result'] = err.ERR_RANGE
+            report['time'] = time.monotonic() - startTime
+            return report
+        if self.capture is not None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='AutoFocus')
+        try:
+            best = None
+            for i, spacing in enumerate(self.levels):
+                if best is not None:
+                    window = self.levels[i - 1]
+                    low, high = max(low, best - window), min(high, best + window)
+                best = self._scan(self._probes(low, high, spacing), report)
+                if best is None:
+                    break
+            if best is not None and report['result'] == err.ERR_OK:
+                self._move(best, report)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+        if report['result'] == err.ERR_OK:
+            report['step'] = best
+            report['sharpness'] = report['scores'].get(best)
+        report['time'] = time.monotonic() - startTime
+        AutoFocus.log.info(f'AutoFocus motor 0x{motor.motorID:02X}: step {report["step"]}, {report["probes"]} probes, {report["moves"]} moves, {report["time"]:.2f} s')
+        return report
+
+    ############ internal functions ##############################################################
+    def _probes(self, low:int, high:int, spacing:int) -> list[int]:
+        '''
+        Probe steps of one level in the scan order (moving away from the PI).
+        '''
+        probes = list(range(low, high + 1, spacing))
+        if probes[-1] != high:
+            probes.append(high)
+        return probes[::-1] if self.motor.PISide == 1 else probes
+
+    def _scan(self, probes:list[int], report:dict) -> int | None:
+        '''
+        Measure the sharpness at each probe step (the steps already measured are not repeated).
+        ### return:
+        [best step in the probe range | None if a move failed]
+        '''
+        scores = report['scores']
+        low, high = min(probes), max(probes)
+        best = self._best(scores, low, high)
+        pending = None          # (step, future) of the image being measured
+        for step in probes:
+            if step in scores:
+                continue
+            if not self._move(step, report):
+                return None
+            report['probes'] += 1
+            if self.capture is None:
+                measured = [(step, self.sharpness(step))]
+            else:
+                # measure the sharpness of this image while the motor moves to the next step
+                captureStart = time.monotonic()
+                image = self.capture(step)
+                report['captureTime'] += time.monotonic() - captureStart
+                measured = self._collect(pending, report)
+                pending = (step, self._pool.submit(self.sharpness, image))
+            stop = False
+            for measuredStep, value in measured:
+                scores[measuredStep] = value
+                if best is None or value > scores[best]:
+                    best = measuredStep
+                elif self.stopRatio > 0 and value < self.stopRatio * scores[best]:
+                    stop = True
+            if stop:
+                break
+        for measuredStep, value in self._collect(pending, report):
+            scores[measuredStep] = value
+        return self._best(scores, low, high)
+
+    def _collect(self, pending:tuple[int, concurrent.futures.Future] | None, report:dict) -> list[tuple[int, float]]:
+        '''
+        Wait for the sharpness of the previous image.
+        '''
+        if pending is None:
+            return []
+        waitStart = time.monotonic()
+        value = pending[1].result()
+        report['waitTime'] += time.monotonic() - waitStart
+        return [(pending[0], value)]
+
+    @staticmethod
+    def _best(scores:dict, low:int, high:int) -> int | None:
+        inRange = [step for step in scores if low <= step <= high]
+        return max(inRange, key=lambda step: scores[step]) if inRange else None
+
+    def _move(self, step:int, report:dict) -> bool:
+        '''
+        Move to the step.  Moves away from the PI are one motor move.  Moves towards the PI are backlash corrected
+        (overshoot and move back, see motor.moveRel).
+        '''
+        motor = self.motor
+        steps = step - motor.currentStep
+        if steps == 0:
+            return True
+        moveStart = time.monotonic()
+        report['moves'] += len(motor._relMoves(steps))
+        result = motor.moveRel(steps)
+        report['moveTime'] += time.monotonic() - moveStart
+        if result != err.ERR_OK:
+            AutoFocus.log.error(f'AutoFocus move to step {step} failed')
+            report['result'] = result
+            return False
+        return True
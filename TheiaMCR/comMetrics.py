@@ -0,0 +1,269 @@
+# Serial command metrics for the MCR600 series boards
+# Counters and histograms of the commands sent to one board: command counts by opcode, motor and outcome, bytes
+# written and read, write-to-first-byte latency, total command time and the time versus the command wait time.
+# The metrics are available as a dictionary (snapshot) or in Prometheus text format (prometheus).
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.2.0 261018 command retries and motor position re-syncs
+# v.1.1.0 261018 discarded response bytes and frames
+# v.1.0.0 261018
+
+from __future__ import annotations
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+METRICS_TIME_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)            # (ms) latency histogram bucket limits
+METRICS_WAIT_BUCKETS = (-5000, -2000, -1000, -500, -200, -100, -50, -20, -10, 0, 10, 20, 50, 100, 200, 500)  # (ms) time - wait time
+METRICS_RECENT = 100                    # number of recent commands kept
+METRICS_MOTOR_COMMANDS = {0x62, 0x66, 0x73, 0x63, 0x67}      # commands with the motor ID in the second byte
+
+class histogram():
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds:tuple):
+        '''
+        Fixed bucket histogram.
+        ### input:
+        - bounds: sorted bucket upper limits (a value equal to a limit is counted in that bucket)
+        '''
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value:float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        '''
+        ### return:
+        {'count', 'sum', 'buckets': {upper limit: cumulative count}} (the last limit is 'inf')
+        '''
+        buckets = {}
+        total = 0
+        for limit, n in zip((*self.bounds, 'inf'), self.counts):
+            total += n
+            buckets[limit] = total
+        return {'count': self.count, 'sum': round(self.sum, 3), 'buckets': buckets}
+
+class commandStats():
+    __slots__ = ('outcomes', 'retries', 'bytesWritten', 'bytesRead', 'firstByte', 'wallTime', 'waitOverrun')
+
+    def __init__(self):
+        ''' Counters and histograms for one opcode. '''
+        self.outcomes: dict[str, int] = {}
+        self.retries = 0
+        self.bytesWritten = 0
+        self.bytesRead = 0
+        self.firstByte = histogram(METRICS_TIME_BUCKETS)
+        self.wallTime = histogram(METRICS_TIME_BUCKETS)
+        self.waitOverrun = histogram(METRICS_WAIT_BUCKETS)
+
+class comMetrics():
+    '''
+    Command metrics for one board.  record() is called by the serial port I/O worker when each command is completed.
+
+    Outcomes:
+    - ok: response received
+    - timeout: no response before the wait time + read time
+    - error: serial port error
+    '''
+    def __init__(self, labels:dict[str, str] | None=None, recent:int=METRICS_RECENT):
+        '''
+        ### input:
+        - labels: (optional) Prometheus labels for all the metrics (e.g. {'port': 'com4'})
+        - recent: (optional, 100) number of recent commands kept
+        ### public functions:
+        - record(self, cmd:bytes, bytesRead:int, outcome:str, waitTime:float, writeTime:float|None, firstByteTime:float|None, endTime:float, attempts:int=1)
+        - discard(self, bytesDiscarded:int, frames:int=0)
+        - retry(self, cmd:bytes)
+        - resync(self, motorID:int)
+        - snapshot(self) -> dict
+        - prometheus(self) -> str
+        - reset(self)
+        '''
+        self.labels = labels if labels is not None else {}
+        self._recentLength = recent
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        ''' Clear all the metrics. '''
+        with self._lock:
+            self.startTime = time.time()
+            self.commands: dict[int, commandStats] = {}
+            self.motors: dict[int, dict[str, int]] = {}
+            self.recent: deque[tuple] = deque(maxlen=self._recentLength)
+            self.discardedBytes = 0
+            self.discardedFrames = 0
+            self.resyncs: dict[int, int] = {}
+
+    def record(self, cmd:bytes, bytesRead:int, outcome:str, waitTime:float, writeTime:float|None, firstByteTime:float|None, endTime:float, attempts:int=1):
+        '''
+        Record one command.
+        ### input:
+        - cmd: command byte string
+        - bytesRead: response length (0 if no response)
+        - outcome: 'ok' | 'timeout' | 'error'
+        - waitTime: (ms) command wait time (expected move time)
+        - writeTime: (monotonic time) command written or None if the write failed
+        - firstByteTime: (monotonic time) first response byte received or None
+        - endTime: (monotonic time) command completed
+        - attempts: (optional, 1) number of times the command was sent
+        '''
+        opcode = cmd[0]
+        motorID = cmd[1] if opcode in METRICS_MOTOR_COMMANDS and len(cmd) > 2 else None
+        wallTime = (endTime - writeTime) * 1000 if writeTime is not None else 0.0
+        firstByte = (firstByteTime - writeTime) * 1000 if writeTime is not None and firstByteTime is not None else None
+        with self._lock:
+            stats = self.commands.get(opcode)
+            if stats is None:
+                stats = self.commands[opcode] = commandStats()
+            stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+            stats.retries += attempts - 1
+            stats.bytesWritten += len(cmd) * attempts
+            stats.bytesRead += bytesRead
+            if writeTime is not None:
+                stats.wallTime.observe(wallTime)
+                stats.waitOverrun.observe(wallTime - waitTime)
+            if firstByte is not None:
+                stats.firstByte.observe(firstByte)
+            if motorID is not None:
+                motor = self.motors.get(motorID)
+                if motor is None:
+                    motor = self.motors[motorID] = {}
+                motor[outcome] = motor.get(outcome, 0) + 1
+            self.recent.append((endTime, opcode, motorID, len(cmd) * attempts, bytesRead, firstByte, wallTime, waitTime, outcome, attempts))
+
+    def discard(self, bytesDiscarded:int, frames:int=0):
+        '''
+        Record received bytes that were discarded: garbage or incomplete frames, or complete frames that no command 
+        was waiting for.
+        ### input:
+        - bytesDiscarded: number of bytes
+        - frames: (optional, 0) number of complete frames
+        '''
+        with self._lock:
+            self.discardedBytes += bytesDiscarded
+            self.discardedFrames += frames
+
+    def retry(self, cmd:bytes):
+        '''
+        Record a command that is sent again (the attempts are also recorded as commands).
+        ### input:
+        - cmd: command byte string
+        '''
+        with self._lock:
+            stats = self.commands.get(cmd[0])
+            if stats is None:
+                stats = self.commands[cmd[0]] = commandStats()
+            stats.retries += 1
+
+    def resync(self, motorID:int):
+        '''
+        Record a motor position that needs a re-sync (a relative move without response).
+        ### input:
+        - motorID: motor ID
+        '''
+        with self._lock:
+            self.resyncs[motorID] = self.resyncs.get(motorID, 0) + 1
+
+    def snapshot(self) -> dict:
+        '''
+        Get the metrics.  Times are in ms.
+        ### return:
+        {
+            'labels': {...}, 'since': (epoch time of the last reset),
+            'commands': {'0x66': {'outcomes': {...}, 'retries', 'bytesWritten', 'bytesRead', 'firstByte': histogram, 'wallTime': histogram, 'waitOverrun': histogram}, ...},
+            'motors': {'0x01': {outcome: count}, ...},
+            'discardedBytes', 'discardedFrames', 'resyncs': {'0x01': count, ...},
+            'recent': [{'time', 'opcode', 'motorID', 'bytesWritten', 'bytesRead', 'firstByte', 'wallTime', 'waitTime', 'outcome', 'attempts'}, ...]
+        }
+        '''
+        keys = ('time', 'opcode', 'motorID', 'bytesWritten', 'bytesRead', 'firstByte', 'wallTime', 'waitTime', 'outcome', 'attempts')
+        with self._lock:
+            return {
+                'labels': dict(self.labels),
+                'since': self.startTime,
+                'commands': {f'0x{opcode:02X}': {
+                    'outcomes': dict(stats.outcomes),
+                    'retries': stats.retries,
+                    'bytesWritten': stats.bytesWritten,
+                    'bytesRead': stats.bytesRead,
+                    'firstByte': stats.firstByte.snapshot(),
+                    'wallTime': stats.wallTime.snapshot(),
+                    'waitOverrun': stats.waitOverrun.snapshot(),
+                } for opcode, stats in sorted(self.commands.items())},
+                'motors': {f'0x{motorID:02X}': dict(outcomes) for motorID, outcomes in sorted(self.motors.items())},
+                'discardedBytes': self.discardedBytes,
+                'discardedFrames': self.discardedFrames,
+                'resyncs': {f'0x{motorID:02X}': n for motorID, n in sorted(self.resyncs.items())},
+                'recent': [dict(zip(keys, r)) for r in self.recent],
+            }
+
+    def prometheus(self) -> str:
+        '''
+        Get the metrics in Prometheus text exposition format (times in seconds).
+        ### return:
+        [metrics text]
+        '''
+        lines = []
+        def labelText(**extra) -> str:
+            labels = {**self.labels, **extra}
+            escaped = {k: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for k, v in labels.items()}
+            return '{' + ','.join(f'{k}="{v}"' for k, v in escaped.items()) + '}' if labels else ''
+
+        def header(name:str, kind:str, text:str):
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogramLines(name:str, h:histogram, **extra):
+            total = 0
+            for limit, n in zip((*h.bounds, None), h.counts):
+                total += n
+                le = '+Inf' if limit is None else f'{limit / 1000:g}'
+                lines.append(f'{name}_bucket{labelText(**extra, le=le)} {total}')
+            lines.append(f'{name}_sum{labelText(**extra)} {h.sum / 1000:.6f}')
+            lines.append(f'{name}_count{labelText(**extra)} {h.count}')
+
+        with self._lock:
+            commands = sorted(self.commands.items())
+            header('theiamcr_commands_total', 'counter', 'Commands sent to the board by opcode and outcome')
+            for opcode, stats in commands:
+                for outcome, n in sorted(stats.outcomes.items()):
+                    lines.append(f'theiamcr_commands_total{labelText(opcode=f"0x{opcode:02X}", outcome=outcome)} {n}')
+            header('theiamcr_command_retries_total', 'counter', 'Command retries by opcode')
+            for opcode, stats in commands:
+                lines.append(f'theiamcr_command_retries_total{labelText(opcode=f"0x{opcode:02X}")} {stats.retries}')
+            header('theiamcr_bytes_written_total', 'counter', 'Bytes written to the board by opcode')
+            for opcode, stats in commands:
+                lines.append(f'theiamcr_bytes_written_total{labelText(opcode=f"0x{opcode:02X}")} {stats.bytesWritten}')
+            header('theiamcr_bytes_read_total', 'counter', 'Response bytes read from the board by opcode')
+            for opcode, stats in commands:
+                lines.append(f'theiamcr_bytes_read_total{labelText(opcode=f"0x{opcode:02X}")} {stats.bytesRead}')
+            header('theiamcr_motor_commands_total', 'counter', 'Motor commands by motor ID and outcome')
+            for motorID, outcomes in sorted(self.motors.items()):
+                for outcome, n in sorted(outcomes.items()):
+                    lines.append(f'theiamcr_motor_commands_total{labelText(motor=f"0x{motorID:02X}", outcome=outcome)} {n}')
+            header('theiamcr_discarded_bytes_total', 'counter', 'Received bytes discarded (garbage, incomplete frames, unexpected responses)')
+            lines.append(f'theiamcr_discarded_bytes_total{labelText()} {self.discardedBytes}')
+            header('theiamcr_discarded_frames_total', 'counter', 'Complete response frames that no command was waiting for')
+            lines.append(f'theiamcr_discarded_frames_total{labelText()} {self.discardedFrames}')
+            header('theiamcr_position_resyncs_total', 'counter', 'Motor positions flagged for a re-sync (relative move without response)')
+            for motorID, n in sorted(self.resyncs.items()):
+                lines.append(f'theiamcr_position_resyncs_total{labelText(motor=f"0x{motorID:02X}")} {n}')
+            header('theiamcr_first_byte_seconds', 'histogram', 'Time from the command write to the first response byte')
+            for opcode, stats in commands:
+                histogramLines('theiamcr_first_byte_seconds', stats.firstByte, opcode=f'0x{opcode:02X}')
+            header('theiamcr_command_seconds', 'histogram', 'Time from the command write to the complete response or timeout')
+            for opcode, stats in commands:
+                histogramLines('theiamcr_command_seconds', stats.wallTime, opcode=f'0x{opcode:02X}')
+            header('theiamcr_wait_overrun_seconds', 'histogram', 'Command time minus the command wait time (negative: finished early)')
+            for opcode, stats in commands:
+                histogramLines('theiamcr_wait_overrun_seconds', stats.waitOverrun, opcode=f'0x{opcode:02X}')
+        return '\n'.join(lines) + '\n'
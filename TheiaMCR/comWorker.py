@@ -0,0 +1,381 @@
+# Serial port I/O worker for the MCR600 series boards
+# The worker owns the serial port of one board.  Command byte strings are submitted and return a future that is
+# completed with the matching response frame.  The I/O is done either in the calling thread (default) or in a
+# dedicated I/O thread so commands from several threads can be in flight at the same time.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.3.0 261018 late responses of the commands that timed out are discarded (the next command with the same response is held until the late response arrives or WORKER_LATE_RESPONSE_TIME)
+# v.1.2.0 261018 streaming frame parser (frameParser), responses are only matched to commands expecting the response ID
+# v.1.1.0 261018 command metrics (comMetrics)
+# v.1.0.0 261018
+
+from __future__ import annotations
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from contextlib import nullcontext
+import serial
+from TheiaMCR.comMetrics import comMetrics
+from TheiaMCR.mcrProtocol import frameParser, hexFrame, FRAME_GAP_TIME, MCR_MOTOR_ID_RESPONSES
+
+log = logging.getLogger('TheiaMCR.TheiaMCR.MCRControl.comWorker')
+
+WORKER_READ_TIMEOUT = 0.02          # (s) serial port read timeout for the I/O thread (bounds the time to notice new commands)
+WORKER_CHECK_TIME = 0.2             # (s) interval to check the I/O thread is running while waiting for the responses
+WORKER_LATE_RESPONSE_TIME = 0.25    # (s) time a late response of a command that timed out is expected and discarded
+
+class comRequest():
+    __slots__ = ('cmd', 'responseID', 'timeout', 'moveTime', 'waitTime', 'deadline', 'expectedEnd', 'writeTime', 'firstByteTime', 'future')
+
+    def __init__(self, cmd:bytes, responseID:int, timeout:float, moveTime:float=0.0, waitTime:float=0.0):
+        '''
+        A command waiting to be sent or waiting for its response.
+        ### input:
+        - cmd: command byte string
+        - responseID: first byte of the expected response frame
+        - timeout: (s) time to wait for the response after the command is written
+        - moveTime: (s) expected move time used to match move responses that don't include the motor ID
+        - waitTime: (ms) command wait time (for the metrics)
+        '''
+        self.cmd = cmd
+        self.responseID = responseID
+        self.timeout = timeout
+        self.moveTime = moveTime
+        self.waitTime = waitTime
+        self.deadline = 0.0
+        self.expectedEnd = 0.0
+        self.writeTime: float | None = None
+        self.firstByteTime: float | None = None
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+
+class comWorker():
+    '''
+    Serial port I/O for one board.  Commands are written back-to-back and the responses are matched to the waiting
+    commands by the response ID (first byte) and, for the responses with a motor ID (read motor setup), the motor ID.
+    Move responses [0x74, status, 0x0D] don't include the motor ID so they are matched to the move that is expected
+    to finish first (submit the expected move time).  The received bytes are split into frames by the
+    frame parser: garbage bytes and incomplete frames are discarded and responses that no command is waiting for
+    (e.g. the late response of a command that timed out) are dropped without reopening the serial port.
+    When a command times out its response is still expected for WORKER_LATE_RESPONSE_TIME: a late response is discarded
+    and the next command with the same response (e.g. the retry of the command) is written after the late response
+    arrived or the time expired so it can't be completed with the late response.
+
+    Use:
+    with worker.transaction():
+        future = worker.submit(cmd, responseID, timeout)
+        worker.wait([future])
+    response = future.result()      # response frame or None if timed out
+
+    The future result is the response frame, None if no response was received before the timeout, or it raises
+    serial.SerialException if the serial port was lost.
+    '''
+    def __init__(self, serialPort:serial.Serial, parser:frameParser, noResponse:dict[int, bytes] | None=None, threaded:bool=False, 
+            metrics:comMetrics | None=None):
+        '''
+        ### input:
+        - serialPort: open serial port
+        - parser: response frame parser for the serial port
+        - noResponse: (optional) {command byte: forced response} for commands that don't generate a response
+        - threaded: (optional, False) set True to do the I/O in a dedicated thread.  Otherwise the I/O is done in the
+            calling thread while it holds the transaction lock.
+        - metrics: (optional) command metrics recorded when each command is completed
+        ### public functions:
+        - transaction(self) -> context manager
+        - submit(self, cmd:bytes, responseID:int, timeout:float, moveTime:float=0.0, waitTime:float=0.0) -> Future
+        - wait(self, futures:list)
+        - waitAny(self, futures:list) -> set
+        - close(self)
+        '''
+        self.serialPort = serialPort
+        self.threaded = threaded
+        self._parser = parser
+        self._noResponse = noResponse if noResponse is not None else {}
+        self._metrics = metrics
+        self._lock = threading.RLock()
+        self._queue: queue.SimpleQueue[comRequest] = queue.SimpleQueue()
+        self._pending: list[comRequest] = []
+        self._held: list[comRequest] = []       # (I/O thread) submitted commands waiting for a late response
+        self._late: list[tuple[int, int | None, float]] = []    # late responses (response ID, motor ID | None, expiry time)
+        self._frameStart = 0.0
+        self._lastByteTime = 0.0
+        self._discardedBytes = parser.discardedBytes
+        self._running = threaded
+        self._thread = None
+        if threaded:
+            self.serialPort.timeout = WORKER_READ_TIMEOUT
+            self._thread = threading.Thread(target=self._run, name=f'TheiaMCR I/O {serialPort.port}', daemon=True)
+            self._thread.start()
+
+    def transaction(self):
+        '''
+        Context manager to hold while submitting and waiting for commands.  Without the I/O thread this serializes the
+        callers so one thread at a time uses the serial port.  With the I/O thread the commands of different threads overlap.
+        '''
+        return nullcontext() if self.threaded else self._lock
+
+    def submit(self, cmd:bytes, responseID:int, timeout:float, moveTime:float=0.0, waitTime:float=0.0) -> concurrent.futures.Future:
+        '''
+        Send a command.  Without the I/O thread the command is written now (hold the transaction lock).
+        ### input:
+        - cmd: command byte string
+        - responseID: first byte of the expected response frame
+        - timeout: (s) time to wait for the response after the command is written
+        - moveTime: (optional, 0) (s) expected move time
+        - waitTime: (optional, 0) (ms) command wait time (for the metrics)
+        ### return:
+        [future completed with the response frame]
+        '''
+        request = comRequest(cmd, responseID, timeout, moveTime, waitTime)
+        if self.threaded:
+            if not self._running:
+                self._complete(request, exc=serial.SerialException('serial port I/O thread is closed'))
+                return request.future
+            self._queue.put(request)
+            if not self._running:
+                # the I/O thread stopped after the check and won't read the queue
+                self._failQueued(serial.SerialException('serial port I/O thread is closed'))
+            self._wake()
+        else:
+            try:
+                while self._isLate(request):
+                    self._service()
+            except serial.SerialException as e:
+                self._complete(request, exc=e)
+                return request.future
+            self._write(request)
+        return request.future
+
+    def wait(self, futures:list[concurrent.futures.Future]):
+        '''
+        Wait until all the futures are completed.
+        '''
+        if self.threaded:
+            while concurrent.futures.wait(futures, timeout=WORKER_CHECK_TIME).not_done:
+                self._checkRunning()
+            return
+        while not all(f.done() for f in futures):
+            self._service()
+
+    def waitAny(self, futures:list[concurrent.futures.Future]) -> set[concurrent.futures.Future]:
+        '''
+        Wait until at least one of the futures is completed.
+        ### return:
+        [set of completed futures]
+        '''
+        if self.threaded:
+            while True:
+                done, _ = concurrent.futures.wait(futures, timeout=WORKER_CHECK_TIME, return_when=concurrent.futures.FIRST_COMPLETED)
+                if done:
+                    return done
+                self._checkRunning()
+        while not any(f.done() for f in futures):
+            self._service()
+        return {f for f in futures if f.done()}
+
+    def close(self):
+        '''
+        Stop the I/O thread (if running) and fail any waiting commands.  The serial port is not closed.
+        '''
+        if self._thread is not None:
+            self._running = False
+            self._wake()
+            self._thread.join(timeout=1)
+            self._thread = None
+        self._failAll(serial.SerialException('serial port I/O closed'))
+
+    ############ internal functions ##############################################################
+    def _run(self):
+        '''
+        (I/O thread) Write the submitted commands and read the responses until closed or the port is lost.
+        '''
+        try:
+            while self._running:
+                held = self._held
+                self._held = []
+                while True:
+                    try:
+                        held.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                for request in held:
+                    if self._isLate(request):
+                        self._held.append(request)
+                    else:
+                        self._write(request)
+                self._service()
+        except Exception as e:
+            log.error(f'Serial port I/O thread stopped ({e})')
+            self._failAll(e if isinstance(e, serial.SerialException) else serial.SerialException(str(e)))
+        finally:
+            self._running = False
+
+    def _wake(self):
+        '''
+        Interrupt a blocking read so the I/O thread writes the new command.
+        '''
+        if hasattr(self.serialPort, 'cancel_read'):
+            try:
+                self.serialPort.cancel_read()
+            except (serial.SerialException, AttributeError):
+                pass
+
+    def _write(self, request:comRequest):
+        try:
+            self.serialPort.write(request.cmd)
+        except (serial.SerialException, AttributeError) as e:
+            self._complete(request, exc=e if isinstance(e, serial.SerialException) else serial.SerialException(str(e)))
+            return
+        now = time.monotonic()
+        request.writeTime = now
+        if request.cmd[0] in self._noResponse:
+            self._complete(request, self._noResponse[request.cmd[0]], bytesRead=0)
+            return
+        request.deadline = now + request.timeout
+        request.expectedEnd = now + request.moveTime
+        self._pending.append(request)
+
+    def _service(self):
+        '''
+        Read the available bytes (blocks up to the port timeout), complete the matching commands and expire the commands
+        that timed out.
+        '''
+        try:
+            data = self.serialPort.read(max(1, self.serialPort.in_waiting))
+        except (serial.SerialException, TypeError, AttributeError) as e:
+            # pyserial raises TypeError/AttributeError when the port is closed during a read
+            self._failAll(e if isinstance(e, serial.SerialException) else serial.SerialException(str(e)))
+            raise serial.SerialException(str(e))
+        now = time.monotonic()
+        if data:
+            if self._parser.pending == 0:
+                self._frameStart = now
+            self._lastByteTime = now
+            self._dispatch(self._parser.feed(data, self._expected()), now)
+        elif self._parser.pending > 0 and now - self._lastByteTime > FRAME_GAP_TIME:
+            # the rest of the frame didn't arrive: discard the partial frame and look for frames after it
+            log.debug('Incomplete response discarded (%s bytes in the buffer)', self._parser.pending)
+            self._dispatch(self._parser.resync(self._expected()), now)
+            self._lastByteTime = now
+        if self._metrics is not None and self._parser.discardedBytes != self._discardedBytes:
+            self._metrics.discard(self._parser.discardedBytes - self._discardedBytes)
+            self._discardedBytes = self._parser.discardedBytes
+        self._late = [late for late in self._late if now < late[2]]
+        for request in [r for r in self._pending if now > r.deadline]:
+            self._pending.remove(request)
+            self._late.append((request.responseID, self._motorID(request), now + WORKER_LATE_RESPONSE_TIME))
+            self._complete(request, None)
+
+    def _dispatch(self, frames:list[bytes], arrival:float):
+        '''
+        Complete the commands matching the received frames.
+        '''
+        for frame in frames:
+            frameStart = self._frameStart
+            self._frameStart = arrival
+            if self._discardLate(frame):
+                log.debug('Late response discarded %s', hexFrame(frame))
+                if self._metrics is not None:
+                    self._metrics.discard(len(frame), frames=1)
+                continue
+            request = self._match(frame)
+            if request is None:
+                log.debug('Unexpected response discarded %s', hexFrame(frame))
+                if self._metrics is not None:
+                    self._metrics.discard(len(frame), frames=1)
+                continue
+            self._pending.remove(request)
+            request.firstByteTime = frameStart
+            self._complete(request, frame)
+
+    def _expected(self) -> set[int]:
+        ''' response IDs of the waiting commands and the late responses '''
+        return {r.responseID for r in self._pending} | {late[0] for late in self._late}
+
+    def _motorID(self, request:comRequest) -> int | None:
+        ''' motor ID of the response (None if the response doesn't include the motor ID) '''
+        return request.cmd[1] if request.responseID in MCR_MOTOR_ID_RESPONSES and len(request.cmd) > 1 else None
+
+    def _isLate(self, request:comRequest) -> bool:
+        '''
+        Check if a late response with the same response ID (and motor ID) as the command is expected.
+        '''
+        now = time.monotonic()
+        motorID = self._motorID(request)
+        return any(late[0] == request.responseID and late[1] == motorID and now < late[2] for late in self._late)
+
+    def _discardLate(self, frame:bytes) -> bool:
+        '''
+        Remove the late response entry matching a response frame.
+        ### return:
+        [True if the frame is a late response]
+        '''
+        for late in self._late:
+            if late[0] == frame[0] and (late[1] is None or (len(frame) > 1 and frame[1] == late[1])):
+                self._late.remove(late)
+                return True
+        return False
+
+    def _match(self, frame:bytes) -> comRequest | None:
+        '''
+        Find the waiting command for a response frame.  Responses with a motor ID are matched to the command for the
+        motor.  Other commands with the same response ID are matched by the expected end time (then in the order sent).
+        ### return:
+        [waiting command | None if no command is waiting for the response]
+        '''
+        responseID = frame[0]
+        candidates = [r for r in self._pending if r.responseID == responseID]
+        if responseID in MCR_MOTOR_ID_RESPONSES and len(frame) > 1:
+            candidates = [r for r in candidates if len(r.cmd) > 1 and r.cmd[1] == frame[1]]
+        if candidates:
+            return min(candidates, key=lambda r: r.expectedEnd)
+        return None
+
+    def _failAll(self, exc:Exception):
+        pending = self._pending + self._held
+        self._pending = []
+        self._held = []
+        for request in pending:
+            if not request.future.done():
+                self._complete(request, exc=exc)
+        self._failQueued(exc)
+
+    def _failQueued(self, exc:Exception):
+        '''
+        Fail the commands that were submitted but not written.
+        '''
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if not request.future.done():
+                self._complete(request, exc=exc)
+
+    def _checkRunning(self):
+        '''
+        (waiting thread) Fail the queued commands if the I/O thread stopped (the written commands were failed by the
+        I/O thread).
+        '''
+        if not self._running:
+            self._failQueued(serial.SerialException('serial port I/O thread is closed'))
+
+    def _complete(self, request:comRequest, response:bytes | None=None, exc:Exception | None=None, bytesRead:int | None=None):
+        '''
+        Record the command metrics and complete the future with the response (None: timed out) or the exception.
+        '''
+        if self._metrics is not None:
+            outcome = 'error' if exc is not None else 'timeout' if response is None else 'ok'
+            if bytesRead is None:
+                bytesRead = len(response) if response is not None else 0
+            self._metrics.record(request.cmd, bytesRead, outcome, request.waitTime, request.writeTime, request.firstByteTime, time.monotonic())
+        try:
+            if exc is not None:
+                request.future.set_exception(exc)
+            else:
+                request.future.set_result(response)
+        except concurrent.futures.InvalidStateError:
+            # already failed by another thread (I/O thread stopping)
+            pass
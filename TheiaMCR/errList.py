@@ -1,8 +1,15 @@
-from inspect import currentframe
+from __future__ import annotations
+import collections
 import logging as log
-# global
-# store the error here that ends the program.  Read it out for display to the user.  
-finalError = []
+import sys
+import threading
+
+__all__ = ['ERR_BUFFER_SIZE', 'ERR_OK', 'ERR_BAD_MOVE', 'ERR_SERIAL_PORT', 'ERR_RANGE', 'ERR_NOT_INIT', 'ERR_NO_COMMUNICATION',
+    'ERR_MOVE_TIMEOUT', 'ERR_DEPRICATED', 'ERR_NOT_SUPPORTED', 'MOD_MCR', 'MCRError', 'MCRNotInitError', 'MCRCommError',
+    'MCRMoveError', 'MCRTimeoutError', 'MCRRangeError', 'MCRNotSupportedError', 'errorRecorder', 'finalError',
+    'finalErrorLine', 'captureCallsite', 'saveError', 'clearErrorList', 'printErrorListToLog', 'decipher', 'module', 'errLine']
+
+ERR_BUFFER_SIZE = 100               # errors kept by an error recorder (oldest errors are dropped)
 
 # common error codes
 # error formatted lists are of the form [err code, module, line]
@@ -21,36 +28,225 @@ ERR_NOT_SUPPORTED = -73             # function not supported (i.e. for this moto
 # modules
 MOD_MCR = 8                         # MCRControl
 
-# save the error in global variables
-def saveError(errNum:int, modNum:int, lineNum:int):
+# exceptions (MCRControl raiseErrors mode)
+class MCRError(Exception):
+    '''
+    Base class of the MCR errors raised in the MCRControl raiseErrors mode.  The message is formatted when it is read.
+    ### variables:
+    - errNum: error code (e.g. ERR_BAD_MOVE)
+    - function: name of the function that failed
+    - errors: errors [err code, module, line] recorded by the function call
+    '''
+    def __init__(self, errNum:int, function:str='', errors:list | None=None):
+        super().__init__(errNum)
+        self.errNum = errNum
+        self.function = function
+        self.errors = errors if errors is not None else []
+
+    def __str__(self) -> str:
+        return f'{self.function + ": " if self.function else ""}{self.errNum} {decipher(self.errNum)}'
+
+class MCRNotInitError(MCRError):
+    ''' ERR_NOT_INIT: board or motor not initialized '''
+
+class MCRCommError(MCRError):
+    ''' ERR_SERIAL_PORT, ERR_NO_COMMUNICATION: serial port or board communication failed '''
+
+class MCRMoveError(MCRError):
+    ''' ERR_BAD_MOVE: motor move returned unsuccessful '''
+
+class MCRTimeoutError(MCRMoveError, MCRCommError):
+    ''' ERR_MOVE_TIMEOUT: no response before timeout '''
+
+class MCRRangeError(MCRError, ValueError):
+    ''' ERR_RANGE: input parameter out of range '''
+
+class MCRNotSupportedError(MCRError):
+    ''' ERR_NOT_SUPPORTED, ERR_DEPRICATED: function not supported (i.e. for this motor) '''
+
+ERROR_EXCEPTIONS = {
+    ERR_NOT_INIT: MCRNotInitError,
+    ERR_SERIAL_PORT: MCRCommError,
+    ERR_NO_COMMUNICATION: MCRCommError,
+    ERR_BAD_MOVE: MCRMoveError,
+    ERR_MOVE_TIMEOUT: MCRTimeoutError,
+    ERR_RANGE: MCRRangeError,
+    ERR_NOT_SUPPORTED: MCRNotSupportedError,
+    ERR_DEPRICATED: MCRNotSupportedError,
+}
+
+def exception(errNum:int, function:str='', errors:list | None=None) -> MCRError:
+    '''
+    Exception for the error code.
+    ### input:
+    - errNum: error number
+    - function: (optional) name of the function that failed
+    - errors: (optional) errors [err code, module, line] recorded by the function call
+    ### return:
+    [MCRError subclass instance (MCRError for an unknown code)]
     '''
-    Save the error in global variable
+    return ERROR_EXCEPTIONS.get(errNum, MCRError)(errNum, function, errors)
+
+# error recorder
+class errorRecorder():
+    def __init__(self, capacity:int=ERR_BUFFER_SIZE):
+        '''
+        Thread safe error record with a fixed capacity.  The last errors are kept in a list (the oldest errors are
+        dropped when it is full) and the errors of each code are counted.  MCRControl keeps a recorder
+        for each board (MCRControl.errors) and the module recorder (errors) records the errors of all the boards.
+        ### input:
+        - capacity: (optional, ERR_BUFFER_SIZE) number of errors kept
+        ### public functions:
+        - save(self, errNum:int, modNum:int, lineNum:int=0)
+        - count(self, errNum:int|None=None) -> int
+        - counts(self) -> dict[int, int]
+        - last(self) -> list|None
+        - since(self, total:int) -> list
+        - startCall(self), endCall(self) -> list, inCall(self) -> bool
+        - clear(self)
+        ### variables:
+        - errors: last errors [err code, module, line] (oldest first, up to capacity)
+        - total: number of errors saved (including the dropped errors)
+        - logErrors: log the saved errors (False when the errors are raised as exceptions, see MCRControl raiseErrors)
+        '''
+        self.errors: list[list] = []
+        self.capacity = capacity
+        self.total = 0
+        self.logErrors = True
+        self._counts = collections.Counter()
+        self._lock = threading.Lock()
+        self._call = threading.local()      # errors saved by each thread in a call (see startCall)
+
+    def save(self, errNum:int, modNum:int, lineNum:int=0):
+        '''
+        Record an error.
+        ### input:
+        - errNum: error number
+        - modNum: module number that generated the error
+        - lineNum: (optional, 0: not captured) line in the module
+        '''
+        error = [errNum, modNum, lineNum]
+        with self._lock:
+            self.errors.append(error)
+            if len(self.errors) > self.capacity:
+                del self.errors[0]
+            self._counts[errNum] += 1
+            self.total += 1
+        callErrors = getattr(self._call, 'errors', None)
+        if callErrors is not None:
+            callErrors.append(error)
+
+    def count(self, errNum:int | None=None) -> int:
+        '''
+        Number of errors saved with the error code.
+        ### input:
+        - errNum: (optional, all codes) error number
+        ### return:
+        [number of errors (including the errors dropped from the buffer)]
+        '''
+        return self.total if errNum is None else self._counts[errNum]
+
+    def counts(self) -> dict[int, int]:
+        '''
+        ### return:
+        [{error code: number of errors}]
+        '''
+        with self._lock:
+            return dict(self._counts)
+
+    def last(self) -> list | None:
+        '''
+        ### return:
+        [last error [err code, module, line] | None if there is no error]
+        '''
+        with self._lock:
+            return self.errors[-1] if self.errors else None
+
+    def since(self, total:int) -> list:
+        '''
+        Errors saved after the recorder total was read (the errors still in the buffer).
+        ### input:
+        - total: earlier value of total
+        ### return:
+        [errors [err code, module, line] (oldest first)]
+        '''
+        with self._lock:
+            count = min(self.total - total, len(self.errors))
+            return self.errors[len(self.errors) - count:] if count > 0 else []
+
+    def startCall(self):
+        '''
+        Start collecting the errors saved by this thread (e.g. during a function call).  The errors saved by other 
+        threads are not collected.
+        '''
+        self._call.errors = []
+
+    def endCall(self) -> list:
+        '''
+        Stop collecting the errors of this thread.
+        ### return:
+        [errors [err code, module, line] saved by this thread since startCall (oldest first)]
+        '''
+        errors = getattr(self._call, 'errors', None)
+        self._call.errors = None
+        return errors if errors is not None else []
+
+    def inCall(self) -> bool:
+        '''
+        ### return:
+        [True if this thread is collecting its errors (between startCall and endCall)]
+        '''
+        return getattr(self._call, 'errors', None) is not None
+
+    def clear(self):
+        '''
+        Clear the errors and the counters.
+        '''
+        with self._lock:
+            self.errors.clear()
+            self._counts.clear()
+            self.total = 0
+
+# global
+# store the errors here.  Read them out for display to the user.  
+errors = errorRecorder()
+finalError = errors.errors          # last errors of all the boards [err code, module, line] (list bounded to ERR_BUFFER_SIZE, see errorRecorder)
+finalErrorLine = 0                  # line number of the last errLine() call
+captureCallsite = True              # set False to skip the line number lookup in errLine()
+
+# save the error in the error recorders
+def saveError(errNum:int, modNum:int, lineNum:int=0, recorder:errorRecorder | None=None):
+    '''
+    Save the error in the global error recorder (finalError) and the board error recorder
     ### global: 
-    - set finalError
+    - add to errors/ finalError
     ### input: 
     - errNum: error number
     - modNum: module number that generated the error
-    - lineNum: line in the module
+    - lineNum: (optional, 0) line in the module
+    - recorder: (optional) error recorder of the board (MCRControl.errors).  The error isn't logged if the recorder 
+        logErrors is False.  
     '''
-    global finalError
-    log.error(f'ERROR: {errNum} {decipher(errNum)} in module {module(modNum)}, ln {lineNum}')
-    finalError.append([errNum, modNum, lineNum])
+    if recorder is None or recorder.logErrors:
+        log.error('ERROR: %s %s in module %s, ln %s', errNum, decipher(errNum), module(modNum), lineNum)
+    errors.save(errNum, modNum, lineNum)
+    if recorder is not None:
+        recorder.save(errNum, modNum, lineNum)
 
 # clear the error list
 def clearErrorList():
     ''' Clear the error list
     ### global:
-    - clear finalError
+    - clear errors/ finalError
     '''
-    global finalError
-    finalError = []
+    errors.clear()
 
 # print the error list to the active log
 def printErrorListToLog():
     ''' 
     Print the error list in the console from the global finalError
     '''
-    for error in finalError:
+    for error in list(finalError):
         log.error(f'  {error[0]} {decipher(error[0])}, module {module(error[1])}, line {error[2]}')
     
 # decipher
@@ -101,9 +297,12 @@ def errLine():
     '''
     Get the line number from the code when the error is generated
     ### return
-    [code line number]
+    [code line number | 0 if captureCallsite is False]
+    ### global:
+    - set finalErrorLine
     '''
     global finalErrorLine
-    cf = currentframe()
-    finalErrorLine = cf.f_back.f_lineno
-    return finalErrorLine
\ No newline at end of file
+    if not captureCallsite:
+        return 0
+    finalErrorLine = sys._getframe(1).f_lineno
+    return finalErrorLine
@@ -0,0 +1,305 @@
+# Timed lens sequences for the MCR600 series boards
+# A sequence is a list of keyframes (time offset, motor, target, mode) played back on a board with
+# LensSequence.play(MCR).  The keyframes of each motor are a track that is played in its own thread.  The board moves
+# one motor at a time (the move responses don't include the motor ID) so a keyframe waits for the move of another
+# motor to finish.  Each keyframe command is sent at its time offset
+# (sleep then spin for the last SEQ_SPIN_TIME) and the achieved start and end times are reported.  Sequences can be
+# saved and loaded as CSV (readable) or binary (compact, 10 bytes per keyframe) files.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.1 261018 bug: a keyframe returning an error code didn't stop the track
+# v.1.0.0 261018
+
+from __future__ import annotations
+import csv
+import struct
+import threading
+import time
+import TheiaMCR.errList as err
+from TheiaMCR.TheiaMCR import MCRControl, MCR_IRC_DEFAULT_SPEED, MCR_IRC_SWITCH_TIME, MCR_MOVE_REST_TIME
+
+SEQ_MOTORS = ('focus', 'zoom', 'iris', 'IRC')   # motor names (MCRControl attributes), binary file code is the index + 1 (motor ID)
+SEQ_MODES = ('abs', 'rel', 'state', 'home')     # moveAbs(target), moveRel(target), state(target), home()
+SEQ_SPIN_TIME = 0.002                   # (s) time before a keyframe to stop sleeping and wait actively
+SEQ_START_DELAY = 0.02                  # (s) time from the start of playback to time offset 0 (track threads start)
+SEQ_MAGIC = b'MCRS'                     # binary file header
+SEQ_VERSION = 1
+SEQ_HEADER = struct.Struct('<4sBI')     # [magic, version, keyframe count]
+SEQ_KEYFRAME = struct.Struct('<IBBi')   # [time offset (ms), motor (ID), mode, target]
+
+class LensSequence():
+    log = MCRControl.log
+
+    def __init__(self, keyframes:list[tuple] | None=None):
+        '''
+        Timed lens sequence.  Keyframe: (time offset (s), motor name, target, mode).  The keyframes are kept in time
+        order (keyframes at the same time keep the order they were added).
+
+        Use:
+        sequence = LensSequence([(0, 'zoom', 1000), (0, 'focus', 5200), (2.5, 'IRC', 1, 'state'), (3, 'iris', 40)])
+        sequence.check(MCR)                 # keyframes predicted to start late
+        report = sequence.play(MCR)
+        sequence.save('timelapse.seq')      # or 'timelapse.csv'
+        ### input:
+        - keyframes: (optional) list of (time offset (s), motor, target[, mode='abs'])
+            - motor: 'focus' | 'zoom' | 'iris' | 'IRC'
+            - mode: 'abs' (moveAbs target) | 'rel' (moveRel target steps) | 'state' (IRC state target) | 'home' (target is not used)
+        ### public functions:
+        - add(self, time:float, motor:str, target:int, mode:str='abs')
+        - load(filename:str) -> LensSequence (class method)
+        - save(self, filename:str)
+        - check(self, MCR) -> list[dict]
+        - play(self, MCR, lateLimit:float|None=None) -> dict
+        ### variables:
+        - keyframes: [(time offset, motor, target, mode)] in time order
+        - duration: (s) time offset of the last keyframe
+        ### raises:
+        - ValueError if a keyframe is not valid
+        '''
+        self.keyframes: list[tuple[float, str, int, str]] = []
+        for keyframe in keyframes if keyframes is not None else []:
+            self.add(*keyframe)
+
+    def __len__(self) -> int:
+        return len(self.keyframes)
+
+    @property
+    def duration(self) -> float:
+        return self.keyframes[-1][0] if self.keyframes else 0.0
+
+    def add(self, time:float, motor:str, target:int, mode:str='abs'):
+        '''
+        Add a keyframe (see __init__).
+        '''
+        if motor not in SEQ_MOTORS:
+            raise ValueError(f'unknown sequence motor {motor} (available: {", ".join(SEQ_MOTORS)})')
+        if mode not in SEQ_MODES:
+            raise ValueError(f'unknown sequence mode {mode} (available: {", ".join(SEQ_MODES)})')
+        if time < 0:
+            raise ValueError(f'sequence time offset {time} is negative')
+        keyframe = (float(time), motor, int(target), mode)
+        # insert after the keyframes at the same time (keyframes are usually added in order)
+        i = len(self.keyframes)
+        while i > 0 and self.keyframes[i - 1][0] > keyframe[0]:
+            i -= 1
+        self.keyframes.insert(i, keyframe)
+
+    @classmethod
+    def load(cls, filename:str) -> LensSequence:
+        '''
+        Read a sequence file.  Files ending with .csv are text files with a line for each keyframe
+        (time offset (s), motor, target[, mode]).  A header line and lines starting with '#' are skipped.  Other files
+        are binary files (see save).
+        ### raises:
+        - OSError if the file can't be read, ValueError if the file is not valid
+        '''
+        sequence = cls()
+        if filename.lower().endswith('.csv'):
+            with open(filename, 'r', newline='') as f:
+                for n, row in enumerate(csv.reader(f), start=1):
+                    if not row or row[0].strip().startswith('#') or row[0].strip().lower() == 'time':
+                        continue
+                    try:
+                        sequence.add(float(row[0]), row[1].strip(), int(row[2]), row[3].strip() if len(row) > 3 and row[3].strip() else 'abs')
+                    except (IndexError, ValueError) as e:
+                        raise ValueError(f'sequence file {filename} line {n} is not valid ({e})')
+            return sequence
+        with open(filename, 'rb') as f:
+            data = f.read()
+        if len(data) < SEQ_HEADER.size:
+            raise ValueError(f'sequence file {filename} is too short')
+        magic, version, count = SEQ_HEADER.unpack_from(data)
+        if magic != SEQ_MAGIC or version != SEQ_VERSION:
+            raise ValueError(f'sequence file {filename} is not a version {SEQ_VERSION} sequence file')
+        if len(data) != SEQ_HEADER.size + count * SEQ_KEYFRAME.size:
+            raise ValueError(f'sequence file {filename} length does not match {count} keyframes')
+        for timeOffset, motorID, mode, target in SEQ_KEYFRAME.iter_unpack(data[SEQ_HEADER.size:]):
+            if not 1 <= motorID <= len(SEQ_MOTORS) or mode >= len(SEQ_MODES):
+                raise ValueError(f'sequence file {filename} has an unknown motor or mode')
+            sequence.add(timeOffset / 1000, SEQ_MOTORS[motorID - 1], target, SEQ_MODES[mode])
+        return sequence
+
+    def save(self, filename:str):
+        '''
+        Write the sequence file.  Files ending with .csv are text files, other files are binary:
+        [header 'MCRS', version, keyframe count] + [time offset (ms), motor ID, mode, target] for each keyframe (little endian).
+        '''
+        if filename.lower().endswith('.csv'):
+            with open(filename, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('time', 'motor', 'target', 'mode'))
+                writer.writerows((f'{t:g}', motor, target, mode) for t, motor, target, mode in self.keyframes)
+            return
+        data = bytearray(SEQ_HEADER.size + len(self.keyframes) * SEQ_KEYFRAME.size)
+        SEQ_HEADER.pack_into(data, 0, SEQ_MAGIC, SEQ_VERSION, len(self.keyframes))
+        for i, (t, motor, target, mode) in enumerate(self.keyframes):
+            SEQ_KEYFRAME.pack_into(data, SEQ_HEADER.size + i * SEQ_KEYFRAME.size, round(t * 1000), SEQ_MOTORS.index(motor) + 1, SEQ_MODES.index(mode), target)
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+    def check(self, MCR) -> list[dict]:
+        '''
+        Find the keyframes that are predicted to start late because the previous move of the same motor or the move
+        of another motor is not done (one move at a time per board, see motor.moveModel).  The moves are predicted
+        from the current motor steps.
+        ### input:
+        - MCR: MCRControl board with the motors initialized
+        ### return:
+        [{'index', 'time', 'motor', 'predictedStart'} for each keyframe predicted to start late]
+        '''
+        late = []
+        positions = {}
+        boardFree = 0.0         # (s) end of the board move in progress
+        for i, (t, name, target, mode) in sorted(enumerate(self.keyframes), key=lambda k: (k[1][0], k[0])):
+            motor = getattr(MCR, name)
+            if not motor.initialized:
+                continue
+            start = max(t, boardFree)
+            if start > t:
+                late.append({'index': i, 'time': t, 'motor': name, 'predictedStart': round(start, 4)})
+            duration, positions[name] = self._predict(motor, mode, target, positions.get(name, motor.currentStep))
+            boardFree = start + duration
+        return sorted(late, key=lambda k: k['index'])
+
+    def play(self, MCR, lateLimit:float | None=None) -> dict:
+        '''
+        Play the sequence from time offset 0 (now).  Each motor track is played in its own thread: the keyframe command
+        is sent at its time offset or, if the previous move of the motor is not done, as soon as the move is done (late).
+        The board moves one motor at a time so a keyframe called while another motor moves waits for that move: its
+        'start' is on time but its 'end' includes the wait (the IRC state is also a move).
+        ### input:
+        - MCR: MCRControl board with the sequence motors initialized
+        - lateLimit: (optional, None: play all the keyframes) (s) skip the keyframes that would start later than this
+        ### return:
+        {
+            'result': OK = 0 | first error code of the keyframes,
+            'keyframes': [{'time': planned (s), 'motor', 'target', 'mode', 'start': achieved (s), 'end': (s) move done,
+                'late': (s) start - time, 'skipped', 'result', 'step': step after the move} for each keyframe],
+            'played', 'skipped': number of keyframes,
+            'maxLate', 'meanLate': (s) lateness of the played keyframes,
+            'duration': (s) end of the last move
+        }
+        '''
+        for name in {keyframe[1] for keyframe in self.keyframes}:
+            if not getattr(MCR, name).initialized:
+                LensSequence.log.error(f'Sequence cannot be played because the {name} motor is not initialized.')
+                err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), MCR.errors)
+                return {'result': err.ERR_NOT_INIT, 'keyframes': [None] * len(self.keyframes), 'played': 0, 'skipped': 0,
+                    'maxLate': 0.0, 'meanLate': 0.0, 'duration': 0.0}
+        tracks = self._tracks()
+        results: list[dict | None] = [None] * len(self.keyframes)
+        startTime = time.monotonic() + SEQ_START_DELAY
+        threads = [threading.Thread(target=self._playTrack, args=(MCR, track, startTime, lateLimit, results), name=f'TheiaMCR sequence {name}', daemon=True)
+            for name, track in tracks.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        played = [r for r in results if r is not None and not r['skipped']]
+        lateness = [r['late'] for r in played]
+        errors = [r['result'] for r in played if r['result'] < 0]
+        report = {
+            'result': errors[0] if errors else err.ERR_OK,
+            'keyframes': results,
+            'played': len(played),
+            'skipped': sum(1 for r in results if r is not None and r['skipped']),
+            'maxLate': max(lateness) if lateness else 0.0,
+            'meanLate': sum(lateness) / len(lateness) if lateness else 0.0,
+            'duration': max((r['end'] for r in played), default=0.0),
+        }
+        LensSequence.log.info(f'Sequence played {report["played"]}/{len(self.keyframes)} keyframes in {report["duration"]:.2f} s (max late {report["maxLate"] * 1000:.1f} ms)')
+        return report
+
+    ############ internal functions ##############################################################
+    def _tracks(self) -> dict[str, list[tuple[int, tuple]]]:
+        '''
+        Keyframes of each motor in time order: {motor: [(keyframe index, keyframe)]}
+        '''
+        tracks: dict[str, list[tuple[int, tuple]]] = {}
+        for i, keyframe in enumerate(self.keyframes):
+            tracks.setdefault(keyframe[1], []).append((i, keyframe))
+        return tracks
+
+    @staticmethod
+    def _predict(motor, mode:str, target:int, position:int) -> tuple[float, int]:
+        '''
+        Predict the move time of a keyframe.
+        ### return:
+        [(s) move time, step after the move]
+        '''
+        speed = motor.currentSpeed
+        if mode == 'state':
+            return motor.moveModel.predict(MCR_IRC_SWITCH_TIME, MCR_IRC_DEFAULT_SPEED) / 1000, position
+        if mode == 'rel':
+            moves = [abs(m) for m in motor._relMoves(target, position=position)] if target != 0 else []
+            step = position + target
+        else:
+            # absolute moves and homing go through the PI unless the position is trusted
+            step = motor.PIStep if mode == 'home' else min(max(target, 0), motor.maxSteps)
+            if motor.trustedPosition and motor.positionReferenced and mode == 'abs':
+                moves = [abs(m) for m in motor._relMoves(step - position, position=position)] if step != position else []
+            else:
+                moves = [abs(position - motor.PIStep), abs(motor.PIStep - step)]
+        moveTime = sum(motor.moveModel.predict(n, speed) for n in moves) + max(0, len(moves) - 1) * MCR_MOVE_REST_TIME * 1000
+        return moveTime / 1000, step
+
+    def _playTrack(self, MCR, track:list[tuple[int, tuple]], startTime:float, lateLimit:float | None, results:list):
+        '''
+        (track thread) Send the keyframes of one motor at their times.  If a keyframe command fails (returns an error
+        code or raises an exception, e.g. errList.MCRError in the raiseErrors mode) the error code is the keyframe result
+        and the rest of the track is skipped.
+        '''
+        motor = getattr(MCR, track[0][1][1])
+        for n, (i, (t, name, target, mode)) in enumerate(track):
+            deadline = startTime + t
+            remaining = deadline - time.monotonic()
+            if remaining > SEQ_SPIN_TIME:
+                time.sleep(remaining - SEQ_SPIN_TIME)
+            while time.monotonic() < deadline:
+                time.sleep(0)
+            start = time.monotonic()
+            late = start - deadline
+            result = {'time': t, 'motor': name, 'target': target, 'mode': mode, 'start': start - startTime, 'end': start - startTime,
+                'late': late, 'skipped': False, 'result': err.ERR_OK, 'step': motor.currentStep}
+            if lateLimit is not None and late > lateLimit:
+                LensSequence.log.warning(f'Sequence keyframe {i} ({name} {mode} {target}) skipped ({late * 1000:.0f} ms late)')
+                result['skipped'] = True
+                results[i] = result
+                continue
+            try:
+                if mode == 'abs':
+                    result['result'] = motor.moveAbs(target)
+                elif mode == 'rel':
+                    result['result'] = motor.moveRel(target)
+                elif mode == 'state':
+                    state = motor.state(target)
+                    result['result'] = state if state < 0 else err.ERR_OK
+                else:
+                    result['result'] = motor.home()
+            except err.MCRError as e:
+                LensSequence.log.error(f'Sequence keyframe {i} ({name} {mode} {target}) failed: {e}')
+                result['result'] = e.errNum
+            except Exception as e:
+                LensSequence.log.exception(f'Sequence keyframe {i} ({name} {mode} {target}) failed: {e}')
+                err.saveError(err.ERR_BAD_MOVE, err.MOD_MCR, err.errLine(), MCR.errors)
+                result['result'] = err.ERR_BAD_MOVE
+            else:
+                if result['result'] >= 0:
+                    result['end'] = time.monotonic() - startTime
+                    result['step'] = motor.currentStep
+                    results[i] = result
+                    continue
+                LensSequence.log.error(f'Sequence keyframe {i} ({name} {mode} {target}) failed: error {result["result"]}')
+
+            # stop the track: the motor position is unknown
+            result['end'] = time.monotonic() - startTime
+            result['step'] = motor.currentStep
+            results[i] = result
+            for j, (tSkip, _, targetSkip, modeSkip) in track[n + 1:]:
+                results[j] = {'time': tSkip, 'motor': name, 'target': targetSkip, 'mode': modeSkip, 'start': result['end'],
+                    'end': result['end'], 'late': 0.0, 'skipped': True, 'result': err.ERR_OK, 'step': motor.currentStep}
+            if len(track) > n + 1:
+                LensSequence.log.warning(f'Sequence {name} track stopped, {len(track) - n - 1} keyframes skipped')
+            return
@@ -0,0 +1,217 @@
+# Theia Technologies MCR fleet control module
+# This module opens and initializes many MCR600 series boards (one lens per board) in parallel and sends commands
+# to all the boards at the same time.  The board and motor functions are the MCRControl functions.
+# See more information at https://github.com/cliquot22/TheiaMCR
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+from __future__ import annotations
+import concurrent.futures
+import threading
+import time
+from typing import Any, Callable
+from TheiaMCR.TheiaMCR import MCRControl
+import TheiaMCR.errList as err
+
+LENS_PROFILES = {                       # lens motor parameters {'focus': (steps, PI), 'zoom': (steps, PI), 'iris': steps, 'IRC': bool}
+    'TL1250P N6': {'focus': (8390, 7959), 'zoom': (3227, 3119), 'iris': 75, 'IRC': True},
+}
+FLEET_MOTORS = ('focus', 'zoom', 'iris', 'IRC')
+
+class MCRFleet():
+    log = MCRControl.log
+
+    def __init__(self, lenses:dict[str, str | dict], maxWorkers:int=16, ioThread:bool=False, logFiles:bool=False, journal:bool|str=False, telemetry:bool|str=False):
+        '''
+        Control many MCR boards in parallel.  Each board has one lens described by a lens profile.  The boards are
+        opened and the motors initialized (and homed) in parallel with open().  Commands are sent to all boards at
+        the same time with broadcast() or the homeAll() and IRCState() functions.
+
+        Use:
+        fleet = MCRFleet({'com4': 'TL1250P N6', 'com5': {'focus': (8390, 7959), 'zoom': (3227, 3119)}})
+        fleet.open()
+        fleet.broadcast(lambda MCR: MCR.focus.moveAbs(6000))
+        fleet.close()
+        ### input:
+        - lenses: {serial port name: lens profile name (LENS_PROFILES) or profile dictionary}
+            profile dictionary keys (all optional): 'focus': (steps, PI), 'zoom': (steps, PI), 'iris': steps, 'IRC': True
+        - maxWorkers: (optional, 16) maximum number of boards initialized or commanded at the same time
+        - ioThread: (optional, False) use the dedicated serial port I/O thread for each board (see MCRControl)
+        - logFiles: (optional, False) create the log files for each board
+        - journal: (optional, False) keep the motor positions in a position journal for each board so open() can skip homing (see MCRControl)
+        - telemetry: (optional, False) record the command telemetry of each board (see MCRControl)
+        ### public functions:
+        - open(self, move:bool=True) -> dict[str, bool]
+        - broadcast(self, func:Callable[[MCRControl], Any], ports:list[str]|None=None) -> dict[str, Any]
+        - homeAll(self, ports:list[str]|None=None) -> dict[str, int]
+        - IRCState(self, state:int, ports:list[str]|None=None) -> dict[str, int]
+        - health(self) -> dict
+        - close(self)
+        ### variables:
+        - boards: {serial port name: MCRControl instance} (the boards that were opened)
+        '''
+        self.profiles: dict[str, dict] = {}
+        for port, profile in lenses.items():
+            if isinstance(profile, str):
+                if profile not in LENS_PROFILES:
+                    raise ValueError(f'unknown lens profile {profile} (available: {", ".join(LENS_PROFILES)})')
+                profile = LENS_PROFILES[profile]
+            self.profiles[port] = profile
+        self.maxWorkers = maxWorkers
+        self.ioThread = ioThread
+        self.logFiles = logFiles
+        self.journal = journal
+        self.telemetry = telemetry
+        self.boards: dict[str, MCRControl] = {}
+        self.initResults: dict[str, bool] = {}
+        self._openLock = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='MCRFleet')
+
+    def __getitem__(self, port:str) -> MCRControl:
+        return self.boards[port]
+
+    def open(self, move:bool=True) -> dict[str, bool]:
+        '''
+        Open all the boards and initialize the motors in parallel.  With move True the focus, zoom and iris motors are
+        homed during the initialization.
+        ### input:
+        - move: (optional, True) home the motors during initialization
+        ### return:
+        {serial port name: success (board and all the lens motors initialized)}
+        '''
+        start = time.monotonic()
+        results = self._map(lambda port: self._openBoard(port, move), list(self.profiles))
+        self.initResults = {port: result is True for port, result in results.items()}
+        MCRFleet.log.info(f'Fleet initialized {sum(self.initResults.values())}/{len(self.initResults)} boards in {time.monotonic() - start:.1f} s')
+        return dict(self.initResults)
+
+    def broadcast(self, func:Callable[[MCRControl], Any], ports:list[str]|None=None) -> dict[str, Any]:
+        '''
+        Call a function for each board at the same time.  Exceptions are returned as the result of the board.
+        ### input:
+        - func: function called with the MCRControl instance (ex. lambda MCR: MCR.zoom.moveAbs(1000))
+        - ports: (optional, all opened boards) serial port names
+        ### return:
+        {serial port name: function result}
+        '''
+        ports = [p for p in (ports if ports is not None else list(self.boards)) if p in self.boards]
+        return self._map(lambda port: func(self.boards[port]), ports)
+
+    def homeAll(self, ports:list[str]|None=None) -> dict[str, int]:
+        '''
+        Home the focus, zoom and iris motors of all the boards at the same time (the motors of one board are homed in
+        sequence).
+        ### input:
+        - ports: (optional, all opened boards) serial port names
+        ### return:
+        {serial port name: OK = 0 | first error code}
+        '''
+        def home(MCR:MCRControl) -> int:
+            result = err.ERR_OK
+            for motor in (MCR.focus, MCR.zoom, MCR.iris):
+                if isinstance(motor, MCRControl.motor):
+                    success = motor.home()
+                    if success < 0 and result == err.ERR_OK:
+                        result = success
+            return result
+        return self.broadcast(home, ports)
+
+    def IRCState(self, state:int, ports:list[str]|None=None) -> dict[str, int]:
+        '''
+        Set the IRC filter of all the boards at the same time (ex. IRCState(1) for all day mode).
+        ### input:
+        - state: IRC filter state (1 or 2, see the lens specification)
+        - ports: (optional, all opened boards) serial port names
+        ### return:
+        {serial port name: state | error code}
+        '''
+        def setState(MCR:MCRControl) -> int:
+            if not isinstance(MCR.IRC, MCRControl.motor):
+                return err.ERR_NOT_INIT
+            return MCR.IRC.state(state)
+        return self.broadcast(setState, ports)
+
+    def health(self) -> dict:
+        '''
+        Get the fleet health.
+        ### return:
+        {
+            'boards': number of boards, 'initialized': boards initialized, 'communicating': boards with working communication,
+            'restarts': total serial port restarts, 'timeouts': total command timeouts, 'errors': total serial port errors,
+            'failed': [serial port names not initialized or not communicating],
+            'ports': {serial port name: {'initialized', 'communicating', 'restarts', 'timeouts', 'errors', 'motors': {name: initialized}}}
+        }
+        '''
+        ports = {}
+        for port in self.profiles:
+            MCR = self.boards.get(port)
+            if MCR is None:
+                ports[port] = {'initialized': False, 'communicating': False, 'restarts': 0, 'timeouts': 0, 'errors': 0, 'motors': {}}
+                continue
+            commands = MCR.metrics.snapshot()['commands'].values()
+            ports[port] = {
+                'initialized': bool(MCR.boardInitialized) and self.initResults.get(port, False),
+                'communicating': bool(MCR.boardCommunicationState),
+                'restarts': MCR.boardCommunicationRestarts,
+                'timeouts': sum(c['outcomes'].get('timeout', 0) for c in commands),
+                'errors': sum(c['outcomes'].get('error', 0) for c in commands),
+                'motors': {name: isinstance(getattr(MCR, name), MCRControl.motor) for name in FLEET_MOTORS if name in self.profiles[port]},
+            }
+        return {
+            'boards': len(ports),
+            'initialized': sum(p['initialized'] for p in ports.values()),
+            'communicating': sum(p['communicating'] for p in ports.values()),
+            'restarts': sum(p['restarts'] for p in ports.values()),
+            'timeouts': sum(p['timeouts'] for p in ports.values()),
+            'errors': sum(p['errors'] for p in ports.values()),
+            'failed': [port for port, p in ports.items() if not (p['initialized'] and p['communicating'])],
+            'ports': ports,
+        }
+
+    def close(self):
+        '''
+        Close all the boards and stop the worker threads.
+        '''
+        self._map(lambda port: self.boards[port].close(), list(self.boards))
+        self.boards.clear()
+        self._pool.shutdown(wait=True)
+
+    ############ internal functions ##############################################################
+    def _openBoard(self, port:str, move:bool) -> bool:
+        '''
+        Open one board and initialize the lens motors.
+        '''
+        # MCRControl initialization sets up the shared module logging so the boards are opened one at a time.  The
+        # motor initialization (homing) is done in parallel.
+        with self._openLock:
+            MCR = MCRControl(port, logFiles=self.logFiles, ioThread=self.ioThread, journal=self.journal, telemetry=self.telemetry)
+        if not MCR.boardInitialized:
+            MCRFleet.log.error(f'Fleet board {port} was not initialized')
+            return False
+        self.boards[port] = MCR
+        profile = self.profiles[port]
+        success = True
+        if 'focus' in profile:
+            success &= MCR.focusInit(*profile['focus'], move=move)
+        if 'zoom' in profile:
+            success &= MCR.zoomInit(*profile['zoom'], move=move)
+        if 'iris' in profile:
+            success &= MCR.irisInit(profile['iris'], move=move)
+        if profile.get('IRC', False):
+            success &= MCR.IRCInit()
+        if not success:
+            MCRFleet.log.error(f'Fleet board {port} motor initialization failed')
+        return bool(success)
+
+    def _map(self, func:Callable[[str], Any], ports:list[str]) -> dict[str, Any]:
+        futures = {port: self._pool.submit(func, port) for port in ports}
+        results = {}
+        for port, future in futures.items():
+            try:
+                results[port] = future.result()
+            except Exception as e:
+                MCRFleet.log.error(f'Fleet board {port} error: {e}')
+                results[port] = e
+        return results
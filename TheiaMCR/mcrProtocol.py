@@ -0,0 +1,265 @@
+# MCR600 series board protocol codec
+# Command and response frame layouts for the MCR600 series boards.  The frames are packed and unpacked with
+# precompiled struct formats.  motorFrames keeps preallocated command buffers for each motor so the move and setup
+# commands are built without allocating new byte strings.  frameParser splits the received byte stream into response
+# frames.
+# See the motor control documentation (https://theiatech.com/mcr) for the command descriptions.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.3.0 261018 idempotent and relative move command classification for the command retries
+# v.1.2.0 261018 hexFrame: hex rendering of frames for the debug logs when the record is formatted
+# v.1.1.0 261018 streaming response frame parser (frameParser)
+# v.1.0.0 261018
+
+from __future__ import annotations
+import struct
+
+# command and response frame layouts (big endian)
+MOVE_FRAME = struct.Struct('>BBHBHB')       # [move cmd (0x62, 0x66, 0x73), motor ID, steps, start (1), speed, CR]
+SETUP_FRAME = struct.Struct('>BBBBBHHHB')   # [0x63 write / 0x67 read response, motor ID, motor type, wide/far stop, tele/near stop, max steps, min speed, max speed, CR]
+MOTOR_FRAME = struct.Struct('>BBB')         # [cmd, motor ID, CR] read motor setup (0x67) command
+STATUS_FRAME = struct.Struct('>BBB')        # [response ID, status, CR] move and write setup responses
+PATH_FRAME = struct.Struct('>BBB')          # [0x6B, path, CR] set communication path
+FW_REVISION_FRAME = bytes([0x76, 0x0D])     # read FW revision
+BOARD_SN_FRAME = bytes([0x79, 0x0D])        # read board SN
+FAILED_RESPONSE = bytes([0x74, 0x01, 0x0D]) # response used when the board didn't respond (status 1: failed)
+CR = 0x0D
+FRAME_GAP_TIME = 0.05                   # (s) time without received bytes before an incomplete frame is discarded (see frameParser.resync)
+
+MCR_RESPONSE_IDS = {                    # response ID (first byte) for commands that don't echo the command byte in the response
+    0x62: 0x74, 0x66: 0x74, 0x73: 0x74, # move responses [0x74, status, 0x0D]
+}
+MCR_IDEMPOTENT_COMMANDS = frozenset({  # commands that give the same result when sent again (read FW, read SN, read/write setup, move to PI referenced step)
+    0x76, 0x79, 0x67, 0x63, 0x73,
+})
+MCR_RELATIVE_MOVES = frozenset({0x62, 0x66})   # relative moves: the position is unknown if the response is lost
+MCR_MOVE_COMMANDS = frozenset({0x62, 0x66, 0x73})   # motor moves: relative (0x62 positive, 0x66 negative direction), to the PI and back (0x73); one at a time per board (see MCRCom._sendOnce)
+MCR_MOTOR_ID_RESPONSES = frozenset({0x67})     # responses with the motor ID in the second byte [0x67, motor ID, ...]
+MCR_RESPONSE_LENGTHS = {                # response frame lengths (bytes) by response ID for fixed length responses; others end at the first 0x0D
+    0x74: STATUS_FRAME.size,            # move response
+    0x67: SETUP_FRAME.size,             # read motor setup (data bytes may include 0x0D)
+}
+MCR_RESPONSE_MAX_LENGTHS = {            # maximum frame lengths (bytes) by response ID for responses that end at the first 0x0D
+    0x63: 12,                           # write motor setup [0x63, status, 0x0D]
+    0x76: 16,                           # FW revision [0x76, digits, 0x0D]
+    0x79: 16,                           # board SN [0x79, BCD digits, 0x0D]
+}
+MCR_RESPONSE_STARTS = {*MCR_RESPONSE_LENGTHS, *MCR_RESPONSE_MAX_LENGTHS}   # response IDs that start a frame
+MCR_NO_RESPONSE = {                     # forced responses for commands that don't generate a response
+    0x6B: bytes([0x6B, 0x00, CR]),      # set communication path
+}
+
+##### frames ######################################################
+def moveFrame(FWCommand:int, motorID:int, steps:int, speed:int) -> bytearray:
+    '''
+    Format a new motor move command byte string (see motorFrames.move to reuse a buffer).
+    Command byte array:
+    [move cmd, motor ID, steps (2), start, speed (2), CR]
+    ### input:
+    - FWCommand: firmware command byte (0x62, 0x66, 0x73)
+    - motorID: motor ID byte
+    - steps: unsigned number of steps
+    - speed: (pps) motor speed
+    ### return:
+    [command byte string]
+    '''
+    cmd = bytearray(MOVE_FRAME.size)
+    MOVE_FRAME.pack_into(cmd, 0, FWCommand, motorID, int(steps), 1, int(speed), CR)
+    return cmd
+
+def setupFrame(motorID:int, motorType:int, useWideFarStop:bool, useTeleNearStop:bool, maxSteps:int, minSpeed:int, maxSpeed:int) -> bytearray:
+    '''
+    Format a new write motor setup (0x63) command byte string.
+    ### return:
+    [command byte string]
+    '''
+    cmd = bytearray(SETUP_FRAME.size)
+    SETUP_FRAME.pack_into(cmd, 0, 0x63, motorID, motorType, int(useWideFarStop), int(useTeleNearStop), int(maxSteps), int(minSpeed), int(maxSpeed), CR)
+    return cmd
+
+def parseSetup(frame:bytes) -> tuple[int, bool, bool, int, int, int]:
+    '''
+    Unpack a read motor setup (0x67) response or a write motor setup (0x63) command.
+    ### input:
+    - frame: 12 byte frame
+    ### return:
+    [motor type, use wide/far stop, use tele/near stop, max steps, min speed, max speed]
+    ### raises:
+    - struct.error if the frame is not 12 bytes
+    '''
+    _, _, motorType, useWideFarStop, useTeleNearStop, maxSteps, minSpeed, maxSpeed, _ = SETUP_FRAME.unpack(frame)
+    return motorType, bool(useWideFarStop), bool(useTeleNearStop), maxSteps, minSpeed, maxSpeed
+
+def pathFrame(path:int) -> bytes:
+    '''
+    Format the set communication path (0x6B) command byte string.
+    ### input:
+    - path: I2C (0), USB (1), UART (2)
+    '''
+    return PATH_FRAME.pack(0x6B, path, CR)
+
+def responseID(cmdID:int) -> int:
+    '''
+    Get the response ID (first byte of the response frame) for a command.
+    ### input:
+    - cmdID: command byte
+    ### return:
+    [response ID]
+    '''
+    return MCR_RESPONSE_IDS.get(cmdID, cmdID)
+
+class hexFrame():
+    '''
+    Frame for a debug log argument (e.g. log.debug('   -> %s', hexFrame(cmd))).  The frame is copied (command buffers
+    are reused) and rendered as '62:01:...' only if a log handler formats the record.
+    '''
+    __slots__ = ('frame',)
+
+    def __init__(self, frame:bytes):
+        self.frame = bytes(frame)
+
+    def __str__(self) -> str:
+        return self.frame.hex(':')
+
+class motorFrames():
+    __slots__ = ('motorID', 'motorType', 'readSetup', '_move', '_setup')
+
+    def __init__(self, motorID:int, motorType:int=0):
+        '''
+        Preallocated command buffers for one motor.  move() and setup() pack the values into the buffer of the command
+        and return it so the buffer is only valid until the next command of the same type is built for this motor.
+        Use moveFrame/setupFrame for frames that are kept (e.g. a list of moves).
+        ### input:
+        - motorID: motor ID byte
+        - motorType: (optional, 0) stepper (0) or DC (1) motor
+        ### public functions:
+        - move(self, FWCommand:int, steps:int, speed:int) -> bytearray
+        - setup(self, useWideFarStop:bool, useTeleNearStop:bool, maxSteps:int, minSpeed:int, maxSpeed:int) -> bytearray
+        ### variables:
+        - readSetup: read motor setup (0x67) command
+        '''
+        self.motorID = motorID
+        self.motorType = motorType
+        self.readSetup = MOTOR_FRAME.pack(0x67, motorID, CR)
+        self._move = {FWCommand: moveFrame(FWCommand, motorID, 0, 0) for FWCommand in MCR_MOVE_COMMANDS}
+        self._setup = setupFrame(motorID, motorType, False, False, 0, 0, 0)
+
+    def move(self, FWCommand:int, steps:int, speed:int) -> bytearray:
+        '''
+        Pack a move command (see moveFrame).
+        ### return:
+        [preallocated command buffer]
+        '''
+        cmd = self._move[FWCommand]
+        MOVE_FRAME.pack_into(cmd, 0, FWCommand, self.motorID, steps, 1, speed, CR)
+        return cmd
+
+    def setup(self, useWideFarStop:bool, useTeleNearStop:bool, maxSteps:int, minSpeed:int, maxSpeed:int) -> bytearray:
+        '''
+        Pack a write motor setup (0x63) command (see setupFrame).
+        ### return:
+        [preallocated command buffer]
+        '''
+        SETUP_FRAME.pack_into(self._setup, 0, 0x63, self.motorID, self.motorType, useWideFarStop, useTeleNearStop, maxSteps, minSpeed, maxSpeed, CR)
+        return self._setup
+
+class frameParser():
+    __slots__ = ('_buffer', 'discardedBytes')
+
+    def __init__(self):
+        '''
+        Streaming response frame parser for one serial port.  The received bytes are kept in a rolling buffer and split
+        into complete frames.  Frames with a known length (MCR_RESPONSE_LENGTHS) must end with 0x0D at that length,
+        other frames (MCR_RESPONSE_MAX_LENGTHS) end at the first 0x0D.  A frame can only start with a response ID that a
+        waiting command expects.  Bytes that can't start a frame (garbage, a partial frame or the late response of a
+        command that timed out) are discarded up to the next possible frame start so the stream resynchronizes without
+        reopening the serial port.
+        ### public functions:
+        - feed(self, data:bytes, expected:set[int]|None=None) -> list[bytes]
+        - resync(self, expected:set[int]|None=None) -> list[bytes]
+        - clear(self)
+        ### variables:
+        - pending: number of bytes of an incomplete frame in the buffer
+        - discardedBytes: total bytes discarded
+        '''
+        self._buffer = bytearray()
+        self.discardedBytes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data:bytes, expected:set[int] | None=None) -> list[bytes]:
+        '''
+        Add received bytes.
+        ### input:
+        - data: received bytes
+        - expected: (optional, all response IDs) response IDs of the waiting commands
+        ### return:
+        [complete frames in the order received]
+        '''
+        self._buffer += data
+        return self._split(expected)
+
+    def resync(self, expected:set[int] | None=None) -> list[bytes]:
+        '''
+        Discard the incomplete frame at the start of the buffer (call when no bytes were received for FRAME_GAP_TIME).
+        A false frame start (e.g. a garbage byte equal to a response ID) is skipped and the following bytes are split again.
+        ### input:
+        - expected: (optional, all response IDs) response IDs of the waiting commands
+        ### return:
+        [complete frames found after the discarded bytes]
+        '''
+        if not self._buffer:
+            return []
+        self._discard(self._nextStart(1, expected))
+        return self._split(expected)
+
+    def clear(self):
+        ''' Discard all the received bytes. '''
+        self._discard(len(self._buffer))
+
+    ############ internal functions ##############################################################
+    def _split(self, expected:set[int] | None) -> list[bytes]:
+        frames = []
+        buffer = self._buffer
+        while buffer:
+            responseID = buffer[0]
+            if expected is None or responseID in expected:
+                length = MCR_RESPONSE_LENGTHS.get(responseID, 0)
+                if length > 0:
+                    if len(buffer) < length:
+                        break
+                    if buffer[length - 1] == CR:
+                        frames.append(bytes(buffer[:length]))
+                        del buffer[:length]
+                        continue
+                else:
+                    maxLength = MCR_RESPONSE_MAX_LENGTHS.get(responseID, 0)
+                    if maxLength > 0:
+                        end = buffer.find(b'\x0D', 1, maxLength)
+                        if end > 0:
+                            frames.append(bytes(buffer[:end + 1]))
+                            del buffer[:end + 1]
+                            continue
+                        if len(buffer) < maxLength:
+                            break
+            # not a frame start or a bad frame: skip to the next possible frame start
+            self._discard(self._nextStart(1, expected))
+        return frames
+
+    def _nextStart(self, start:int, expected:set[int] | None) -> int:
+        '''
+        Find the next byte (from start) that can start a frame.
+        ### return:
+        [index | buffer length if there is no frame start]
+        '''
+        starts = MCR_RESPONSE_STARTS if expected is None else expected
+        found = [i for i in (self._buffer.find(responseID, start) for responseID in starts) if i >= 0]
+        return min(found) if found else len(self._buffer)
+
+    def _discard(self, length:int):
+        if length > 0:
+            self.discardedBytes += length
+            del self._buffer[:length]
@@ -0,0 +1,507 @@
+# Theia Technologies MCR600 firmware simulator
+# This module simulates a MCR600 series board with a lens attached so MCRControl can be tested and benchmarked without
+# hardware.  The simulator is a pyserial URL handler: use the port name "mcrsim://<board name>?<options>" in place of the
+# com port name.  The motor moves take the time calculated from the steps and speed, the focus and zoom motors have a
+# PI limit switch and the lens gear train has backlash.  Faults (dropped responses, garbage bytes, fragmented responses,
+# serial port loss) can be injected to test the timing and recovery functions.
+# See more information at https://github.com/cliquot22/TheiaMCR
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+from __future__ import annotations
+import heapq
+import random
+import threading
+import time
+import urllib.parse as urlparse
+import serial
+from serial.serialutil import SerialBase, SerialException, PortNotOpenError
+from TheiaMCR.TheiaMCR import MCR_FOCUS_MOTOR_ID, MCR_ZOOM_MOTOR_ID, MCR_IRIS_MOTOR_ID, MCR_IRC_MOTOR_ID
+
+# register the mcrsim:// URL handler (TheiaMCR/protocol_mcrsim.py) for serial.serial_for_url
+if 'TheiaMCR' not in serial.protocol_handler_packages:
+    serial.protocol_handler_packages.append('TheiaMCR')
+
+SIM_COMMAND_LENGTHS = {                 # command frame lengths (bytes)
+    0x76: 2, 0x79: 2,                   # read FW revision, read board SN
+    0x67: 3, 0x6B: 3,                   # read motor setup, set communication path
+    0x63: 12,                           # write motor setup
+    0x62: 8, 0x66: 8, 0x73: 8,          # move commands
+}
+SIM_LENS = {                            # default lens (TL1250P N6): {motor ID: (steps, PI step | None, min speed, max speed)}
+    MCR_FOCUS_MOTOR_ID: (8390, 7959, 100, 1500),
+    MCR_ZOOM_MOTOR_ID: (3227, 3119, 100, 1500),
+    MCR_IRIS_MOTOR_ID: (75, None, 10, 200),
+    MCR_IRC_MOTOR_ID: (50, None, 10, 1000),     # IRC DC motor: switch time (ms) at 1000 pps
+}
+SIM_REBOOT_TIME = 0.7                   # (s) board reboot time after setting the communication path
+SIM_FRAGMENT_DELAY = 0.01               # (s) maximum delay between the pieces of a fragmented response (less than FRAME_GAP_TIME)
+SIM_USB_PATH = 1                        # communication path of the simulated serial port
+
+_boards: dict[str, simBoard] = {}
+_boardsLock = threading.Lock()
+
+def simulatorBoard(name:str='default') -> simBoard | None:
+    '''
+    Get the simulated board (to check the motor positions or change the faults).  The board is created when the
+    port "mcrsim://<name>" is opened the first time.
+    ### input:
+    - name: (optional, 'default') board name from the port URL
+    ### return:
+    [simulated board | None if the port was never opened]
+    '''
+    with _boardsLock:
+        return _boards.get(name)
+
+def resetSimulators():
+    '''
+    Remove all the simulated boards.  The next open creates a new board with new motor positions.
+    '''
+    with _boardsLock:
+        for board in _boards.values():
+            board.stop()
+        _boards.clear()
+
+#####################################################################################
+# simulated lens motor
+class simMotor():
+    def __init__(self, motorID:int, steps:int, PIStep:int|None, minSpeed:int, maxSpeed:int, backlash:int, position:int):
+        '''
+        One lens motor.  The motor step position and the lens position differ by up to the backlash amount; the lens
+        only starts moving after the backlash is taken up when the motor reverses.  The hard stops (0 and steps) and
+        the PI switch act on the lens position.
+        ### input:
+        - motorID: motor ID byte
+        - steps: lens range (hard stop to hard stop)
+        - PIStep: PI switch step position or None if the motor has no PI
+        - minSpeed, maxSpeed: (pps) speed range stored in the board setup
+        - backlash: (steps) lens backlash
+        - position: starting lens position
+        ### variables:
+        - lensPos: lens position (steps)
+        - motorPos: motor position (steps)
+        - wideFarStop, teleNearStop, maxSteps, minSpeed, maxSpeed: board setup (0x63/0x67)
+        - busyUntil: (monotonic time) end of the current move
+        - moveCount, stepCount: number of moves and steps (including backlash and stalled steps)
+        '''
+        self.motorID = motorID
+        self.motorType = 0x01 if motorID == MCR_IRC_MOTOR_ID else 0x00
+        self.lensSteps = steps
+        self.PIStep = PIStep
+        self.PISide = 1 if PIStep is not None and PIStep > steps / 2 else -1
+        self.backlash = backlash if PIStep is not None else 0
+        self.lensPos = position
+        self.motorPos = position
+        self.wideFarStop = False
+        self.teleNearStop = False
+        self.maxSteps = steps
+        self.minSpeed = minSpeed
+        self.maxSpeed = maxSpeed
+        self.busyUntil = 0.0
+        self.moveCount = 0
+        self.stepCount = 0
+
+    def setup(self) -> bytes:
+        ''' read motor setup (0x67) response '''
+        return bytes([0x67, self.motorID, self.motorType, int(self.wideFarStop), int(self.teleNearStop),
+            (self.maxSteps >> 8) & 0xFF, self.maxSteps & 0xFF, (self.minSpeed >> 8) & 0xFF, self.minSpeed & 0xFF,
+            (self.maxSpeed >> 8) & 0xFF, self.maxSpeed & 0xFF, 0x0D])
+
+    def writeSetup(self, frame:bytes):
+        ''' write motor setup (0x63) command '''
+        self.wideFarStop = bool(frame[3])
+        self.teleNearStop = bool(frame[4])
+        self.maxSteps = (frame[5] << 8) | frame[6]
+        self.minSpeed = (frame[7] << 8) | frame[8]
+        self.maxSpeed = (frame[9] << 8) | frame[10]
+        if self.wideFarStop != self.teleNearStop and self.PIStep is not None:
+            self.PISide = 1 if self.wideFarStop else -1
+
+    def PIBlocked(self) -> bool:
+        ''' the lens is at or past the PI switch '''
+        if self.PIStep is None:
+            return False
+        return (self.lensPos - self.PIStep) * self.PISide >= 0
+
+    def move(self, direction:int, steps:int) -> int:
+        '''
+        Relative move (0x66: +1, 0x62: -1).  The move stops at the PI if the PI stop is set in the board setup.
+        ### return:
+        [motor steps taken]
+        '''
+        stopAtPI = self.PIStep is not None and direction == self.PISide and (self.wideFarStop if self.PISide == 1 else self.teleNearStop)
+        if stopAtPI:
+            steps = 0 if self.PIBlocked() else min(steps, self._stepsToLens(self.PIStep, direction))
+        self.moveCount += 1
+        self._step(direction, steps)
+        return steps
+
+    def moveToPI(self, steps:int) -> tuple[int, bool]:
+        '''
+        Absolute move (0x73).  Move to the PI then the number of steps away from the PI.
+        ### return:
+        [motor steps taken, PI was found]
+        '''
+        if self.PIStep is None:
+            return 0, False
+        self.moveCount += 1
+        toPI = 0 if self.PIBlocked() else self._stepsToLens(self.PIStep, self.PISide)
+        if toPI > self.maxSteps:
+            # PI not found within the range, the motor stops at the hard stop
+            self._step(self.PISide, self.maxSteps)
+            return self.maxSteps, False
+        self._step(self.PISide, toPI)
+        self._step(-self.PISide, steps)
+        return toPI + steps, True
+
+    def _stepsToLens(self, target:int, direction:int) -> int:
+        ''' motor steps until the lens reaches the target moving in the direction '''
+        if direction > 0:
+            return 0 if self.lensPos >= target else max(0, target + self.backlash - self.motorPos)
+        return 0 if self.lensPos <= target else max(0, self.motorPos - target)
+
+    def _step(self, direction:int, steps:int):
+        self.stepCount += steps
+        self.motorPos += direction * steps
+        if direction > 0:
+            self.lensPos = max(self.lensPos, self.motorPos - self.backlash)
+        else:
+            self.lensPos = min(self.lensPos, self.motorPos)
+        # the lens stops at the hard stops and the motor stalls
+        self.lensPos = min(max(self.lensPos, 0), self.lensSteps)
+        self.motorPos = min(max(self.motorPos, self.lensPos), self.lensPos + self.backlash)
+
+#####################################################################################
+# simulated board
+class simBoard():
+    def __init__(self, name:str, seed:int|None=None, timeScale:float=1.0, latency:float=0.5, backlash:int=20,
+            dropRate:float=0.0, garbageRate:float=0.0, fragmentRate:float=0.0, portLoss:int=0, FWRevision:str='5.3.1.0.0', boardSN:str='055-001234'):
+        '''
+        Simulated MCR600 board firmware.  The board keeps the motor positions and setup when the serial port is
+        closed and reopened.
+        ### input:
+        - name: board name
+        - seed: (optional) random seed for the starting motor positions and the faults
+        - timeScale: (optional, 1.0) move time multiplier (e.g. 0.1 to run the moves 10x faster)
+        - latency: (optional, 0.5) (ms) response latency
+        - backlash: (optional, 20) (steps) focus and zoom lens backlash
+        - dropRate: (optional, 0) probability that a response is not sent
+        - garbageRate: (optional, 0) probability that random bytes are sent before a response
+        - fragmentRate: (optional, 0) probability that a response is sent in pieces (up to SIM_FRAGMENT_DELAY apart)
+        - portLoss: (optional, 0) lose the serial port connection at this command number (0: never)
+        - FWRevision: (optional) firmware revision string
+        - boardSN: (optional) board serial number string
+        ### variables:
+        - motors: {motor ID: simMotor}
+        - commandCount, droppedResponses, garbageCount, fragmentCount, portLosses: counters
+        - bytesIn, bytesOut: bytes received from and sent to the serial port
+        - motorTime: (s) total simulated move time
+        '''
+        self.name = name
+        self.timeScale = timeScale
+        self.latency = latency / 1000
+        self.dropRate = dropRate
+        self.garbageRate = garbageRate
+        self.fragmentRate = fragmentRate
+        self.portLoss = portLoss
+        self.FWRevision = FWRevision
+        self.boardSN = boardSN
+        self._random = random.Random(seed)
+        self.motors = {motorID: simMotor(motorID, steps, PIStep, minSpeed, maxSpeed, backlash, self._random.randint(0, steps))
+            for motorID, (steps, PIStep, minSpeed, maxSpeed) in SIM_LENS.items()}
+        self.commandCount = 0
+        self.droppedResponses = 0
+        self.garbageCount = 0
+        self.fragmentCount = 0
+        self.portLosses = 0
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.motorTime = 0.0
+        self.port: MCRSimulator | None = None
+        self._commPath = SIM_USB_PATH
+        self._rebootUntil = 0.0
+        self._buffer = bytearray()
+        self._events: list[tuple[float, int, MCRSimulator, bytes]] = []
+        self._eventCount = 0
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f'MCR simulator {name}', daemon=True)
+        self._thread.start()
+
+    def setFaults(self, dropRate:float|None=None, garbageRate:float|None=None, portLoss:int|None=None, fragmentRate:float|None=None):
+        '''
+        Change the fault injection.
+        ### input:
+        - dropRate: (optional) probability that a response is not sent
+        - garbageRate: (optional) probability that random bytes are sent before a response
+        - fragmentRate: (optional) probability that a response is sent in pieces
+        - portLoss: (optional) lose the serial port connection at this command number (0: never)
+        '''
+        with self._cond:
+            if dropRate is not None: self.dropRate = dropRate
+            if garbageRate is not None: self.garbageRate = garbageRate
+            if portLoss is not None: self.portLoss = portLoss
+            if fragmentRate is not None: self.fragmentRate = fragmentRate
+
+    def losePort(self):
+        '''
+        Lose the serial port connection now (as if the USB cable was disconnected).  The port can be opened again.
+        '''
+        with self._cond:
+            port = self.port
+            if port is None:
+                return
+            self.portLosses += 1
+            self.port = None
+            self._events = [e for e in self._events if e[2] is not port]
+            heapq.heapify(self._events)
+            self._buffer.clear()
+        port._lose()
+
+    def stop(self):
+        ''' stop the response thread '''
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    ############ internal functions ##############################################################
+    def _attach(self, port:MCRSimulator):
+        with self._cond:
+            if self.port is not None:
+                raise SerialException(f'could not open port {port.port}: port is in use')
+            self.port = port
+            self._buffer.clear()
+
+    def _detach(self, port:MCRSimulator):
+        with self._cond:
+            if self.port is port:
+                self.port = None
+                self._events = [e for e in self._events if e[2] is not port]
+                heapq.heapify(self._events)
+
+    def _receive(self, port:MCRSimulator, data:bytes):
+        '''
+        Split the received bytes into command frames.  Unknown bytes are skipped.
+        '''
+        lost = False
+        with self._cond:
+            self.bytesIn += len(data)
+            self._buffer += data
+            while self._buffer:
+                length = SIM_COMMAND_LENGTHS.get(self._buffer[0], 0)
+                if length == 0:
+                    del self._buffer[0]
+                    continue
+                if len(self._buffer) < length:
+                    break
+                frame = bytes(self._buffer[:length])
+                del self._buffer[:length]
+                self.commandCount += 1
+                if self.portLoss and self.commandCount >= self.portLoss:
+                    self.portLoss = 0
+                    lost = True
+                    break
+                self._command(port, frame)
+        if lost:
+            self.losePort()
+
+    def _command(self, port:MCRSimulator, frame:bytes):
+        now = time.monotonic()
+        if now < self._rebootUntil or self._commPath != SIM_USB_PATH:
+            # not listening on the serial port
+            return
+        cmdID = frame[0]
+        motor = self.motors.get(frame[1]) if len(frame) > 2 else None
+        if cmdID == 0x76:
+            self._respond(port, bytes([0x76, *[int(d, 16) for d in self.FWRevision.split('.')], 0x0D]))
+        elif cmdID == 0x79:
+            prefix, number = self.boardSN.split('-')
+            self._respond(port, bytes([0x79]) + bytes.fromhex(prefix + '0') + bytes.fromhex(number) + b'\x0D')
+        elif cmdID == 0x67:
+            self._respond(port, motor.setup() if motor is not None else bytes([0x67] + [0xFF] * 10 + [0x0D]))
+        elif cmdID == 0x63:
+            if motor is not None:
+                motor.writeSetup(frame)
+            self._respond(port, bytes([0x63, 0x00 if motor is not None else 0x01, 0x0D]))
+        elif cmdID == 0x6B:
+            # set communication path: no response, the board reboots
+            self._commPath = frame[1]
+            self._rebootUntil = now + SIM_REBOOT_TIME
+        else:
+            steps = (frame[2] << 8) | frame[3]
+            speed = (frame[5] << 8) | frame[6]
+            if motor is None or speed <= 0 or not motor.minSpeed <= speed <= motor.maxSpeed or now < motor.busyUntil:
+                self._respond(port, bytes([0x74, 0x01, 0x0D]))
+                return
+            if cmdID == 0x73:
+                stepsTaken, success = motor.moveToPI(steps)
+            else:
+                stepsTaken, success = motor.move(1 if cmdID == 0x66 else -1, steps), True
+            moveTime = stepsTaken / speed * self.timeScale
+            motor.busyUntil = now + moveTime
+            self.motorTime += moveTime
+            self._respond(port, bytes([0x74, 0x00 if success else 0x01, 0x0D]), moveTime)
+
+    def _respond(self, port:MCRSimulator, response:bytes, delay:float=0.0):
+        if self._random.random() < self.dropRate:
+            self.droppedResponses += 1
+            return
+        if self._random.random() < self.garbageRate:
+            self.garbageCount += 1
+            response = bytes(self._random.randrange(256) for _ in range(self._random.randint(1, 4))) + response
+        sendTime = time.monotonic() + self.latency + delay
+        pieces = [response]
+        if len(response) > 1 and self._random.random() < self.fragmentRate:
+            self.fragmentCount += 1
+            split = self._random.randint(1, len(response) - 1)
+            pieces = [response[:split], response[split:]]
+        for piece in pieces:
+            self._eventCount += 1
+            heapq.heappush(self._events, (sendTime, self._eventCount, port, piece))
+            sendTime += self._random.uniform(0, SIM_FRAGMENT_DELAY)
+        self._cond.notify()
+
+    def _run(self):
+        '''
+        (response thread) Send the responses to the serial port at their scheduled times.
+        '''
+        with self._cond:
+            while self._running:
+                if not self._events:
+                    self._cond.wait()
+                    continue
+                wait = self._events[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, _, port, response = heapq.heappop(self._events)
+                self.bytesOut += len(response)
+                port._deliver(response)
+
+#####################################################################################
+# simulated serial port
+class MCRSimulator(SerialBase):
+    '''
+    Serial port connected to a simulated MCR600 board.  Open it with serial.serial_for_url("mcrsim://<name>?<options>")
+    or use the URL as the MCRControl port name.
+    URL options (see simBoard): seed, timeScale, latency, backlash, dropRate, garbageRate, fragmentRate, portLoss, FWRevision, boardSN.
+    The options are used when the board is created (the first time the port is opened).
+    ex: MCR = TheiaMCR.MCRControl('mcrsim://bench?seed=1&timeScale=0.1')
+    '''
+    BAUDRATES = (9600, 19200, 38400, 57600, 115200)
+    SIM_OPTIONS = {'seed': int, 'timeScale': float, 'latency': float, 'backlash': int, 'dropRate': float,
+        'garbageRate': float, 'fragmentRate': float, 'portLoss': int, 'FWRevision': str, 'boardSN': str}
+
+    def __init__(self, *args, **kwargs):
+        self.board: simBoard | None = None
+        self._rx = bytearray()
+        self._rxCond = threading.Condition()
+        self._cancel = False
+        self._lost = False
+        super().__init__(*args, **kwargs)
+
+    def open(self):
+        if self.is_open:
+            raise SerialException('Port is already open.')
+        if self._port is None:
+            raise SerialException('Port must be configured before it can be used.')
+        name, options = self._fromURL(self.port)
+        with _boardsLock:
+            board = _boards.get(name)
+            if board is None:
+                board = _boards[name] = simBoard(name, **options)
+        board._attach(self)
+        self.board = board
+        self._lost = False
+        self._rx.clear()
+        self.is_open = True
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            if self.board is not None:
+                self.board._detach(self)
+            self.cancel_read()
+        super().close()
+
+    def _reconfigure_port(self):
+        pass
+
+    def _fromURL(self, url:str) -> tuple[str, dict]:
+        parts = urlparse.urlsplit(url)
+        if parts.scheme != 'mcrsim':
+            raise SerialException(f'expected a string in the form "mcrsim://<name>[?option=value]": not starting with mcrsim:// ({parts.scheme!r})')
+        options = {}
+        for option, values in urlparse.parse_qs(parts.query, True).items():
+            if option not in MCRSimulator.SIM_OPTIONS:
+                raise SerialException(f'unknown mcrsim option: {option!r}')
+            try:
+                options[option] = MCRSimulator.SIM_OPTIONS[option](values[0])
+            except ValueError as e:
+                raise SerialException(f'mcrsim option {option}: {e}')
+        return parts.netloc or 'default', options
+
+    @property
+    def in_waiting(self) -> int:
+        self._checkOpen()
+        return len(self._rx)
+
+    def read(self, size:int=1) -> bytes:
+        '''
+        Read up to size bytes.  Blocks until size bytes are received or the timeout expires (or cancel_read is called).
+        '''
+        self._checkOpen()
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+        with self._rxCond:
+            while len(self._rx) < size and not self._cancel and not self._lost and self.is_open:
+                wait = None if deadline is None else deadline - time.monotonic()
+                if wait is not None and wait <= 0:
+                    break
+                self._rxCond.wait(wait)
+            self._cancel = False
+            if self._lost and not self._rx:
+                raise SerialException('device reports readiness to read but returned no data (device disconnected or multiple access on port?)')
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+        return data
+
+    def write(self, data) -> int:
+        self._checkOpen()
+        if self._lost:
+            raise SerialException('write failed: device disconnected')
+        data = bytes(data)
+        self.board._receive(self, data)
+        return len(data)
+
+    def cancel_read(self):
+        with self._rxCond:
+            self._cancel = True
+            self._rxCond.notify_all()
+
+    def reset_input_buffer(self):
+        self._checkOpen()
+        with self._rxCond:
+            self._rx.clear()
+
+    def reset_output_buffer(self):
+        self._checkOpen()
+
+    @property
+    def out_waiting(self) -> int:
+        return 0
+
+    def _checkOpen(self):
+        if not self.is_open:
+            raise PortNotOpenError()
+
+    def _deliver(self, data:bytes):
+        with self._rxCond:
+            self._rx += data
+            self._rxCond.notify_all()
+
+    def _lose(self):
+        with self._rxCond:
+            self._lost = True
+            self._rxCond.notify_all()
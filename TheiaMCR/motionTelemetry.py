@@ -0,0 +1,186 @@
+# Motion telemetry for the MCR600 series boards
+# Every command sent to a board is recorded as a fixed size binary record (time, motor, opcode, target, speed, motor
+# steps, predicted and actual duration, outcome) in a daily telemetry file per board.  The records are written to a
+# buffered file (flushed at most TELEMETRY_FLUSH_INTERVAL after a record, also when the board is idle) so recording a
+# command costs a struct pack and a buffer copy.
+# The files are read into NumPy arrays by telemetryAnalyzer.py for wear and performance analysis.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.0 261018
+
+from __future__ import annotations
+import logging
+import math
+import os
+import re
+import struct
+import threading
+import time
+from TheiaMCR.mcrProtocol import MOVE_FRAME, CR
+
+log = logging.getLogger('TheiaMCR.TheiaMCR.MCRControl.motionTelemetry')
+
+TELEMETRY_MAGIC = b'MCRT'
+TELEMETRY_VERSION = 1
+TELEMETRY_HEADER = struct.Struct('<4sBB')          # [magic, version, record size]
+TELEMETRY_RECORD = struct.Struct('<dBBiHiffB')     # [time (epoch s), motor ID, opcode, target, speed, motor steps (-1: unknown), predicted (ms, NaN: unknown), actual (ms), outcome]
+TELEMETRY_FLUSH_INTERVAL = 1.0          # (s) maximum time a record stays in the file buffer
+TELEMETRY_BUFFER_SIZE = 1 << 16         # (bytes) file buffer size
+
+# outcomes
+TELEMETRY_OK = 0
+TELEMETRY_FAILED = 1                    # the board returned a failed status
+TELEMETRY_NO_RESPONSE = 2               # timed out or the serial port was lost
+
+MOVE_OPCODES = (0x62, 0x66, 0x73)
+STATUS_OPCODES = (*MOVE_OPCODES, 0x63)  # commands with a [response ID, status, CR] response
+MOTOR_OPCODES = (*MOVE_OPCODES, 0x63, 0x67)
+
+def telemetryDirectory() -> str:
+    '''
+    Default telemetry folder in AppData/Local (Windows) or .local/share (Linux) (next to the log folder).
+    ### return:
+    [AppData/Local/TheiaMCR/telemetry | .local/share/TheiaMCR/telemetry]
+    '''
+    if os.name == 'nt':  # Windows
+        appDataPath = os.getenv('LOCALAPPDATA')
+        if appDataPath is None:
+            appDataPath = os.getcwd()
+    else:  # Linux, macOS, etc.
+        appDataPath = os.path.expanduser('~/.local/share')
+    return os.path.join(appDataPath, 'TheiaMCR', 'telemetry')
+
+class motionTelemetry():
+    def __init__(self, boardKey:str, directory:str | None=None):
+        '''
+        Telemetry stream of one board.  The records of each day are appended to telemetry-<board key>-<yymmdd>.bin:
+        [TELEMETRY_HEADER] + [TELEMETRY_RECORD] for each command (little endian).
+        ### input:
+        - boardKey: board serial number (or port name) used in the file names
+        - directory: (optional, telemetryDirectory()) telemetry folder
+        ### public functions:
+        - command(self, cmd:bytes, response:bytes|None, actual:float, steps:int|None=None, predicted:float|None=None, timestamp:float|None=None)
+        - record(self, motorID:int, opcode:int, target:int, speed:int, steps:int, predicted:float, actual:float, outcome:int, timestamp:float|None=None)
+        - flush(self)
+        - close(self)
+        ### variables:
+        - filename: current telemetry file
+        - records: number of records written
+        '''
+        self.directory = directory if directory is not None else telemetryDirectory()
+        os.makedirs(self.directory, exist_ok=True)
+        self.boardKey = re.sub(r'[^A-Za-z0-9_.-]+', '_', boardKey).strip('_') or 'board'
+        self.filename = ''
+        self.records = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._dayStart = 0.0            # (epoch s) local time span of the open file
+        self._dayEnd = 0.0
+        self._lastFlush = time.monotonic()
+        self._flushTimer: threading.Timer | None = None     # flushes the buffered records if no other record is written
+
+    def command(self, cmd:bytes, response:bytes | None, actual:float, steps:int | None=None, predicted:float | None=None, timestamp:float | None=None):
+        '''
+        Record a command.  The motor, target and speed are read from the command frame.
+        ### input:
+        - cmd: command frame
+        - response: response frame | None if there was no response
+        - actual: (ms) time from sending the command to the response
+        - steps: (optional, move frames: unknown for 0x73) motor steps moved
+        - predicted: (optional, unknown) (ms) predicted move time
+        - timestamp: (optional, now) (epoch s) time the command was sent
+        '''
+        opcode = cmd[0]
+        motorID, target, speed = 0, 0, 0
+        if opcode in MOVE_OPCODES and len(cmd) == MOVE_FRAME.size:
+            _, motorID, target, _, speed, _ = MOVE_FRAME.unpack(cmd)
+            if steps is None and opcode != 0x73:
+                steps = target
+        elif opcode in MOTOR_OPCODES and len(cmd) > 2:
+            motorID = cmd[1]
+        if response is None or len(response) < 2:
+            outcome = TELEMETRY_NO_RESPONSE
+        elif opcode in STATUS_OPCODES and (response[1] != 0x00 or response[-1] != CR):
+            outcome = TELEMETRY_FAILED
+        else:
+            outcome = TELEMETRY_OK
+        self.record(motorID, opcode, target, speed, -1 if steps is None else steps, math.nan if predicted is None else predicted,
+            actual, outcome, timestamp)
+
+    def record(self, motorID:int, opcode:int, target:int, speed:int, steps:int, predicted:float, actual:float, outcome:int, timestamp:float | None=None):
+        '''
+        Write a telemetry record (see TELEMETRY_RECORD).
+        '''
+        timestamp = time.time() if timestamp is None else timestamp
+        data = TELEMETRY_RECORD.pack(timestamp, motorID, opcode, target, speed, steps, predicted, actual, outcome)
+        with self._lock:
+            try:
+                if not self._dayStart <= timestamp < self._dayEnd:
+                    self._open(timestamp)
+                self._file.write(data)
+                self.records += 1
+                now = time.monotonic()
+                if now - self._lastFlush >= TELEMETRY_FLUSH_INTERVAL:
+                    self._file.flush()
+                    self._lastFlush = now
+                elif self._flushTimer is None:
+                    self._flushTimer = threading.Timer(TELEMETRY_FLUSH_INTERVAL - (now - self._lastFlush), self._timedFlush)
+                    self._flushTimer.daemon = True
+                    self._flushTimer.start()
+            except (OSError, AttributeError) as e:
+                # AttributeError: the file couldn't be opened
+                log.error(f'Telemetry record not written ({e})')
+
+    def flush(self):
+        '''
+        Write the buffered records to the file.
+        '''
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._lastFlush = time.monotonic()
+
+    def close(self):
+        '''
+        Write the buffered records and close the telemetry file.
+        '''
+        with self._lock:
+            if self._flushTimer is not None:
+                self._flushTimer.cancel()
+                self._flushTimer = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._dayStart = self._dayEnd = 0.0
+
+    ############ internal functions ##############################################################
+    def _timedFlush(self):
+        '''
+        (timer thread) Write the records buffered since the last flush.
+        '''
+        with self._lock:
+            self._flushTimer = None
+            if self._file is not None:
+                try:
+                    self._file.flush()
+                except OSError as e:
+                    log.error(f'Telemetry records not written ({e})')
+                self._lastFlush = time.monotonic()
+
+    def _open(self, timestamp:float):
+        '''
+        Open (append) the telemetry file of the day of the timestamp (called with the lock held).  A new file starts
+        with the header.
+        '''
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        local = time.localtime(timestamp)
+        self._dayStart = time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1))
+        self._dayEnd = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        day = time.strftime('%y%m%d', local)
+        self.filename = os.path.join(self.directory, f'telemetry-{self.boardKey}-{day}.bin')
+        self._file = open(self.filename, 'ab', buffering=TELEMETRY_BUFFER_SIZE)
+        if self._file.tell() == 0:
+            self._file.write(TELEMETRY_HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, TELEMETRY_RECORD.size))
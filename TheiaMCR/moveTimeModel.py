@@ -0,0 +1,161 @@
+# Move time model for the MCR600 series boards
+# Per-motor model of the move command time (command written to move response received):
+#   time (ms) = overhead + scale * steps / speed * 1000
+# The overhead (command and response latency, acceleration ramps) and the scale (actual versus nominal step rate) are
+# fitted by exponentially weighted least squares to the completed moves so the model follows slow changes
+# (temperature, wear).  The command wait times (deadlines) are the prediction plus a margin from the prediction error
+# of the recent moves.  Until the model has enough moves the fixed wait time factors are used.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.0 261018
+
+from __future__ import annotations
+import math
+import threading
+
+MODEL_MIN_SAMPLES = 5                   # completed moves before the model replaces the fixed wait time factors
+MODEL_FORGET = 0.98                     # weight of the previous moves for each new move (about the last 50 moves are used)
+MODEL_SIGMAS = 4                        # deadline margin in standard deviations of the prediction error
+MODEL_MIN_MARGIN = 20                   # (ms) minimum deadline margin
+MODEL_RATE_MARGIN = 0.05                # minimum deadline margin as a fraction of the predicted time
+MODEL_MIN_SPREAD = 5                    # (ms) minimum nominal move time spread to fit the scale (otherwise the scale is 1)
+MODEL_SHORT_MOVE = 0.5                  # moves shorter than this fraction of the prediction are not used (e.g. stopped at a limit switch)
+
+class moveTimeModel():
+    def __init__(self, forget:float=MODEL_FORGET, minSamples:int=MODEL_MIN_SAMPLES):
+        '''
+        Move time model of one motor.
+        ### input:
+        - forget: (optional, 0.98) weight of the previous moves for each new move
+        - minSamples: (optional, 5) completed moves before the model is calibrated
+        ### public functions:
+        - predict(self, steps:int, speed:int) -> float
+        - deadline(self, steps:int, speed:int, fallback:int) -> int
+        - observe(self, steps:int, speed:int, elapsed:float) -> bool
+        - snapshot(self) -> dict
+        - reset(self)
+        ### variables:
+        - calibrated: True when the model has enough completed moves
+        - overhead: (ms) fixed time of each move
+        - scale: actual move time / nominal move time (steps / speed)
+        - sigma: (ms) standard deviation of the prediction error
+        '''
+        self.forget = forget
+        self.minSamples = minSamples
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def calibrated(self) -> bool:
+        return self.samples >= self.minSamples
+
+    def reset(self):
+        ''' Clear the completed moves (use the fixed wait time factors until the model is calibrated again). '''
+        with self._lock:
+            self.samples = 0
+            self.rejected = 0
+            self.overhead = 0.0
+            self.scale = 1.0
+            self.sigma = 0.0
+            self._sums = [0.0] * 6      # weighted sums: w, w*x, w*x^2, w*y, w*x*y, w*y^2
+            self._variance = None
+
+    def predict(self, steps:int, speed:int) -> float:
+        '''
+        Predict the move time.  The nominal time (steps / speed) is used until the model is calibrated.
+        ### input:
+        - steps: motor steps moved
+        - speed: (pps) motor speed
+        ### return:
+        [(ms) predicted move time]
+        '''
+        nominal = abs(steps) / speed * 1000 if speed > 0 else 0.0
+        if not self.calibrated:
+            return nominal
+        return max(0.0, self.overhead + self.scale * nominal)
+
+    def deadline(self, steps:int, speed:int, fallback:int) -> int:
+        '''
+        Command wait time for a move: the predicted time plus the larger of MODEL_SIGMAS standard deviations of the
+        prediction error, MODEL_MIN_MARGIN and MODEL_RATE_MARGIN of the predicted time.
+        ### input:
+        - steps: motor steps moved
+        - speed: (pps) motor speed
+        - fallback: (ms) wait time if the model is not calibrated
+        ### return:
+        [(ms) wait time]
+        '''
+        if not self.calibrated:
+            return fallback
+        predicted = self.predict(steps, speed)
+        return int(math.ceil(predicted + max(MODEL_MIN_MARGIN, MODEL_SIGMAS * self.sigma, MODEL_RATE_MARGIN * predicted)))
+
+    def observe(self, steps:int, speed:int, elapsed:float) -> bool:
+        '''
+        Add a completed move.  A move that is much shorter than the prediction (stopped at a limit switch or hard
+        stop) is not used.
+        ### input:
+        - steps: motor steps moved
+        - speed: (pps) motor speed
+        - elapsed: (ms) time from the command write to the move response
+        ### return:
+        [True if the move was used]
+        '''
+        if speed <= 0 or elapsed < 0:
+            return False
+        x = abs(steps) / speed * 1000
+        with self._lock:
+            if self.calibrated:
+                residual = elapsed - (self.overhead + self.scale * x)
+                if elapsed < MODEL_SHORT_MOVE * (self.overhead + self.scale * x) - MODEL_MIN_MARGIN:
+                    self.rejected += 1
+                    return False
+                self._variance = residual * residual if self._variance is None else self.forget * self._variance + (1 - self.forget) * residual * residual
+                self.sigma = math.sqrt(self._variance)
+            sums = self._sums
+            for i in range(6):
+                sums[i] *= self.forget
+            sums[0] += 1
+            sums[1] += x
+            sums[2] += x * x
+            sums[3] += elapsed
+            sums[4] += x * elapsed
+            sums[5] += elapsed * elapsed
+            self.samples += 1
+            self._fit()
+            if self.samples == self.minSamples:
+                # first prediction error estimate from the fit residual of the calibration moves
+                self._variance = max(0.0, self._residualVariance())
+                self.sigma = math.sqrt(self._variance)
+            return True
+
+    def snapshot(self) -> dict:
+        '''
+        ### return:
+        {'calibrated', 'samples', 'rejected', 'overhead' (ms), 'scale', 'sigma' (ms)}
+        '''
+        with self._lock:
+            return {'calibrated': self.calibrated, 'samples': self.samples, 'rejected': self.rejected,
+                'overhead': round(self.overhead, 3), 'scale': round(self.scale, 5), 'sigma': round(self.sigma, 3)}
+
+    ############ internal functions ##############################################################
+    def _fit(self):
+        '''
+        Weighted least squares fit of the overhead and scale (called with the lock held).
+        '''
+        w, sx, sxx, sy, sxy, _ = self._sums
+        meanX = sx / w
+        varX = sxx / w - meanX * meanX
+        if varX > MODEL_MIN_SPREAD * MODEL_MIN_SPREAD:
+            self.scale = max(0.0, (sxy / w - meanX * sy / w) / varX)
+        # else all the moves are about the same length: keep the scale and fit the overhead
+        self.overhead = sy / w - self.scale * meanX
+
+    def _residualVariance(self) -> float:
+        '''
+        Weighted mean squared residual of the fit (called with the lock held).
+        '''
+        w, sx, sxx, sy, sxy, syy = self._sums
+        a, b = self.overhead, self.scale
+        return (syy - 2 * a * sy - 2 * b * sxy + a * a * w + 2 * a * b * sx + b * b * sxx) / w
@@ -0,0 +1,169 @@
+# Motor position journal for the MCR600 series boards
+# The last known step of each stepper motor is kept in a JSON file per board (keyed by the board serial number) so
+# the motor initialization can skip the homing move after the program restarts.  The file is written atomically
+# (temporary file and replace) after each completed move.  A motor is marked as moving before each move command so
+# an interrupted move is never restored.
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.0 261018
+
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger('TheiaMCR.TheiaMCR.MCRControl.positionJournal')
+
+JOURNAL_VERSION = 1
+
+def journalDirectory() -> str:
+    '''
+    Default journal folder in AppData/Local (Windows) or .local/share (Linux) (next to the log folder).
+    ### return:
+    [AppData/Local/TheiaMCR/journal | .local/share/TheiaMCR/journal]
+    '''
+    if os.name == 'nt':  # Windows
+        appDataPath = os.getenv('LOCALAPPDATA')
+        if appDataPath is None:
+            appDataPath = os.getcwd()
+    else:  # Linux, macOS, etc.
+        appDataPath = os.path.expanduser('~/.local/share')
+    return os.path.join(appDataPath, 'TheiaMCR', 'journal')
+
+class positionJournal():
+    def __init__(self, boardSN:str, directory:str | None=None, fsync:bool=False):
+        '''
+        Position journal of one board.  Each motor entry holds:
+        - step: last known step (only positions referenced at the PI are journaled)
+        - moving: True while a move command is in progress
+        - steps, pi: motor parameters the entry is valid for
+        - setup: board motor configuration (motor type, max steps, min speed, max speed)
+        - stepsSinceHome, movesSinceHome: trusted position counters (see setTrustedPosition)
+        - time: (epoch) time of the last update
+        ### input:
+        - boardSN: board serial number (readBoardSN)
+        - directory: (optional, journalDirectory()) journal folder
+        - fsync: (optional, False) flush each write to the disk (protects the journal from power loss as well as program crashes)
+        ### public functions:
+        - restore(self, motorID:int, steps:int, pi:int, setup:tuple) -> dict | None
+        - moving(self, motorID:int)
+        - update(self, motorID:int, step:int, steps:int, pi:int, setup:tuple, stepsSinceHome:int=0, movesSinceHome:int=0)
+        - invalidate(self, motorID:int)
+        - entry(self, motorID:int) -> dict | None
+        ### variables:
+        - filename: journal file name
+        '''
+        directory = directory if directory is not None else journalDirectory()
+        os.makedirs(directory, exist_ok=True)
+        self.boardSN = boardSN
+        self.filename = os.path.join(directory, f'position-{boardSN}.json')
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._motors: dict[str, dict] = self._load()
+
+    def entry(self, motorID:int) -> dict | None:
+        '''
+        ### return:
+        [copy of the motor entry | None if the motor is not in the journal]
+        '''
+        with self._lock:
+            entry = self._motors.get(str(motorID))
+            return dict(entry) if entry is not None else None
+
+    def restore(self, motorID:int, steps:int, pi:int, setup:tuple) -> dict | None:
+        '''
+        Get the motor entry if it is valid for the motor: the last move was completed and the motor parameters and
+        board motor configuration are the same.
+        ### input:
+        - motorID: motor ID
+        - steps, pi: motor parameters
+        - setup: board motor configuration (motor type, max steps, min speed, max speed) read before the motor initialization
+        ### return:
+        [motor entry | None if there is no valid entry]
+        '''
+        entry = self.entry(motorID)
+        if entry is None:
+            return None
+        if entry['moving']:
+            log.info(f'Position journal motor 0x{motorID:02X}: last move was interrupted')
+            return None
+        if entry['steps'] != steps or entry['pi'] != pi:
+            log.info(f'Position journal motor 0x{motorID:02X}: motor parameters changed ({entry["steps"]}/{entry["pi"]} -> {steps}/{pi})')
+            return None
+        if list(entry['setup']) != list(setup):
+            log.info(f'Position journal motor 0x{motorID:02X}: board motor configuration changed ({entry["setup"]} -> {list(setup)})')
+            return None
+        return entry
+
+    def moving(self, motorID:int):
+        '''
+        Mark the motor as moving.  The file is only written if the motor has an entry that isn't already marked.
+        '''
+        with self._lock:
+            entry = self._motors.get(str(motorID))
+            if entry is None or entry['moving']:
+                return
+            entry['moving'] = True
+            self._write()
+
+    def update(self, motorID:int, step:int, steps:int, pi:int, setup:tuple, stepsSinceHome:int=0, movesSinceHome:int=0):
+        '''
+        Save the motor position after a completed move.
+        ### input:
+        - motorID: motor ID
+        - step: current step
+        - steps, pi: motor parameters
+        - setup: board motor configuration (motor type, max steps, min speed, max speed)
+        - stepsSinceHome, movesSinceHome: (optional, 0) trusted position counters
+        '''
+        with self._lock:
+            self._motors[str(motorID)] = {
+                'step': step, 'moving': False, 'steps': steps, 'pi': pi, 'setup': list(setup),
+                'stepsSinceHome': stepsSinceHome, 'movesSinceHome': movesSinceHome, 'time': round(time.time(), 3),
+            }
+            self._write()
+
+    def invalidate(self, motorID:int):
+        '''
+        Remove the motor entry (failed move or unknown position).
+        '''
+        with self._lock:
+            if self._motors.pop(str(motorID), None) is not None:
+                self._write()
+
+    ############ internal functions ##############################################################
+    def _load(self) -> dict[str, dict]:
+        '''
+        Read the journal file.  A missing, unreadable or different board journal is ignored.
+        '''
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning(f'Position journal {self.filename} could not be read ({e})')
+            return {}
+        if not isinstance(data, dict) or data.get('version') != JOURNAL_VERSION or data.get('boardSN') != self.boardSN:
+            log.warning(f'Position journal {self.filename} ignored (different version or board)')
+            return {}
+        return data.get('motors', {})
+
+    def _write(self):
+        '''
+        Write the journal to a temporary file and replace the journal file (called with the lock held).
+        '''
+        data = {'version': JOURNAL_VERSION, 'boardSN': self.boardSN, 'motors': self._motors}
+        temp = f'{self.filename}.tmp'
+        try:
+            with open(temp, 'w') as f:
+                json.dump(data, f)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(temp, self.filename)
+        except OSError as e:
+            log.error(f'Position journal {self.filename} could not be written ({e})')
@@ -0,0 +1,8 @@
+# pyserial URL handler for the simulated MCR600 board: serial.serial_for_url("mcrsim://<name>?<options>")
+# The module name is set by pyserial (protocol_<URL scheme>).  See mcrSimulator.py.
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+from TheiaMCR.mcrSimulator import MCRSimulator as Serial
@@ -1,14 +1,25 @@
 # Rotating log file handler for Python logging
 # This class creates a rotating log file handler that alternates between two log files.
+# In background mode the records are queued by emit() and a writer thread formats and writes them in batches.
 # Mark Peterson (c) 2025
 
 # Program revisions
+# v.1.2.0 261018 line count of existing files with a chunked byte scan (not readlines), size based rotation (maxBytes)
+# v.1.1.0 261018 background writer thread (background=True) with batched writes, periodic flush and optional fsync
 # v.1.0.1 250319 existing log files can be appended, not overwritten
 # v.1.0.0 250311
 
 import logging
 import os
 import errno
+import queue
+import threading
+import time
+
+LOG_FLUSH_INTERVAL = 0.5                # (s) background mode: maximum time a record waits before the file is flushed
+LOG_BATCH_SIZE = 500                    # background mode: maximum records written in one batch
+LOG_SCAN_CHUNK = 1 << 20               # (bytes) read size when counting the lines of an existing log file
+LOG_CLOSE_TIMEOUT = 5.0                 # (s) background mode: maximum time close() waits for the writer thread
 
 class rotatingLogFiles(logging.Handler):
     '''
@@ -18,22 +29,39 @@ class rotatingLogFiles(logging.Handler):
     log = logging.getLogger(__name__)   # set up a logger
     logging.basicConfig(level=logging.INFO, format='%(levelname)-7s ln:%(lineno)-4d %(module)-18s  %(message)s')    # define the basic log format for streaming console
     handler = rotatingLogFiles(log)   # create the rotating log file handler
+    handler = rotatingLogFiles(log, background=True)   # or write the records in a background thread
     # close the files and release the handler when done
     handler.close()
     '''
-    revision = 'v.1.0.1'
+    revision = 'v.1.2.0'
     
-    def __init__(self, logger, nameKey:str='', maxLines:int=10000):
+    def __init__(self, logger, nameKey:str='', maxLines:int=10000, background:bool=False, flushInterval:float=LOG_FLUSH_INTERVAL, fsync:bool=False, maxBytes:int=0):
         '''
         This class creates a rotating log file handler that alternates between two log files.
         ### input:  
         - logger: the logger instance to which this handler will be added
         - nameKey: the key to be used in the log file name (default is empty string)
-        - maxLines: the maximum number of lines in each log file before it rotates to the next log file
+        - maxLines: the maximum number of lines in each log file before it rotates to the next log file (0: no line limit)
+        - maxBytes: (optional, 0: no size limit) the maximum size of each log file before it rotates to the next log 
+            file.  With maxLines=0 the existing files are not scanned when they are opened (only the file size is read).  
+        - background: (optional, False) queue the records in emit() and format and write them in a background 
+            writer thread so logging doesn't wait for the file (e.g. slow SD cards).  The queued records are 
+            written by flush() and close().  
+        - flushInterval: (optional, LOG_FLUSH_INTERVAL) (s) background mode: the file is flushed when no records 
+            are waiting or at least this often while records keep arriving
+        - fsync: (optional, False) also sync the file to the disk at each flush and rotation
         ### public functions:  
+        flush(): write the queued records (background mode) and flush the file.  
         close(): this closes and cleans the file logging.  This should be called before ending the program.  
         '''
         super().__init__()
+        self.fsync = fsync
+        self.flushInterval = flushInterval
+        self._queue: queue.SimpleQueue | None = queue.SimpleQueue() if background else None
+        self._writer = None
+        self._writerStopped = False             # background mode: the writer thread wrote the last record
+        self._closing = False
+        self.fileHandle = None
         self.logger = logger
         formatter = logging.Formatter('%(asctime)s.%(msecs)03d,%(levelname)-7s,%(lineno)-5d,%(module)-10s,%(message)s','%y%m%d,%H:%M:%S')
         self.setFormatter(formatter) 
@@ -47,37 +75,155 @@ class rotatingLogFiles(logging.Handler):
             pass
 
         self.maxLogFileLines = maxLines
+        self.maxLogFileBytes = maxBytes
         self.currentLogFileNum = 0  # 0 or 1, indicating which file is active
         self.currentLogFileLine = 0
+        self.currentLogFileBytes = 0
         self.fileHandle = None
 
         # open the first log file
         self.fileHandle, self.currentLogFileLine = self.openLogFile(self.filenames[0])
-        if self.currentLogFileLine >= self.maxLogFileLines:
+        if self._full():
             self.fileHandle, self.currentLogFileLine = self.rotate()
                 
-        self.fileHandle.write('---------- module startup ----------------\n')
+        self._write(['---------- module startup ----------------'])
+
+        # background writer
+        if background:
+            self._writer = threading.Thread(target=self._writeRecords, name=f'TheiaMCR log {nameKey}', daemon=True)
+            self._writer.start()
 
     def emit(self, record:str):
         '''
-        Write the log record. 
+        Write the log record (or queue it for the background writer). 
         ### input:  
         - record: the log record to be written to the log file
         '''
         # check if the log file is available
         if self.fileHandle is None:
             return 
+        if self._queue is not None:
+            self._queue.put(record)
+            return
         # write into the log file
         try:
-            msg = self.format(record)
-            self.fileHandle.write(msg + '\n')
-            self.currentLogFileLine += 1
-            if self.currentLogFileLine >= self.maxLogFileLines:
-                self.fileHandle, self.currentLogFileLine = self.rotate()
+            self._write([self.format(record)])
         except Exception:
             self.handleError(record)
         return
 
+    def flush(self):
+        '''
+        Write the records queued for the background writer and flush the log file.  
+        '''
+        if self._queue is not None and self._writer is not None and self._writer.is_alive():
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait(LOG_CLOSE_TIMEOUT)
+            return
+        self.acquire()
+        try:
+            self._flushFile()
+        finally:
+            self.release()
+
+    def _write(self, messages:list[str]):
+        '''
+        Write formatted records to the log file and rotate the file when it reaches the maximum number of lines 
+        or the maximum size.  Each batch is written with one write call per log file.  A record can have several 
+        lines (e.g. an exception traceback).  
+        '''
+        while messages and self.fileHandle is not None:
+            count = len(messages)
+            if self.maxLogFileLines > 0 or self.maxLogFileBytes > 0:
+                # the record that reaches a limit is the last record in this file
+                lines = self.currentLogFileLine
+                size = self.currentLogFileBytes
+                for n, message in enumerate(messages):
+                    lines += message.count('\n') + 1
+                    if self.maxLogFileBytes > 0:
+                        size += self._byteLength(message + '\n')
+                    if (self.maxLogFileLines > 0 and lines >= self.maxLogFileLines) or \
+                            (self.maxLogFileBytes > 0 and size >= self.maxLogFileBytes):
+                        count = n + 1
+                        break
+            text = '\n'.join(messages[:count]) + '\n'
+            self.fileHandle.write(text)
+            self.currentLogFileLine += text.count('\n')
+            self.currentLogFileBytes += self._byteLength(text)
+            messages = messages[count:]
+            if self._full():
+                self.fileHandle, self.currentLogFileLine = self.rotate()
+
+    def _full(self) -> bool:
+        '''
+        Check if the current log file reached the maximum number of lines or the maximum size.  
+        '''
+        return (self.maxLogFileLines > 0 and self.currentLogFileLine >= self.maxLogFileLines) or \
+            (self.maxLogFileBytes > 0 and self.currentLogFileBytes >= self.maxLogFileBytes)
+
+    def _byteLength(self, text:str) -> int:
+        '''
+        Size of the text written to the log file (encoded, with the platform line ends).  
+        '''
+        size = len(text) if text.isascii() else len(text.encode(self.fileHandle.encoding, errors='replace'))
+        return size + (len(os.linesep) - 1) * text.count('\n')
+
+    def _flushFile(self):
+        if self.fileHandle is None:
+            return
+        self.fileHandle.flush()
+        if self.fsync:
+            os.fsync(self.fileHandle.fileno())
+
+    def _writeRecords(self):
+        '''
+        (writer thread) Format and write the queued records in batches.  The file is flushed when the queue is 
+        empty or after flushInterval.  A None record stops the thread after writing the records before it.  
+        '''
+        stop = False
+        lastFlush = 0.0
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=self.flushInterval)]
+            except queue.Empty:
+                continue
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            messages = []
+            flushEvents = []
+            for record in batch:
+                if record is None:
+                    stop = True
+                elif isinstance(record, threading.Event):
+                    flushEvents.append(record)
+                else:
+                    try:
+                        messages.append(self.format(record))
+                    except Exception:
+                        self.handleError(record)
+            try:
+                self._write(messages)
+                now = time.monotonic()
+                if stop or flushEvents or self._queue.empty() or now - lastFlush >= self.flushInterval:
+                    self._flushFile()
+                    lastFlush = now
+            except Exception as e:
+                print(f'Error writing log file: {e}')
+            for event in flushEvents:
+                event.set()
+        self.acquire()
+        try:
+            self._writerStopped = True
+            if self._closing:
+                # close() timed out while the thread was writing
+                self._closeFile()
+        finally:
+            self.release()
+
     # Find file paths based on development or deployment.  
     def createLogFilenames(self, nameKey:str='') -> list[str]:
         '''
@@ -128,17 +274,23 @@ class rotatingLogFiles(logging.Handler):
         - line number  
         ]
         '''
+        if self.fileHandle is not None:
+            self._flushFile()
+            self.fileHandle.close()
         self.currentLogFileNum = 1 - self.currentLogFileNum
         handle, length = self.openLogFile(self.filenames[self.currentLogFileNum])
-        if length >= self.maxLogFileLines:
+        self.currentLogFileLine = length
+        if self._full():
             # reset the file
             open(self.filenames[self.currentLogFileNum], 'w').close()
             length = 0
+            self.currentLogFileBytes = 0
         return handle, length
 
     def openLogFile(self, filename:str):
         '''
-        Open the log file.  
+        Open the log file.  The lines of an existing file are counted with a chunked byte scan (only if there 
+        is a line limit) and the file size is set in currentLogFileBytes.  
         ### input:  
         - filename: the file path to open
         ### return:  
@@ -152,39 +304,71 @@ class rotatingLogFiles(logging.Handler):
             # Create a new file
             open(filename, 'w').close()
             handle = open(filename, 'w')
+            self.currentLogFileBytes = 0
             return handle, 0
         
         # open an existing file and check the length
         logLength = 0
         try:
-            with open(filename, 'r') as file:
-                logLength = len(file.readlines())
+            self.currentLogFileBytes = os.path.getsize(filename)
+            if self.maxLogFileLines > 0:
+                logLength = self._countLines(filename)
         except Exception as e:
             # not able to open (corrupted file?),  delete the log file
             try:
                 os.remove(filename)
                 logLength = 0
+                self.currentLogFileBytes = 0
             except Exception as delete_error:
                 print(f"Error deleting {filename}: {delete_error}")
                 return None, -1
 
         handle = open(filename, 'a')
         return handle, logLength
+
+    @staticmethod
+    def _countLines(filename:str) -> int:
+        '''
+        Count the lines of a file in LOG_SCAN_CHUNK blocks (the file is not loaded into memory).  A last line 
+        without a line end is counted.  
+        '''
+        lines = 0
+        last = b'\n'
+        with open(filename, 'rb') as file:
+            while chunk := file.read(LOG_SCAN_CHUNK):
+                lines += chunk.count(b'\n')
+                last = chunk[-1:]
+        return lines + (last != b'\n')
     
     def close(self):
         ''' 
-        Close logging file handles and remove handler from logger.
+        Close logging file handles and remove handler from logger.  In background mode the queued records 
+        are written before the file is closed.  If the writer thread is still writing after LOG_CLOSE_TIMEOUT 
+        the thread closes the file when it is done.  
         '''
+        writer = self._writer
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(LOG_CLOSE_TIMEOUT)
+            if writer.is_alive():
+                print(f'Log file writer still writing after {LOG_CLOSE_TIMEOUT} s, the file is closed when it is done')
+            self._writer = None
         self.acquire()
         try:
-            if self.fileHandle:
-                self.fileHandle.close()
-            self.fileHandle = None
+            self._closing = True
+            if writer is None or self._writerStopped:
+                self._closeFile()
             self.logger.removeHandler(self)
         finally:
             self.release()
         logging.Handler.close(self)
 
+    def _closeFile(self):
+        if self.fileHandle:
+            self._flushFile()
+            self.fileHandle.close()
+        self.fileHandle = None
+
 
 ###################################################
 ### Demonstration of the class functions ##########
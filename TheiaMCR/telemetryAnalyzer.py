@@ -0,0 +1,170 @@
+# Motion telemetry analyzer for the MCR600 series boards
+# Loads the binary telemetry files written by motionTelemetry.py into a NumPy structured array and reports the move
+# counts, travel distance, homing frequency, failures and latency distributions of each motor.
+#   python -m TheiaMCR.telemetryAnalyzer [files or folders ...] [--days 7] [--json report.json]
+# Requires NumPy (pip install TheiaMCR[telemetry]).
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.0 261018
+
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import numpy as np
+from TheiaMCR.motionTelemetry import (telemetryDirectory, TELEMETRY_MAGIC, TELEMETRY_VERSION, TELEMETRY_HEADER,
+    TELEMETRY_OK, TELEMETRY_FAILED, TELEMETRY_NO_RESPONSE, MOVE_OPCODES)
+
+# record layout of TELEMETRY_RECORD
+TELEMETRY_DTYPE = np.dtype([
+    ('time', '<f8'), ('motor', 'u1'), ('opcode', 'u1'), ('target', '<i4'), ('speed', '<u2'),
+    ('steps', '<i4'), ('predicted', '<f4'), ('actual', '<f4'), ('outcome', 'u1'),
+])
+MOTOR_NAMES = {1: 'focus', 2: 'zoom', 3: 'iris', 4: 'IRC', 0: 'board'}
+
+def telemetryFiles(paths:list[str] | None=None, days:int | None=None) -> list[str]:
+    '''
+    Find the telemetry files.
+    ### input:
+    - paths: (optional, telemetryDirectory()) telemetry files and folders
+    - days: (optional, all) only the files modified in the last number of days
+    ### return:
+    [file names in name order (board, day)]
+    '''
+    files = []
+    for path in paths if paths else [telemetryDirectory()]:
+        files += sorted(glob.glob(os.path.join(path, 'telemetry-*.bin'))) if os.path.isdir(path) else [path]
+    if days is not None:
+        oldest = time.time() - days * 86400
+        files = [f for f in files if os.path.getmtime(f) >= oldest]
+    return files
+
+def loadTelemetry(files:list[str] | str) -> np.ndarray:
+    '''
+    Read telemetry files into one record array (TELEMETRY_DTYPE) in time order.  A partly written last record
+    (program stopped while writing) is ignored.
+    ### input:
+    - files: telemetry file name or list of file names (see telemetryFiles)
+    ### return:
+    [record array]
+    ### raises:
+    - OSError if a file can't be read, ValueError if a file is not a telemetry file
+    '''
+    arrays = []
+    for filename in [files] if isinstance(files, str) else files:
+        with open(filename, 'rb') as f:
+            data = f.read()
+        if len(data) < TELEMETRY_HEADER.size:
+            continue
+        magic, version, size = TELEMETRY_HEADER.unpack_from(data)
+        if magic != TELEMETRY_MAGIC or version != TELEMETRY_VERSION or size != TELEMETRY_DTYPE.itemsize:
+            raise ValueError(f'{filename} is not a version {TELEMETRY_VERSION} telemetry file')
+        count = (len(data) - TELEMETRY_HEADER.size) // size
+        arrays.append(np.frombuffer(data, TELEMETRY_DTYPE, count, TELEMETRY_HEADER.size))
+    records = np.concatenate(arrays) if arrays else np.zeros(0, TELEMETRY_DTYPE)
+    return records[np.argsort(records['time'], kind='stable')]
+
+def analyze(records:np.ndarray) -> dict:
+    '''
+    Move and latency statistics of each motor.  Homing moves are the 0x73 moves to the PI (target 0).
+    ### input:
+    - records: record array (see loadTelemetry)
+    ### return:
+    {
+        'start', 'end': (epoch s) time of the first and last record, 'days': time span (days), 'commands': number of records,
+        'motors': {motor name: {
+            'moves', 'homings', 'homingsPerDay', 'travel': (steps) known motor steps, 'unknownTravel': moves with unknown steps,
+            'failed', 'noResponse', 'latency': {'p50', 'p95', 'p99', 'max'} (ms) move time,
+            'predictionError': {'p50', 'p95'} (ms) actual - predicted move time
+        }},
+        'other': {opcode: {'count', 'failed', 'noResponse', 'latency': {...}}} non-move commands
+    }
+    '''
+    report = {'start': None, 'end': None, 'days': 0.0, 'commands': int(records.size), 'motors': {}, 'other': {}}
+    if records.size == 0:
+        return report
+    report['start'], report['end'] = float(records['time'][0]), float(records['time'][-1])
+    days = max((report['end'] - report['start']) / 86400, 1 / 24)      # at least 1 hour
+    report['days'] = round((report['end'] - report['start']) / 86400, 3)
+
+    isMove = np.isin(records['opcode'], MOVE_OPCODES)
+    moves = records[isMove]
+    for motorID in np.unique(moves['motor']).tolist():
+        m = moves[moves['motor'] == motorID]
+        ok = m['outcome'] == TELEMETRY_OK
+        known = m['steps'] >= 0
+        homings = int(np.count_nonzero((m['opcode'] == 0x73) & (m['target'] == 0)))
+        error = (m['actual'] - m['predicted'])[ok & ~np.isnan(m['predicted'])]
+        report['motors'][MOTOR_NAMES.get(motorID, f'0x{motorID:02X}')] = {
+            'moves': int(m.size),
+            'homings': homings,
+            'homingsPerDay': round(homings / days, 2),
+            'travel': int(m['steps'][known & ok].astype(np.int64).sum()),
+            'unknownTravel': int(np.count_nonzero(~known)),
+            'failed': int(np.count_nonzero(m['outcome'] == TELEMETRY_FAILED)),
+            'noResponse': int(np.count_nonzero(m['outcome'] == TELEMETRY_NO_RESPONSE)),
+            'latency': _percentiles(m['actual'][ok], (50, 95, 99, 100)),
+            'predictionError': _percentiles(error, (50, 95)),
+        }
+    other = records[~isMove]
+    for opcode in np.unique(other['opcode']).tolist():
+        c = other[other['opcode'] == opcode]
+        report['other'][f'0x{opcode:02X}'] = {
+            'count': int(c.size),
+            'failed': int(np.count_nonzero(c['outcome'] == TELEMETRY_FAILED)),
+            'noResponse': int(np.count_nonzero(c['outcome'] == TELEMETRY_NO_RESPONSE)),
+            'latency': _percentiles(c['actual'][c['outcome'] == TELEMETRY_OK], (50, 95, 99, 100)),
+        }
+    return report
+
+def printReport(report:dict):
+    '''
+    Print the analyze() report as tables.
+    '''
+    if report['commands'] == 0:
+        print('no telemetry records')
+        return
+    start = time.strftime('%Y-%m-%d %H:%M', time.localtime(report['start']))
+    end = time.strftime('%Y-%m-%d %H:%M', time.localtime(report['end']))
+    print(f'{report["commands"]} commands from {start} to {end} ({report["days"]:.2f} days)')
+    print(f'{"motor":8} {"moves":>8} {"homings":>8} {"home/day":>9} {"travel":>12} {"unknown":>8} {"failed":>7} {"no resp":>8} '
+        f'{"p50":>8} {"p95":>8} {"p99":>8} {"max":>8} {"err p50":>8} {"err p95":>8}')
+    for name, m in report['motors'].items():
+        lat, e = m['latency'], m['predictionError']
+        print(f'{name:8} {m["moves"]:>8} {m["homings"]:>8} {m["homingsPerDay"]:>9.2f} {m["travel"]:>12} {m["unknownTravel"]:>8} '
+            f'{m["failed"]:>7} {m["noResponse"]:>8} {lat["p50"]:>8.1f} {lat["p95"]:>8.1f} {lat["p99"]:>8.1f} {lat["max"]:>8.1f} '
+            f'{e["p50"]:>8.1f} {e["p95"]:>8.1f}')
+    if report['other']:
+        print(f'{"command":8} {"count":>8} {"failed":>7} {"no resp":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8}')
+        for opcode, c in report['other'].items():
+            lat = c['latency']
+            print(f'{opcode:8} {c["count"]:>8} {c["failed"]:>7} {c["noResponse"]:>8} {lat["p50"]:>8.1f} {lat["p95"]:>8.1f} {lat["p99"]:>8.1f} {lat["max"]:>8.1f}')
+    print('times in ms (latency of the successful commands, err: actual - predicted move time), travel in motor steps')
+
+def main(argv:list[str] | None=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m TheiaMCR.telemetryAnalyzer', description='TheiaMCR motion telemetry report')
+    parser.add_argument('paths', nargs='*', help=f'telemetry files or folders (default: {telemetryDirectory()})')
+    parser.add_argument('--days', type=float, default=None, help='only the files of the last number of days')
+    parser.add_argument('--json', default='', help='write the report to this JSON file')
+    args = parser.parse_args(argv)
+
+    report = analyze(loadTelemetry(telemetryFiles(args.paths, args.days)))
+    printReport(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+############ internal functions ##############################################################
+def _percentiles(values:np.ndarray, points:tuple[int, ...]) -> dict[str, float]:
+    names = {50: 'p50', 95: 'p95', 99: 'p99', 100: 'max'}
+    if values.size == 0:
+        return {names[p]: float('nan') for p in points}
+    return {names[p]: round(float(v), 2) for p, v in zip(points, np.percentile(values, points))}
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+# Zoom/focus tracking curves for the MCR600 series boards
+# A tracking curve is the focus step that keeps the image sharp for each zoom step at several object distances.
+# The curves of a lens model are loaded from a JSON file into NumPy arrays (cached per lens model) and the focus
+# targets are interpolated for arrays of zoom steps and object distances (binary search of the curve points).
+# TrackingCurve.follow() zooms in small steps and moves the focus on the curve after each zoom step so the image
+# stays sharp during the zoom ramp.
+# Requires NumPy (pip install TheiaMCR[tracking]).
+# Mark Peterson (c) 2026
+
+# Program revisions
+# v.1.0.0 261018
+
+from __future__ import annotations
+import json
+import math
+import os
+import threading
+import numpy as np
+import TheiaMCR.errList as err
+from TheiaMCR.TheiaMCR import MCRControl
+
+TRACKING_ZOOM_STEP = 100                # (steps) default zoom step between the focus corrections in follow()
+TRACKING_VERSION = 1                    # curve file format version
+
+_curves: dict[str, TrackingCurve] = {}
+_curvesLock = threading.Lock()
+
+def curveDirectory() -> str:
+    '''
+    Default tracking curve folder in AppData/Local (Windows) or .local/share (Linux) (next to the log folder).
+    ### return:
+    [AppData/Local/TheiaMCR/curves | .local/share/TheiaMCR/curves]
+    '''
+    if os.name == 'nt':  # Windows
+        appDataPath = os.getenv('LOCALAPPDATA')
+        if appDataPath is None:
+            appDataPath = os.getcwd()
+    else:  # Linux, macOS, etc.
+        appDataPath = os.path.expanduser('~/.local/share')
+    return os.path.join(appDataPath, 'TheiaMCR', 'curves')
+
+def loadCurve(lensModel:str, filename:str | None=None, reload:bool=False) -> TrackingCurve:
+    '''
+    Get the tracking curve of a lens model.  The curve file is read once and cached for the lens model.
+    ### input:
+    - lensModel: lens model name (e.g. 'TL1250P N6')
+    - filename: (optional, curveDirectory()/<lens model>.json) curve file
+    - reload: (optional, False) read the file again
+    ### return:
+    [tracking curve]
+    ### raises:
+    - OSError if the file can't be read, ValueError if the curve data is not valid
+    '''
+    with _curvesLock:
+        curve = _curves.get(lensModel)
+        if curve is None or reload or (filename is not None and curve.filename != os.path.abspath(filename)):
+            curve = TrackingCurve.fromFile(filename if filename is not None else os.path.join(curveDirectory(), f'{lensModel}.json'))
+            if curve.lensModel and curve.lensModel != lensModel:
+                raise ValueError(f'tracking curve file is for lens {curve.lensModel}, not {lensModel}')
+            curve.lensModel = lensModel
+            _curves[lensModel] = curve
+        return curve
+
+def addCurve(curve:TrackingCurve):
+    '''
+    Add a tracking curve to the cache (e.g. a curve created from measured data) so loadCurve() returns it.
+    '''
+    with _curvesLock:
+        _curves[curve.lensModel] = curve
+
+class TrackingCurve():
+    log = MCRControl.log
+
+    def __init__(self, zoomSteps, distances, focusSteps, lensModel:str=''):
+        '''
+        Tracking curves of one lens model: focus step for each zoom step (curve points) and object distance.  The
+        focus is interpolated linearly between the zoom steps and linearly in 1/distance between the object distances.
+        Zoom steps and distances outside the curve points are limited to the first or last point.
+
+        Use:
+        curve = loadCurve('TL1250P N6')
+        curve.focusAt(1500, 3.0)                            # focus step at zoom step 1500 for an object at 3 m
+        curve.focusAt(np.arange(0, 3000, 100), 3.0)         # array of focus steps
+        curve.follow(MCR, 2500, 3.0)                        # zoom to step 2500 keeping the object at 3 m in focus
+        ### input:
+        - zoomSteps: zoom steps of the curve points (at least 2, any order)
+        - distances: (m) object distances of the curves (math.inf for infinity)
+        - focusSteps: focus steps [distance][zoom step]
+        - lensModel: (optional) lens model name
+        ### public functions:
+        - fromFile(filename:str) -> TrackingCurve (class method)
+        - save(self, filename:str)
+        - focusAt(self, zoom, distance) -> int | np.ndarray
+        - plan(self, zoomStart:int, zoomTarget:int, distance:float, stepSize:int=TRACKING_ZOOM_STEP, focusMax:int|None=None) -> np.ndarray
+        - follow(self, MCR:MCRControl, zoomTarget:int, distance:float, stepSize:int=TRACKING_ZOOM_STEP) -> int
+        ### raises:
+        - ValueError if the curve data is not valid
+        '''
+        zoom = np.asarray(zoomSteps, dtype=float)
+        inverse = 1 / np.asarray(distances, dtype=float)
+        focus = np.asarray(focusSteps, dtype=float)
+        if zoom.ndim != 1 or zoom.size < 2:
+            raise ValueError('tracking curve needs at least 2 zoom steps')
+        if inverse.ndim != 1 or inverse.size < 1 or np.any(inverse < 0) or np.any(np.isnan(inverse)):
+            raise ValueError('tracking curve distances must be positive')
+        if focus.shape != (inverse.size, zoom.size):
+            raise ValueError(f'tracking curve focus steps must be [{inverse.size} distances][{zoom.size} zoom steps] (found {list(focus.shape)})')
+        if not np.all(np.isfinite(focus)):
+            raise ValueError('tracking curve focus steps must be numbers')
+
+        # sort the zoom steps and the distances (ascending 1/distance) for the binary search
+        zoomOrder = np.argsort(zoom, kind='stable')
+        distanceOrder = np.argsort(inverse, kind='stable')
+        self.zoom = zoom[zoomOrder]
+        if np.any(np.diff(self.zoom) == 0):
+            raise ValueError('tracking curve zoom steps must be different')
+        self.inverseDistance = inverse[distanceOrder]
+        if np.any(np.diff(self.inverseDistance) == 0):
+            raise ValueError('tracking curve distances must be different')
+        self.focus = focus[np.ix_(distanceOrder, zoomOrder)]
+        if self.inverseDistance.size == 1:
+            # one curve: use it for all the distances
+            self.inverseDistance = np.array([0.0, 1.0])
+            self.focus = np.vstack((self.focus, self.focus))
+        self.lensModel = lensModel
+        self.filename = ''
+
+    @classmethod
+    def fromFile(cls, filename:str) -> TrackingCurve:
+        '''
+        Read a tracking curve file.  File format (JSON):
+        {"version": 1, "lens": "TL1250P N6", "zoom": [zoom steps], "distances": [m, ..., Infinity], "focus": [[focus steps for each zoom step], ...]}
+        ### input:
+        - filename: curve file name
+        ### return:
+        [tracking curve]
+        ### raises:
+        - OSError if the file can't be read, ValueError if the curve data is not valid
+        '''
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != TRACKING_VERSION:
+            raise ValueError(f'tracking curve file {filename} is not version {TRACKING_VERSION}')
+        try:
+            curve = cls(data['zoom'], data['distances'], data['focus'], data.get('lens', ''))
+        except KeyError as e:
+            raise ValueError(f'tracking curve file {filename} is missing {e}')
+        curve.filename = os.path.abspath(filename)
+        return curve
+
+    def save(self, filename:str):
+        '''
+        Write the tracking curve file (see fromFile).
+        '''
+        distances = [1 / d if d > 0 else math.inf for d in self.inverseDistance.tolist()]
+        data = {'version': TRACKING_VERSION, 'lens': self.lensModel, 'zoom': self.zoom.tolist(), 'distances': distances, 'focus': self.focus.tolist()}
+        with open(filename, 'w') as f:
+            json.dump(data, f)
+        self.filename = os.path.abspath(filename)
+
+    def focusAt(self, zoom, distance) -> int | np.ndarray:
+        '''
+        Interpolate the focus steps.  The zoom steps and distances are broadcast together (e.g. an array of zoom steps
+        and one distance).
+        ### input:
+        - zoom: zoom step or array of zoom steps
+        - distance: (m) object distance or array of distances (math.inf for infinity)
+        ### return:
+        [focus step | array of focus steps]
+        '''
+        z, inverse = np.broadcast_arrays(np.asarray(zoom, dtype=float), 1 / np.asarray(distance, dtype=float))
+        zi, tz = self._locate(self.zoom, z)
+        di, td = self._locate(self.inverseDistance, inverse)
+        f = self.focus
+        near = f[di, zi] + (f[di, zi + 1] - f[di, zi]) * tz
+        far = f[di + 1, zi] + (f[di + 1, zi + 1] - f[di + 1, zi]) * tz
+        steps = np.rint(near + (far - near) * td).astype(int)
+        return int(steps) if steps.ndim == 0 else steps
+
+    def plan(self, zoomStart:int, zoomTarget:int, distance:float, stepSize:int=TRACKING_ZOOM_STEP, focusMax:int | None=None) -> np.ndarray:
+        '''
+        Zoom ramp waypoints.  The zoom moves from the start to the target in steps of at most stepSize and the focus
+        is on the curve at each waypoint.  The first waypoint is the start zoom step (focus correction before zooming).
+        ### input:
+        - zoomStart: current zoom step
+        - zoomTarget: target zoom step
+        - distance: (m) object distance
+        - stepSize: (optional, TRACKING_ZOOM_STEP) maximum zoom steps between the focus corrections
+        - focusMax: (optional) limit the focus steps to 0 ~ focusMax
+        ### return:
+        [array of [zoom step, focus step] waypoints]
+        '''
+        count = max(1, math.ceil(abs(zoomTarget - zoomStart) / max(1, stepSize)))
+        zoom = np.rint(np.linspace(zoomStart, zoomTarget, count + 1)).astype(int)
+        focus = np.asarray(self.focusAt(zoom, distance))
+        if focusMax is not None:
+            focus = np.clip(focus, 0, focusMax)
+        return np.column_stack((zoom, focus))
+
+    def follow(self, MCR:MCRControl, zoomTarget:int, distance:float, stepSize:int=TRACKING_ZOOM_STEP) -> int:
+        '''
+        Zoom to the target step keeping the object distance in focus.  For each waypoint (see plan) the zoom motor
+        moves and then the focus motor moves to the curve.  The waypoint moves are not backlash corrected while a motor
+        keeps moving in the same direction.  A move that reverses the direction of a motor (e.g. the focus curve turns
+        back during the ramp) and the last waypoint moves are backlash corrected (see motor.moveRel) so the final zoom
+        and focus steps are the same as a moveAbs/moveRel to the targets.
+        ### input:
+        - MCR: board with the zoom and focus motors initialized
+        - zoomTarget: target zoom step
+        - distance: (m) object distance (math.inf for infinity)
+        - stepSize: (optional, TRACKING_ZOOM_STEP) maximum zoom steps between the focus corrections
+        ### return:
+        [
+            OK = 0 |
+            err_bad_move: if a move failed |
+            err_not_init: (zoom or focus motor is not initialized)
+        ]
+        '''
+        zoom, focus = MCR.zoom, MCR.focus
+        if not zoom.initialized or not focus.initialized:
+            TrackingCurve.log.error('follow cannot be executed because the zoom or focus motor is not initialized.')
+            err.saveError(err.ERR_NOT_INIT, err.MOD_MCR, err.errLine(), MCR.errors)
+            return err.ERR_NOT_INIT
+        zoomTarget = min(max(zoomTarget, 0), zoom.maxSteps)
+        waypoints = self.plan(zoom.currentStep, zoomTarget, distance, stepSize, focus.maxSteps)
+        TrackingCurve.log.debug('_follow,%s,%s,%s,%s', self.lensModel, zoomTarget, distance, len(waypoints))
+        last = len(waypoints) - 1
+        directions = {}         # {motor ID: steps of the last waypoint move}
+        for i, (zoomStep, focusStep) in enumerate(waypoints.tolist()):
+            for motor, step in ((zoom, zoomStep), (focus, focusStep)):
+                if step == motor.currentStep:
+                    continue
+                steps = step - motor.currentStep
+                correctForBL = i == last or directions.get(motor.motorID, steps) * steps < 0
+                result = motor.moveRel(steps, correctForBL=correctForBL)
+                if result != err.ERR_OK:
+                    TrackingCurve.log.error(f'Tracking move failed at zoom step {zoomStep}')
+                    return result
+                directions[motor.motorID] = steps
+        return err.ERR_OK
+
+    ############ internal functions ##############################################################
+    @staticmethod
+    def _locate(points:np.ndarray, values:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Binary search of the interval of each value in the sorted points.
+        ### return:
+        [interval index (0 ~ len(points) - 2), fraction in the interval (0 ~ 1)]
+        '''
+        i = np.clip(np.searchsorted(points, values, side='right') - 1, 0, points.size - 2)
+        t = np.clip((values - points[i]) / (points[i + 1] - points[i]), 0.0, 1.0)
+        return i, t
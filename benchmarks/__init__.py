@@ -0,0 +1,12 @@
+# TheiaMCR benchmarks
+# Measure the latency, serial port round trips and bytes of each MCRControl API call using the simulated MCR600 board
+# (TheiaMCR/mcrSimulator.py).  The latency is split into the simulated motor time and the library overhead.
+# Run from the repository root:
+#   python -m benchmarks [--scenarios singleMoves focusSweep repeatedHoming multiBoard] [--output results.json]
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+from .callRecorder import callRecorder, percentile
+from .scenarios import SCENARIOS
@@ -0,0 +1,78 @@
+# Run the TheiaMCR benchmarks
+#   python -m benchmarks [--scenarios ...] [--iterations 20] [--timeScale 0.1] [--ioThread] [--output results.json] [--compare old.json]
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+import argparse
+import json
+import platform
+import sys
+import time
+from TheiaMCR.TheiaMCR import MCR_REVISION
+from .callRecorder import callRecorder
+from .scenarios import SCENARIOS
+
+def printResults(results:dict, previous:dict | None=None):
+    '''
+    Print the results table.  If previous results are given, the p50 change is shown.
+    '''
+    header = f'{"call":32} {"n":>5} {"p50":>9} {"p95":>9} {"p99":>9} {"motor":>9} {"overhead":>9} {"trips":>6} {"out":>6} {"in":>6}'
+    if previous is not None: header += f' {"p50 chg":>8}'
+    print(header)
+    for scenario, calls in results.items():
+        print(f'[{scenario}]')
+        for name, r in calls.items():
+            line = (f'{name:32} {r["count"]:>5} {r["p50"]:>9.2f} {r["p95"]:>9.2f} {r["p99"]:>9.2f} {r["motorP50"]:>9.2f} '
+                f'{r["overheadP50"]:>9.2f} {r["roundTrips"]:>6} {r["bytesOut"]:>6} {r["bytesIn"]:>6}')
+            if previous is not None:
+                old = previous.get(scenario, {}).get(name)
+                line += f' {(r["p50"] / old["p50"] - 1) * 100:>7.1f}%' if old and old['p50'] > 0 else f' {"-":>8}'
+            print(line)
+    print('times in ms (p50 of the simulated motor time and of the library overhead), trips/bytes per call')
+
+def main(argv:list[str] | None=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='TheiaMCR API call benchmarks using the simulated MCR600 board')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS), help='scenarios to run (default: all)')
+    parser.add_argument('--iterations', type=int, default=20, help='iterations per scenario (default: 20)')
+    parser.add_argument('--timeScale', type=float, default=0.1, help='simulated move time multiplier (default: 0.1)')
+    parser.add_argument('--seed', type=int, default=1, help='random seed (default: 1)')
+    parser.add_argument('--boards', type=int, default=4, help='number of boards in the multiBoard scenario (default: 4)')
+    parser.add_argument('--ioThread', action='store_true', help='use the dedicated serial port I/O thread')
+    parser.add_argument('--url', default='', help='extra mcrsim URL options (e.g. "latency=2&dropRate=0.01")')
+    parser.add_argument('--output', default='', help='write the JSON results to this file')
+    parser.add_argument('--compare', default='', help='compare to the JSON results of a previous run')
+    parser.add_argument('--verbose', action='store_true', help='show the TheiaMCR info logs')
+    args = parser.parse_args(argv)
+
+    options = {'timeScale': args.timeScale, 'seed': args.seed, 'boards': args.boards, 'ioThread': args.ioThread,
+        'url': args.url, 'verbose': args.verbose}
+    results = {}
+    for scenario in args.scenarios:
+        recorder = callRecorder()
+        SCENARIOS[scenario](recorder, args.iterations, options)
+        results[scenario] = recorder.summary()
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)['results']
+    printResults(results, previous)
+
+    if args.output:
+        report = {
+            'TheiaMCR': MCR_REVISION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'settings': {**options, 'iterations': args.iterations, 'scenarios': args.scenarios},
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
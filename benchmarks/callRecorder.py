@@ -0,0 +1,110 @@
+# Benchmark call recorder
+# Record the latency, serial port round trips, bytes and simulated motor time of each API call.
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+from __future__ import annotations
+import threading
+import time
+from typing import Callable
+from TheiaMCR.mcrSimulator import simBoard
+
+def percentile(values:list[float], p:float) -> float:
+    '''
+    Percentile with linear interpolation between the sorted values.
+    ### input:
+    - values: list of values
+    - p: percentile (0-100)
+    ### return:
+    [percentile value | 0 if there are no values]
+    '''
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+class callRecorder():
+    def __init__(self):
+        '''
+        Record the API calls.  measure() can be called from several threads (one simulated board per thread).
+        ### public functions:
+        - measure(self, name:str, board:simBoard, func:Callable, *args) -> result of func
+        - record(self, name:str, latency:float, motorTime:float, roundTrips:int, bytesOut:int, bytesIn:int, error:bool=False)
+        - summary(self) -> dict
+        '''
+        self.calls: dict[str, dict[str, list]] = {}
+        self._lock = threading.Lock()
+
+    def measure(self, name:str, board:simBoard, func:Callable, *args):
+        '''
+        Call the function and record the measurements.
+        ### input:
+        - name: call name in the results
+        - board: simulated board the function uses (for the round trip, byte and motor time counters)
+        - func: function to call
+        - args: function arguments
+        ### return:
+        [function result]
+        '''
+        commands, bytesIn, bytesOut, motorTime = board.commandCount, board.bytesIn, board.bytesOut, board.motorTime
+        start = time.perf_counter()
+        result = func(*args)
+        latency = time.perf_counter() - start
+        error = isinstance(result, int) and not isinstance(result, bool) and result < 0
+        self.record(name, latency, board.motorTime - motorTime, board.commandCount - commands, board.bytesIn - bytesIn, 
+            board.bytesOut - bytesOut, error)
+        return result
+
+    def record(self, name:str, latency:float, motorTime:float, roundTrips:int, bytesOut:int, bytesIn:int, error:bool=False):
+        '''
+        Record one measurement.
+        ### input:
+        - name: call name in the results
+        - latency: (s) call time
+        - motorTime: (s) simulated motor move time
+        - roundTrips: number of commands sent to the board
+        - bytesOut, bytesIn: bytes sent to and received from the board
+        - error: (optional, False) the call returned an error
+        '''
+        with self._lock:
+            record = self.calls.setdefault(name, {'latency': [], 'motorTime': [], 'roundTrips': [], 'bytesOut': [], 'bytesIn': [], 'errors': 0})
+            record['latency'].append(latency)
+            record['motorTime'].append(motorTime)
+            record['roundTrips'].append(roundTrips)
+            record['bytesOut'].append(bytesOut)
+            record['bytesIn'].append(bytesIn)
+            if error:
+                record['errors'] += 1
+
+    def summary(self) -> dict:
+        '''
+        Summarize the recorded calls.  Times are in ms, counts and bytes are per call.
+        ### return:
+        {call name: {count, errors, p50, p95, p99, mean, motorP50, overheadP50, overheadP95, roundTrips, bytesOut, bytesIn}}
+        '''
+        results = {}
+        with self._lock:
+            for name, record in self.calls.items():
+                latency = [t * 1000 for t in record['latency']]
+                overhead = [(t - m) * 1000 for t, m in zip(record['latency'], record['motorTime'])]
+                count = len(latency)
+                results[name] = {
+                    'count': count,
+                    'errors': record['errors'],
+                    'p50': round(percentile(latency, 50), 3),
+                    'p95': round(percentile(latency, 95), 3),
+                    'p99': round(percentile(latency, 99), 3),
+                    'mean': round(sum(latency) / count, 3),
+                    'motorP50': round(percentile([m * 1000 for m in record['motorTime']], 50), 3),
+                    'overheadP50': round(percentile(overhead, 50), 3),
+                    'overheadP95': round(percentile(overhead, 95), 3),
+                    'roundTrips': round(sum(record['roundTrips']) / count, 2),
+                    'bytesOut': round(sum(record['bytesOut']) / count, 1),
+                    'bytesIn': round(sum(record['bytesIn']) / count, 1),
+                }
+        return results
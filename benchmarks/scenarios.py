@@ -0,0 +1,140 @@
+# Benchmark scenarios
+# Each scenario opens simulated boards, initializes the lens motors (TL1250P N6) and records the API calls.
+#
+# (c) 2026 Theia Technologies
+# www.TheiaTech.com
+# BSD 3-clause license applies
+
+from __future__ import annotations
+import io
+import logging
+import random
+import threading
+import time
+import TheiaMCR
+from TheiaMCR.mcrSimulator import simBoard, simulatorBoard
+from .callRecorder import callRecorder
+
+FOCUS_STEPS, FOCUS_PI = 8390, 7959
+ZOOM_STEPS, ZOOM_PI = 3227, 3119
+IRIS_STEPS = 75
+
+def openBoard(name:str, options:dict) -> tuple[TheiaMCR.MCRControl, simBoard]:
+    '''
+    Open a simulated board and initialize the motors.
+    ### input:
+    - name: simulated board name
+    - options: {'timeScale', 'seed', 'ioThread', 'verbose', 'url'} (url: extra mcrsim URL options)
+    ### return:
+    [MCRControl instance, simulated board]
+    '''
+    url = f'mcrsim://{name}?seed={options["seed"]}&timeScale={options["timeScale"]}'
+    if options['url']:
+        url += '&' + options['url']
+    MCR = TheiaMCR.MCRControl(url, logFiles=False, ioThread=options['ioThread'])
+    if MCR.consoleLogHandler and not options['verbose']:
+        MCR.consoleLogHandler.setLevel(logging.WARNING)
+    if not MCR.boardInitialized:
+        raise RuntimeError(f'simulated board {name} was not initialized')
+    MCR.focusInit(FOCUS_STEPS, FOCUS_PI)
+    MCR.zoomInit(ZOOM_STEPS, ZOOM_PI)
+    MCR.irisInit(IRIS_STEPS)
+    return MCR, simulatorBoard(name)
+
+def singleMoves(recorder:callRecorder, iterations:int, options:dict):
+    '''
+    Single focus, zoom and iris moves and setRespectLimits.
+    '''
+    MCR, board = openBoard('singleMoves', options)
+    rand = random.Random(options['seed'])
+    for _ in range(iterations):
+        recorder.measure('focus.moveRel(+500)', board, MCR.focus.moveRel, 500)
+        recorder.measure('focus.moveRel(-500)', board, MCR.focus.moveRel, -500)
+        recorder.measure('focus.moveAbs', board, MCR.focus.moveAbs, rand.randint(1000, FOCUS_PI - 200))
+        recorder.measure('zoom.moveAbs', board, MCR.zoom.moveAbs, rand.randint(200, ZOOM_PI - 200))
+        recorder.measure('iris.moveAbs', board, MCR.iris.moveAbs, rand.randint(0, IRIS_STEPS))
+        recorder.measure('focus.setRespectLimits(False)', board, MCR.focus.setRespectLimits, False)
+        recorder.measure('focus.setRespectLimits(True)', board, MCR.focus.setRespectLimits, True)
+    MCR.close()
+
+def focusSweep(recorder:callRecorder, iterations:int, options:dict):
+    '''
+    Focus sweeps: 20 relative steps up the range, then 20 absolute targets down the range.
+    '''
+    MCR, board = openBoard('focusSweep', options)
+    for _ in range(iterations):
+        MCR.focus.moveAbs(2000)
+        for _ in range(20):
+            recorder.measure('focus.moveRel(sweep +250)', board, MCR.focus.moveRel, 250)
+        for target in range(7000, 2000, -250):
+            recorder.measure('focus.moveAbs(sweep)', board, MCR.focus.moveAbs, target)
+    MCR.close()
+
+def repeatedHoming(recorder:callRecorder, iterations:int, options:dict):
+    '''
+    Repeated focus and zoom homing from a position away from the PI.
+    '''
+    MCR, board = openBoard('repeatedHoming', options)
+    for _ in range(iterations):
+        recorder.measure('focus.home', board, MCR.focus.home)
+        recorder.measure('zoom.home', board, MCR.zoom.home)
+        MCR.focus.moveRel(-1000)
+        MCR.zoom.moveRel(-1000)
+    MCR.close()
+
+def multiBoard(recorder:callRecorder, iterations:int, options:dict):
+    '''
+    Several boards (one thread each) moving focus and zoom at the same time.  The scenario wall time is recorded as
+    'multiBoard(wall time)'.
+    '''
+    boards = [openBoard(f'multiBoard{i}', options) for i in range(options['boards'])]
+
+    def run(index:int, MCR:TheiaMCR.MCRControl, board:simBoard):
+        rand = random.Random(options['seed'] + index)
+        for _ in range(iterations):
+            recorder.measure('multiBoard focus.moveAbs', board, MCR.focus.moveAbs, rand.randint(1000, FOCUS_PI - 200))
+            recorder.measure('multiBoard zoom.moveAbs', board, MCR.zoom.moveAbs, rand.randint(200, ZOOM_PI - 200))
+
+    threads = [threading.Thread(target=run, args=(i, MCR, board)) for i, (MCR, board) in enumerate(boards)]
+    counters = [(board.motorTime, board.commandCount, board.bytesIn, board.bytesOut) for _, board in boards]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency = time.perf_counter() - start
+    deltas = [(board.motorTime - c[0], board.commandCount - c[1], board.bytesIn - c[2], board.bytesOut - c[3]) for (_, board), c in zip(boards, counters)]
+    recorder.record('multiBoard(wall time)', latency, max(d[0] for d in deltas), sum(d[1] for d in deltas), sum(d[2] for d in deltas), sum(d[3] for d in deltas))
+    for MCR, _ in boards:
+        MCR.close()
+
+def debugLogging(recorder:callRecorder, iterations:int, options:dict):
+    '''
+    Library overhead of a focus move with the debug logs disabled (default console level, no log files) and enabled
+    (DEBUG records formatted by a handler like the log file handler, written to memory).
+    '''
+    MCR, board = openBoard('debugLogging', options)
+    log = TheiaMCR.MCRControl.log
+    level = log.level
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter('%(asctime)s.%(msecs)03d,%(levelname)-7s,%(lineno)-5d,%(module)-10s,%(message)s', '%y%m%d,%H:%M:%S'))
+    for _ in range(iterations):
+        MCR.focus.moveAbs(5000)
+        for _ in range(10):
+            recorder.measure('focus.moveRel(-100) debug off', board, MCR.focus.moveRel, -100)
+        MCR.focus.moveAbs(5000)
+        log.setLevel(logging.DEBUG)
+        log.addHandler(handler)
+        for _ in range(10):
+            recorder.measure('focus.moveRel(-100) debug on', board, MCR.focus.moveRel, -100)
+        log.removeHandler(handler)
+        log.setLevel(level)
+    MCR.close()
+
+SCENARIOS = {
+    'singleMoves': singleMoves,
+    'focusSweep': focusSweep,
+    'repeatedHoming': repeatedHoming,
+    'multiBoard': multiBoard,
+    'debugLogging': debugLogging,
+}
@@ -0,0 +1,59 @@
+# Test fixtures: MCRControl boards on the simulated MCR600 (mcrsim:// ports, no hardware needed)
+import itertools
+import logging
+import pytest
+import TheiaMCR
+from TheiaMCR.mcrSimulator import simulatorBoard, resetSimulators
+
+SIM_OPTIONS = 'seed=1&timeScale=0.01'       # 100x faster moves
+_boardNumbers = itertools.count()
+
+def simPort(options:str=SIM_OPTIONS) -> tuple[str, str]:
+    '''
+    New simulated board port.
+    ### return:
+    [port name, board name]
+    '''
+    name = f'test{next(_boardNumbers)}'
+    return f'mcrsim://{name}?{options}', name
+
+@pytest.fixture
+def makeBoard():
+    '''
+    Factory of initialized boards (focus, zoom, iris and IRC motors) on new simulated ports.  The boards are closed
+    after the test.
+    makeBoard(options=SIM_OPTIONS, **MCRControl inputs) -> (MCRControl, simBoard)
+    '''
+    boards = []
+    def make(options:str=SIM_OPTIONS, **kwargs):
+        port, name = simPort(options)
+        MCR = TheiaMCR.MCRControl(port, logFiles=False, **kwargs)
+        MCR.consoleLogHandler.setLevel(logging.CRITICAL)
+        boards.append(MCR)
+        assert MCR.focusInit(8390, 7959)
+        assert MCR.zoomInit(3227, 3119)
+        assert MCR.irisInit(75)
+        assert MCR.IRCInit()
+        return MCR, simulatorBoard(name)
+    yield make
+    for MCR in boards:
+        MCR.close()
+    resetSimulators()
+
+@pytest.fixture
+def dropResponses():
+    '''
+    Drop the next responses of a simulated board that start with a response ID.
+    dropResponses(board, responseID, count=1)
+    '''
+    def drop(board, responseID:int, count:int=1):
+        respond = board._respond
+        remaining = [count]
+        def dropping(port, response:bytes, delay:float=0.0):
+            if remaining[0] > 0 and response[0] == responseID:
+                remaining[0] -= 1
+                board.droppedResponses += 1
+                return
+            respond(port, response, delay)
+        board._respond = dropping
+    return drop
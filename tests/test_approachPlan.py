@@ -0,0 +1,34 @@
+# ApproachPlan: targets approached moving away from the PI
+import TheiaMCR
+
+TARGETS = [5200, 4800, 5000, 5100]
+
+def visit(makeBoard, reorder:bool):
+    MCR, board = makeBoard()
+    MCR.focus.moveAbs(5000)
+    moves = board.motors[1].moveCount
+    plan = TheiaMCR.ApproachPlan(MCR.focus, TARGETS, reorder=reorder)
+    steps = []
+    visits = plan.run(callback=lambda step: steps.append(step))
+    assert [v['step'] for v in visits] == plan.order == steps
+    assert all(v['result'] == 0 for v in visits)
+    assert board.motors[1].moveCount - moves == plan.commands == sum(v['commands'] for v in visits)
+    assert abs(board.motors[1].lensPos - plan.order[-1]) <= 20
+    return plan
+
+def test_reordered_plan(makeBoard):
+    # the focus PI is at the high end: the targets are visited in decreasing order, only the first move is corrected
+    plan = visit(makeBoard, True)
+    assert plan.order == [5200, 5100, 5000, 4800]
+    assert plan.commands == len(TARGETS) + 1
+
+def test_plan_in_order(makeBoard):
+    # each move towards the PI is backlash corrected
+    plan = visit(makeBoard, False)
+    assert plan.order == TARGETS
+    assert plan.commands == 7
+
+def test_plan_limited(makeBoard):
+    MCR, board = makeBoard()
+    plan = TheiaMCR.ApproachPlan(MCR.focus, [-100, 99999])
+    assert plan.order == [MCR.focus.PIStep, 0]
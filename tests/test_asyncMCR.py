@@ -0,0 +1,87 @@
+# AsyncMCRControl and its serial port transport
+import asyncio
+import serial
+import TheiaMCR
+from TheiaMCR.asyncMCR import serialTransport
+from TheiaMCR.mcrSimulator import simulatorBoard
+from conftest import simPort
+
+class lostProtocol(asyncio.Protocol):
+    def __init__(self):
+        self.lost = []
+    def connection_lost(self, exc):
+        self.lost.append(exc)
+
+def test_move():
+    async def run():
+        async with TheiaMCR.AsyncMCRControl(simPort()[0]) as MCR:
+            assert await MCR.focusInit(8390, 7959)
+            assert await MCR.focus.moveAbs(5000) == 0
+            assert await MCR.focus.moveRel(-100) == 0
+            return MCR.focus.currentStep
+    assert asyncio.run(run()) == 4900
+
+def test_write_error_reported_once():
+    # a write error is reported to the protocol once, by the reader thread, with the write exception
+    async def run():
+        serialPort = serial.serial_for_url(simPort()[0], timeout=0.1)
+        def fail(data):
+            raise serial.SerialException('write failed')
+        serialPort.write = fail
+        protocol = lostProtocol()
+        transport = serialTransport(asyncio.get_running_loop(), protocol, serialPort)
+        transport.write(b'\x76\x0D')
+        assert transport.is_closing()
+        transport.write(b'\x76\x0D')
+        await asyncio.sleep(0.3)
+        return protocol.lost
+    lost = asyncio.run(run())
+    assert len(lost) == 1
+    assert isinstance(lost[0], serial.SerialException) and str(lost[0]) == 'write failed'
+
+def test_write_error_fails_command():
+    async def run():
+        async with TheiaMCR.AsyncMCRControl(simPort()[0]) as MCR:
+            def fail(data):
+                raise serial.SerialException('write failed')
+            MCR._transport._serialPort.write = fail
+            return await MCR.readBoardSN(), MCR.boardCommunicationState
+    assert asyncio.run(run()) == ('', False)
+
+def test_retry_and_resync(dropResponses):
+    # idempotent commands are sent again, a relative move without response sets the re-sync flag
+    port, name = simPort()
+    async def run():
+        async with TheiaMCR.AsyncMCRControl(port) as MCR:
+            assert await MCR.focusInit(8390, 7959)
+            board = simulatorBoard(name)
+            dropResponses(board, 0x67, 2)
+            assert (await MCR.focus.readMotorSetup(refresh=True))[0]
+            assert await MCR.focus.moveAbs(5000) == 0
+            dropResponses(board, 0x74)
+            assert await MCR.focus.moveRel(-100, correctForBL=False) < 0
+            assert MCR.focus.positionResync and not MCR.focus.positionReferenced
+            assert await MCR.focus.moveAbs(5000) == 0
+            return MCR.focus.positionResync, MCR.metrics.snapshot()
+    resync, snapshot = asyncio.run(run())
+    assert not resync
+    assert snapshot['commands']['0x67']['retries'] == 2
+    assert snapshot['resyncs'] == {'0x01': 1}
+
+def test_late_response_discarded():
+    # the late response of a command that timed out doesn't complete the retry
+    port, name = simPort()
+    late = bytes([0x76, 9, 9, 9, 9, 9, 0x0D])
+    async def run():
+        async with TheiaMCR.AsyncMCRControl(port) as MCR:
+            board = simulatorBoard(name)
+            respond = board._respond
+            responses = [(late, 0.6), (None, 0.2)]      # (response, delay): the late response arrives after the retry is sent
+            def delayed(port, response:bytes, delay:float=0.0):
+                frame, extra = responses.pop(0) if responses else (None, 0.0)
+                respond(port, frame or response, delay + extra)
+            board._respond = delayed
+            return await MCR.readFWRevision(), MCR.metrics.snapshot()
+    fw, snapshot = asyncio.run(run())
+    assert fw.startswith('5.')
+    assert snapshot['commands']['0x76']['retries'] == 1
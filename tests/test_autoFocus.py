@@ -0,0 +1,42 @@
+# AutoFocus: coarse to fine sharpness search on the simulated board
+import TheiaMCR
+import TheiaMCR.errList as err
+
+PEAK = 5000
+
+def sharpness(step:int) -> float:
+    return -abs(step - PEAK)
+
+def test_autofocus(makeBoard):
+    MCR, board = makeBoard()
+    moves = board.motors[1].moveCount
+    report = TheiaMCR.AutoFocus(MCR.focus, sharpness).run()
+    assert report['result'] == err.ERR_OK
+    assert report['step'] == PEAK
+    assert MCR.focus.currentStep == PEAK
+    assert board.motors[1].moveCount - moves == report['moves']
+    assert report['probes'] == len(report['scores'])
+
+def test_autofocus_capture(makeBoard):
+    # the sharpness of the captured image is calculated while the motor moves to the next step
+    MCR, board = makeBoard()
+    moves = board.motors[1].moveCount
+    report = TheiaMCR.AutoFocus(MCR.focus, sharpness, capture=lambda step: step, stopRatio=0.5).run(4000, 6000)
+    assert report['result'] == err.ERR_OK
+    assert report['step'] == PEAK
+    assert board.motors[1].moveCount - moves == report['moves']
+    assert min(report['scores']) >= 4000 and max(report['scores']) <= 6000
+
+def test_autofocus_single_limit(makeBoard):
+    MCR, board = makeBoard()
+    report = TheiaMCR.AutoFocus(MCR.focus, sharpness).run(start=6000)
+    assert report['step'] == 6000
+    assert min(report['scores']) == 6000
+    report = TheiaMCR.AutoFocus(MCR.focus, sharpness).run(end=4000)
+    assert report['step'] == 4000
+    assert max(report['scores']) == 4000
+
+def test_autofocus_range(makeBoard):
+    MCR, board = makeBoard()
+    assert TheiaMCR.AutoFocus(MCR.focus, sharpness).run(start=99999)['result'] == err.ERR_RANGE
+    assert TheiaMCR.AutoFocus(MCR.IRC, sharpness).run()['result'] == err.ERR_NOT_SUPPORTED
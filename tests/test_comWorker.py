@@ -0,0 +1,144 @@
+# comWorker: response matching with the serial port I/O thread
+import threading
+import time
+import pytest
+import serial
+from TheiaMCR.comWorker import comWorker, WORKER_LATE_RESPONSE_TIME
+from TheiaMCR.mcrProtocol import frameParser, moveFrame, MOTOR_FRAME, FW_REVISION_FRAME, CR
+from TheiaMCR.mcrSimulator import simulatorBoard, resetSimulators
+from conftest import simPort
+
+@pytest.fixture
+def worker():
+    port, name = simPort()
+    serialPort = serial.serial_for_url(port, timeout=0)
+    worker = comWorker(serialPort, frameParser(), threaded=True)
+    yield worker, simulatorBoard(name)
+    worker.close()
+    serialPort.close()
+    resetSimulators()
+
+def readSetup(motorID:int) -> bytes:
+    return MOTOR_FRAME.pack(0x67, motorID, CR)
+
+def test_motor_id_responses(worker):
+    # read motor setup responses are matched by the motor ID, not by the order
+    worker, _ = worker
+    futures = {motorID: worker.submit(readSetup(motorID), 0x67, 1.0) for motorID in (2, 1, 3)}
+    worker.wait(list(futures.values()))
+    for motorID, future in futures.items():
+        response = future.result()
+        assert response[0] == 0x67 and response[1] == motorID
+
+def test_queries_overlap_move(worker):
+    # a query sent while a motor moves gets its response before the move response
+    worker, board = worker
+    move = worker.submit(moveFrame(0x66, 1, 3000, 1000), 0x74, 5.0, moveTime=0.03)
+    query = worker.submit(FW_REVISION_FRAME, 0x76, 1.0)
+    worker.wait([query])
+    assert query.result()[0] == 0x76
+    assert not move.done()
+    worker.wait([move])
+    assert move.result() == bytes([0x74, 0x00, 0x0D])
+
+def test_concurrent_threads(worker):
+    worker, _ = worker
+    results = {}
+    def query(motorID:int):
+        responses = []
+        for _ in range(20):
+            future = worker.submit(readSetup(motorID), 0x67, 1.0)
+            worker.wait([future])
+            responses.append(future.result()[1])
+        results[motorID] = responses
+    threads = [threading.Thread(target=query, args=(motorID,)) for motorID in (1, 2, 3, 4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join(10)
+    assert {motorID: set(responses) for motorID, responses in results.items()} == {1: {1}, 2: {2}, 3: {3}, 4: {4}}
+
+def test_timeout(worker):
+    worker, board = worker
+    board.setFaults(dropRate=1.0)
+    future = worker.submit(FW_REVISION_FRAME, 0x76, 0.1)
+    worker.wait([future])
+    assert future.result() is None
+
+@pytest.mark.parametrize('threaded', [True, False])
+def test_late_response_discarded(threaded):
+    # the late response of a command that timed out doesn't complete the next command with the same response ID
+    port, name = simPort()
+    serialPort = serial.serial_for_url(port, timeout=0.01)
+    worker = comWorker(serialPort, frameParser(), threaded=threaded)
+    board = simulatorBoard(name)
+    respond = board._respond
+    late = bytes([0x76, 9, 9, 9, 9, 9, CR])
+    responses = [(late, 0.1), (None, 0.1)]          # (response, delay): the first response arrives before the second
+    def delayed(port, response:bytes, delay:float=0.0):
+        frame, extra = responses.pop(0) if responses else (None, 0.0)
+        respond(port, frame or response, delay + extra)
+    board._respond = delayed
+    try:
+        with worker.transaction():
+            future = worker.submit(FW_REVISION_FRAME, 0x76, 0.02)
+            worker.wait([future])
+            assert future.result() is None
+            startTime = time.monotonic()
+            future = worker.submit(FW_REVISION_FRAME, 0x76, 1.0)
+            worker.wait([future])
+        assert future.result()[0] == 0x76 and future.result() != late
+        assert time.monotonic() - startTime < WORKER_LATE_RESPONSE_TIME + 0.1
+    finally:
+        worker.close()
+        serialPort.close()
+        resetSimulators()
+
+def test_late_response_expires(worker):
+    # a command is held until the late response time expires if the response of the command that timed out is lost
+    worker, board = worker
+    board.setFaults(dropRate=1.0)
+    future = worker.submit(FW_REVISION_FRAME, 0x76, 0.02)
+    worker.wait([future])
+    board.setFaults(dropRate=0.0)
+    query = worker.submit(readSetup(1), 0x67, 1.0)
+    future = worker.submit(FW_REVISION_FRAME, 0x76, 1.0)
+    worker.wait([query])
+    assert not future.done()
+    worker.wait([future])
+    assert future.result()[0] == 0x76
+
+def test_submit_after_close(worker):
+    worker, _ = worker
+    worker.close()
+    future = worker.submit(FW_REVISION_FRAME, 0x76, 1.0)
+    startTime = time.monotonic()
+    with pytest.raises(serial.SerialException):
+        worker.wait([future])
+        future.result()
+    assert time.monotonic() - startTime < 1.0
+
+def test_board_move_and_query(makeBoard):
+    # MCRControl with the I/O thread: board queries return while a motor moves in another thread
+    MCR, board = makeBoard(ioThread=True)
+    MCR.focus.moveAbs(7000)
+    results = {}
+    mover = threading.Thread(target=lambda: results.update(move=MCR.focus.moveRel(-3000)))
+    mover.start()
+    time.sleep(0.005)
+    assert MCR.MCRBoard.readBoardSN() == '055-001234'
+    assert MCR.zoom.readMotorSetup(refresh=True)[0]
+    mover.join(10)
+    assert results['move'] == 0
+    assert MCR.focus.currentStep == 4000
+
+def test_board_concurrent_moves(makeBoard):
+    # the moves of different motors are sent one at a time and each motor gets its own move response
+    MCR, board = makeBoard(ioThread=True)
+    MCR.focus.moveAbs(6000)
+    MCR.zoom.moveAbs(1000)
+    results = {}
+    threads = [threading.Thread(target=lambda: results.update(focus=MCR.focus.moveRel(-2000))),
+        threading.Thread(target=lambda: results.update(zoom=MCR.zoom.moveRel(200)))]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join(10)
+    assert results == {'focus': 0, 'zoom': 0}
+    assert (MCR.focus.currentStep, MCR.zoom.currentStep) == (4000, 1200)
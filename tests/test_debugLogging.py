@@ -0,0 +1,49 @@
+# debug logs: the messages and hex frames are formatted only when a log handler accepts the record
+import logging
+import pytest
+from TheiaMCR.TheiaMCR import MCRControl
+from TheiaMCR.mcrProtocol import hexFrame
+
+class listHandler(logging.Handler):
+    def __init__(self, level:int):
+        super().__init__(level)
+        self.messages = []
+
+    def emit(self, record:logging.LogRecord):
+        self.messages.append(record.getMessage())
+
+@pytest.fixture
+def formatted(monkeypatch):
+    ''' rendered hex frames '''
+    frames = []
+    monkeypatch.setattr(hexFrame, '__str__', lambda self: frames.append(self.frame) or self.frame.hex(':'))
+    level = MCRControl.log.level
+    MCRControl.log.setLevel(logging.DEBUG)
+    yield frames
+    MCRControl.log.setLevel(level)
+
+def test_debug_not_formatted(makeBoard, formatted, monkeypatch):
+    MCR, board = makeBoard()
+    monkeypatch.setattr(MCRControl, 'communicationDebugLevel', True)
+    handler = listHandler(logging.INFO)
+    MCRControl.log.addHandler(handler)
+    try:
+        assert MCR.focus.moveRel(-100) == 0
+    finally:
+        MCRControl.log.removeHandler(handler)
+    assert formatted == []
+    assert not any(message.startswith('_moveRel') for message in handler.messages)
+
+def test_debug_formatted_by_handler(makeBoard, formatted, monkeypatch):
+    MCR, board = makeBoard()
+    monkeypatch.setattr(MCRControl, 'communicationDebugLevel', True)
+    handler = listHandler(logging.DEBUG)
+    MCRControl.log.addHandler(handler)
+    try:
+        assert MCR.focus.moveRel(-100) == 0
+    finally:
+        MCRControl.log.removeHandler(handler)
+    assert len(formatted) > 0
+    assert f'_moveRel,{MCR.focus.motorID},-100' in handler.messages
+    assert any(message.startswith('   -> 62:01:') for message in handler.messages)
+    assert any(message.startswith('   <- 74:00:0d') for message in handler.messages)
@@ -0,0 +1,51 @@
+# errList: error recorders and the module error list
+import threading
+import TheiaMCR
+import TheiaMCR.errList as err
+
+def test_capacity_and_counts():
+    recorder = err.errorRecorder(capacity=5)
+    for i in range(8):
+        recorder.save(err.ERR_BAD_MOVE if i % 2 else err.ERR_RANGE, err.MOD_MCR, i)
+    assert recorder.errors == [[err.ERR_BAD_MOVE if i % 2 else err.ERR_RANGE, err.MOD_MCR, i] for i in range(3, 8)]
+    assert recorder.total == 8 and recorder.count() == 8
+    assert recorder.counts() == {err.ERR_RANGE: 4, err.ERR_BAD_MOVE: 4}
+    assert recorder.last() == [err.ERR_BAD_MOVE, err.MOD_MCR, 7]
+    assert recorder.since(6) == [[err.ERR_RANGE, err.MOD_MCR, 6], [err.ERR_BAD_MOVE, err.MOD_MCR, 7]]
+    assert recorder.since(0) == recorder.errors         # the dropped errors aren't returned
+    recorder.clear()
+    assert recorder.errors == [] and recorder.count(err.ERR_RANGE) == 0
+
+def test_thread_safe_counts():
+    recorder = err.errorRecorder(capacity=10)
+    def save():
+        for _ in range(1000):
+            recorder.save(err.ERR_MOVE_TIMEOUT, err.MOD_MCR)
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert recorder.count(err.ERR_MOVE_TIMEOUT) == 4000
+    assert len(recorder.errors) == 10
+
+def test_final_error_list():
+    # finalError is the list of the module recorder: list operations and clearErrorList keep working
+    err.clearErrorList()
+    finalError = err.finalError
+    err.saveError(err.ERR_RANGE, err.MOD_MCR, err.errLine())
+    assert isinstance(err.finalError, list)
+    assert err.finalError[-1:] == [[err.ERR_RANGE, err.MOD_MCR, err.finalErrorLine]]
+    assert err.finalErrorLine > 0
+    for _ in range(err.ERR_BUFFER_SIZE + 10):
+        err.saveError(err.ERR_RANGE, err.MOD_MCR)
+    assert len(err.finalError) == err.ERR_BUFFER_SIZE
+    assert err.errors.count(err.ERR_RANGE) == err.ERR_BUFFER_SIZE + 11
+    err.clearErrorList()
+    assert err.finalError is finalError and finalError == []
+
+def test_package_exports():
+    assert TheiaMCR.ERR_BAD_MOVE == err.ERR_BAD_MOVE
+    assert TheiaMCR.errorRecorder is err.errorRecorder
+    for name in ('sys', 'threading', 'collections', 'errors', 'exception'):
+        assert name not in err.__all__
+    for name in ('sys', 'collections', 'errors', 'exception'):
+        assert not hasattr(TheiaMCR, name)
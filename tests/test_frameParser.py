@@ -0,0 +1,70 @@
+# frameParser: splitting the received byte stream into response frames
+from TheiaMCR.mcrProtocol import frameParser, SETUP_FRAME
+
+STATUS_OK = bytes([0x74, 0x00, 0x0D])
+FW_REVISION = bytes([0x76, 5, 3, 1, 0, 0, 0x0D])
+SETUP = SETUP_FRAME.pack(0x67, 0x01, 0x00, 1, 0, 0x0D0D, 0x000D, 1500, 0x0D)    # data bytes include 0x0D
+
+def test_frames():
+    parser = frameParser()
+    assert parser.feed(STATUS_OK + FW_REVISION + SETUP) == [STATUS_OK, FW_REVISION, SETUP]
+    assert parser.pending == 0
+    assert parser.discardedBytes == 0
+
+def test_garbage_before_frames():
+    parser = frameParser()
+    assert parser.feed(b'\x01\xFF\x0D' + STATUS_OK) == [STATUS_OK]
+    assert parser.discardedBytes == 3
+    assert parser.feed(b'\x22\x33' + FW_REVISION + b'\x99' + SETUP) == [FW_REVISION, SETUP]
+    assert parser.discardedBytes == 6
+
+def test_false_frame_start():
+    # a garbage byte equal to a response ID followed by a valid frame
+    parser = frameParser()
+    assert parser.feed(b'\x74' + FW_REVISION) == [FW_REVISION]
+    assert parser.discardedBytes == 1
+
+def test_fragmented_frames():
+    parser = frameParser()
+    stream = FW_REVISION + SETUP + STATUS_OK
+    frames = []
+    for i in range(len(stream)):
+        frames += parser.feed(stream[i:i + 1])
+    assert frames == [FW_REVISION, SETUP, STATUS_OK]
+    assert parser.discardedBytes == 0
+
+def test_fragmented_frames_with_garbage():
+    parser = frameParser()
+    assert parser.feed(b'\xAA' + SETUP[:5]) == []
+    assert parser.pending == 5
+    assert parser.feed(SETUP[5:] + STATUS_OK[:1]) == [SETUP]
+    assert parser.feed(STATUS_OK[1:]) == [STATUS_OK]
+    assert parser.discardedBytes == 1
+
+def test_unexpected_response():
+    # the late response of a command that timed out is dropped
+    parser = frameParser()
+    assert parser.feed(bytes([0x63, 0x00, 0x0D]) + STATUS_OK, expected={0x74}) == [STATUS_OK]
+    assert parser.discardedBytes == 3
+
+def test_resync_incomplete_frame():
+    parser = frameParser()
+    assert parser.feed(STATUS_OK[:2]) == []
+    assert parser.resync() == []
+    assert parser.pending == 0
+    assert parser.discardedBytes == 2
+    assert parser.feed(STATUS_OK) == [STATUS_OK]
+
+def test_resync_false_start():
+    # an incomplete setup frame start hides a complete frame
+    parser = frameParser()
+    assert parser.feed(b'\x67\x01' + STATUS_OK) == []
+    assert parser.resync() == [STATUS_OK]
+    assert parser.discardedBytes == 2
+
+def test_clear():
+    parser = frameParser()
+    parser.feed(SETUP[:4])
+    parser.clear()
+    assert parser.pending == 0
+    assert parser.feed(STATUS_OK) == [STATUS_OK]
@@ -0,0 +1,40 @@
+# LensSequence: timed keyframe playback
+import TheiaMCR
+import TheiaMCR.errList as err
+
+KEYFRAMES = [(0, 'zoom', 1000), (0, 'focus', 5200), (0.05, 'IRC', 1, 'state'), (0.1, 'focus', 5000), (0.15, 'focus', 4800)]
+
+def test_play(makeBoard):
+    MCR, board = makeBoard()
+    report = TheiaMCR.LensSequence(KEYFRAMES).play(MCR)
+    assert report['result'] == err.ERR_OK
+    assert report['played'] == len(KEYFRAMES)
+    assert (MCR.focus.currentStep, MCR.zoom.currentStep) == (4800, 1000)
+
+def test_keyframe_exception_stops_track(makeBoard):
+    MCR, board = makeBoard(raiseErrors=True)
+    def fail(step):
+        raise RuntimeError('focus failure')
+    MCR.focus.moveAbs = fail
+    report = TheiaMCR.LensSequence(KEYFRAMES).play(MCR)
+    focus = [r for r in report['keyframes'] if r['motor'] == 'focus']
+    assert focus[0]['result'] == err.ERR_BAD_MOVE and not focus[0]['skipped']
+    assert all(r['skipped'] for r in focus[1:])
+    assert report['result'] == err.ERR_BAD_MOVE
+    assert report['skipped'] == 2
+    assert MCR.zoom.currentStep == 1000
+
+def test_keyframe_mcr_error(makeBoard):
+    MCR, board = makeBoard(raiseErrors=True)
+    report = TheiaMCR.LensSequence([(0, 'focus', 5200), (0.05, 'focus', -10, 'abs'), (0.1, 'focus', 5000)]).play(MCR)
+    results = [r['result'] for r in report['keyframes']]
+    assert results[:2] == [err.ERR_OK, err.ERR_RANGE]
+    assert report['keyframes'][2]['skipped']
+
+def test_keyframe_error_code_stops_track(makeBoard):
+    MCR, board = makeBoard()
+    report = TheiaMCR.LensSequence([(0, 'focus', 5200), (0.05, 'focus', -10, 'abs'), (0.1, 'focus', 5000)]).play(MCR)
+    results = [r['result'] for r in report['keyframes']]
+    assert results[:2] == [err.ERR_OK, err.ERR_RANGE]
+    assert report['keyframes'][2]['skipped']
+    assert MCR.focus.currentStep == 5200
@@ -0,0 +1,38 @@
+# MCRFleet: parallel initialization and commands of several simulated boards
+import pytest
+import TheiaMCR
+from TheiaMCR.mcrSimulator import resetSimulators
+from conftest import simPort
+
+@pytest.fixture
+def fleet():
+    ports = [simPort()[0] for _ in range(3)]
+    badPort = simPort('seed=1&timeScale=0.01&dropRate=1')[0]
+    fleet = TheiaMCR.MCRFleet({port: 'TL1250P N6' for port in ports + [badPort]}, maxWorkers=4)
+    yield fleet, ports, badPort
+    fleet.close()
+    resetSimulators()
+
+def test_open_and_health(fleet):
+    fleet, ports, badPort = fleet
+    results = fleet.open()
+    assert results == {**{port: True for port in ports}, badPort: False}
+    assert set(fleet.boards) == set(ports)
+    health = fleet.health()
+    assert (health['boards'], health['initialized'], health['communicating']) == (4, 3, 3)
+    assert health['failed'] == [badPort]
+    assert health['ports'][ports[0]]['motors'] == {'focus': True, 'zoom': True, 'iris': True, 'IRC': True}
+    assert health['ports'][badPort]['initialized'] is False
+
+def test_commands(fleet):
+    fleet, ports, badPort = fleet
+    fleet.open()
+    assert fleet.broadcast(lambda MCR: MCR.focus.moveAbs(6000)) == {port: 0 for port in ports}
+    assert all(fleet[port].focus.currentStep == 6000 for port in ports)
+    assert fleet.IRCState(2) == {port: 2 for port in ports}
+    assert fleet.homeAll(ports[:2]) == {port: 0 for port in ports[:2]}
+    assert fleet.broadcast(lambda MCR: 1 / 0, ports[:1])[ports[0]].__class__ is ZeroDivisionError
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        TheiaMCR.MCRFleet({simPort()[0]: 'unknown lens'})
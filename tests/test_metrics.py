@@ -0,0 +1,71 @@
+# serial command metrics: snapshot and Prometheus text
+import asyncio
+import re
+import TheiaMCR
+from TheiaMCR.mcrProtocol import BOARD_SN_FRAME
+from conftest import simPort
+
+def prometheusValues(text:str) -> dict[str, float]:
+    ''' {metric name with labels: value} of the sample lines '''
+    values = {}
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        name, value = line.rsplit(' ', 1)
+        values[name] = float(value)
+    return values
+
+def test_prometheus(makeBoard, dropResponses):
+    MCR, board = makeBoard()
+    MCR.focus.moveAbs(6000)
+    MCR.metrics.reset()
+    assert MCR.MCRBoard.readBoardSN() != ''
+    assert MCR.focus.moveRel(-200, correctForBL=False) == 0
+    dropResponses(board, 0x74)
+    assert MCR.focus.moveRel(-200, correctForBL=False) < 0
+
+    text = MCR.metrics.prometheus()
+    assert text.endswith('\n')
+    assert '# TYPE theiamcr_commands_total counter' in text
+    assert '# TYPE theiamcr_command_seconds histogram' in text
+    values = prometheusValues(text)
+    port = MCR.serialPortName
+    assert values[f'theiamcr_commands_total{{port="{port}",opcode="0x79",outcome="ok"}}'] == 1
+    assert values[f'theiamcr_commands_total{{port="{port}",opcode="0x62",outcome="ok"}}'] == 1
+    assert values[f'theiamcr_commands_total{{port="{port}",opcode="0x62",outcome="timeout"}}'] == 1
+    assert values[f'theiamcr_motor_commands_total{{port="{port}",motor="0x01",outcome="timeout"}}'] == 1
+    assert values[f'theiamcr_bytes_written_total{{port="{port}",opcode="0x79"}}'] == len(BOARD_SN_FRAME)
+
+    # cumulative histogram buckets, the +Inf bucket is the count
+    buckets = [(name, value) for name, value in values.items() if name.startswith('theiamcr_command_seconds_bucket') and 'opcode="0x62"' in name]
+    counts = [value for _, value in buckets]
+    assert counts == sorted(counts)
+    assert re.search(r'le="\+Inf"', buckets[-1][0])
+    assert counts[-1] == values[f'theiamcr_command_seconds_count{{port="{port}",opcode="0x62"}}'] == 2
+
+def test_snapshot(makeBoard):
+    MCR, board = makeBoard()
+    MCR.metrics.reset()
+    for _ in range(3):
+        MCR.zoom.readMotorSetup(refresh=True)
+    snapshot = MCR.metrics.snapshot()
+    assert snapshot['labels'] == {'port': MCR.serialPortName}
+    stats = snapshot['commands']['0x67']
+    assert stats['outcomes'] == {'ok': 3}
+    assert stats['wallTime']['count'] == stats['firstByte']['count'] == 3
+    assert snapshot['motors'] == {'0x02': {'ok': 3}}
+    assert [r['opcode'] for r in snapshot['recent']] == [0x67] * 3
+
+def test_async_metrics():
+    async def run():
+        async with TheiaMCR.AsyncMCRControl(simPort()[0]) as MCR:
+            assert await MCR.focusInit(8390, 7959)
+            MCR.metrics.reset()
+            assert await MCR.focus.moveRel(-100, correctForBL=False) == 0
+            assert await MCR.readBoardSN() != ''
+            return MCR.metrics.snapshot()
+    snapshot = asyncio.run(run())
+    assert snapshot['commands']['0x62']['outcomes'] == {'ok': 1}
+    assert snapshot['commands']['0x79']['outcomes'] == {'ok': 1}
+    assert snapshot['commands']['0x79']['firstByte']['count'] == 1
+    assert snapshot['motors'] == {'0x01': {'ok': 1}}
@@ -0,0 +1,36 @@
+# moveGroup: several motors moved at the same time
+import pytest
+
+@pytest.mark.parametrize('ioThread', [False, True])
+def test_move_group(makeBoard, ioThread):
+    MCR, board = makeBoard(ioThread=ioThread)
+    assert MCR.moveGroup({MCR.focus: 6000, MCR.zoom: 1000, MCR.iris: 40}) == 0
+    assert (MCR.focus.currentStep, MCR.zoom.currentStep, MCR.iris.currentStep) == (6000, 1000, 40)
+    assert abs(board.motors[1].lensPos - 6000) <= 20
+    assert abs(board.motors[2].lensPos - 1000) <= 20
+    assert MCR.focus.positionReferenced and MCR.zoom.positionReferenced
+
+@pytest.mark.parametrize('ioThread', [False, True])
+def test_dropped_reply(makeBoard, dropResponses, tmp_path, ioThread):
+    # a lost move response can't be attributed to one motor: all the group motors lose their PI reference
+    MCR, board = makeBoard(ioThread=ioThread, journal=str(tmp_path))
+    assert MCR.moveGroup({MCR.focus: 7800, MCR.zoom: 3000}) == 0
+    assert MCR.journal.entry(1) is not None and MCR.journal.entry(2) is not None
+
+    MCR.retryAttempts = 1
+    dropResponses(board, 0x74)
+    assert MCR.moveGroup({MCR.focus: 7700, MCR.zoom: 2900}) < 0
+    assert not MCR.focus.positionReferenced
+    assert not MCR.zoom.positionReferenced
+    assert MCR.journal.entry(1) is None and MCR.journal.entry(2) is None
+
+    # the next group move goes through the PI positions and references the motors again
+    assert MCR.moveGroup({MCR.focus: 7700, MCR.zoom: 2900}) == 0
+    assert MCR.focus.positionReferenced and MCR.zoom.positionReferenced
+    assert abs(board.motors[1].lensPos - 7700) <= 20
+    assert abs(board.motors[2].lensPos - 2900) <= 20
+
+def test_group_errors(makeBoard):
+    MCR, board = makeBoard()
+    assert MCR.moveGroup({MCR.focus: -1}) < 0
+    assert MCR.moveGroup({MCR.IRC: 1}) < 0
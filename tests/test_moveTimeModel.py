@@ -0,0 +1,27 @@
+# move time model: calibration from the completed moves and the move time prediction
+import time
+import TheiaMCR.errList as err
+
+def test_model_calibration(makeBoard):
+    # the simulated moves take a quarter of the nominal time (steps / speed)
+    MCR, board = makeBoard(options='seed=1&timeScale=0.25')
+    MCR.focus.moveAbs(5000)
+    model = MCR.focus.moveModel
+    model.reset()
+    for steps in (100, 400, -200, 600, -300, 500, -100, 200):
+        assert MCR.focus.moveRel(steps, correctForBL=False) == 0
+    assert model.calibrated
+    assert abs(model.scale - 0.25) < 0.05
+    assert model.rejected == 0
+
+    # the moveAbs time prediction includes all the moves and the rest times
+    predicted = MCR.focus.predictMoveTime(3000)
+    startTime = time.monotonic()
+    assert MCR.focus.moveAbs(3000) == 0
+    elapsed = (time.monotonic() - startTime) * 1000
+    assert abs(elapsed - predicted) < 0.5 * predicted
+
+def test_predict_range(makeBoard):
+    MCR, board = makeBoard()
+    assert MCR.focus.predictMoveTime(-1) == err.ERR_RANGE
+    assert MCR.IRC.predictMoveTime(0) == err.ERR_NOT_SUPPORTED
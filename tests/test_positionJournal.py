@@ -0,0 +1,62 @@
+# position journal: motor positions restored at the next initialization instead of homing
+import logging
+import pytest
+import TheiaMCR
+from TheiaMCR.mcrSimulator import simulatorBoard, resetSimulators
+from conftest import simPort
+
+@pytest.fixture
+def openBoard(tmp_path):
+    '''
+    Open the same simulated board again (the simulated lens keeps its position).
+    openBoard(pi=7959) -> (MCRControl, simBoard, focus motor moves during the initialization)
+    '''
+    port, name = simPort()
+    boards = []
+    def open(pi:int=7959):
+        for MCR in boards:
+            MCR.close()
+        MCR = TheiaMCR.MCRControl(port, logFiles=False, journal=str(tmp_path))
+        MCR.consoleLogHandler.setLevel(logging.CRITICAL)
+        boards.append(MCR)
+        board = simulatorBoard(name)
+        moves = board.motors[1].moveCount
+        assert MCR.focusInit(8390, pi)
+        return MCR, board, board.motors[1].moveCount - moves
+    yield open
+    for MCR in boards:
+        MCR.close()
+    resetSimulators()
+
+def test_restore(openBoard):
+    MCR, board, moves = openBoard()
+    assert moves > 0 and MCR.journal is not None
+    assert MCR.focus.moveAbs(5000) == 0
+    MCR, board, moves = openBoard()
+    assert moves == 0
+    assert MCR.focus.currentStep == 5000 and MCR.focus.positionReferenced
+    assert abs(board.motors[1].lensPos - 5000) <= 20
+    assert MCR.focus.moveRel(-100) == 0
+    assert MCR.journal.entry(1)['step'] == 4900
+
+def test_failed_move_invalidates(openBoard, dropResponses):
+    MCR, board, _ = openBoard()
+    assert MCR.focus.moveAbs(5000) == 0
+    dropResponses(board, 0x74)
+    assert MCR.focus.moveRel(-100, correctForBL=False) < 0
+    assert MCR.journal.entry(1) is None
+    MCR, board, moves = openBoard()
+    assert moves > 0
+
+def test_interrupted_move_not_restored(openBoard):
+    MCR, board, _ = openBoard()
+    assert MCR.focus.moveAbs(5000) == 0
+    MCR.focus._journalMoving()          # program stopped during a move
+    MCR, board, moves = openBoard()
+    assert moves > 0
+
+def test_changed_motor_parameters_not_restored(openBoard):
+    MCR, board, _ = openBoard()
+    assert MCR.focus.moveAbs(5000) == 0
+    MCR, board, moves = openBoard(pi=7900)
+    assert moves > 0
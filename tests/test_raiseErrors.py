@@ -0,0 +1,115 @@
+# raiseErrors mode: the decorated board and motor functions raise the errList exceptions
+import inspect
+import threading
+import pytest
+import TheiaMCR
+import TheiaMCR.errList as err
+from TheiaMCR.TheiaMCR import MCRControl
+from conftest import simPort
+
+# decorated function: (call, simulated responses dropped, expected exception)
+FAILURES = {
+    'MCRControl.focusInit': (lambda MCR: MCR.focusInit(8390, 7959), True, err.MCRError),
+    'MCRControl.zoomInit': (lambda MCR: MCR.zoomInit(3227, 3119), True, err.MCRError),
+    'MCRControl.irisInit': (lambda MCR: MCR.irisInit(75), True, err.MCRError),
+    'MCRControl.IRCInit': (lambda MCR: MCR.IRCInit(), True, err.MCRError),
+    'MCRControl.checkBoardCommunication': (lambda MCR: MCR.checkBoardCommunication(), True, err.MCRCommError),
+    'MCRControl.moveGroup': (lambda MCR: MCR.moveGroup({MCR.focus: 7700, MCR.zoom: 3000}), True, err.MCRMoveError),
+    'MCRControl.motor.home': (lambda MCR: MCR.focus.home(), True, err.MCRError),
+    'MCRControl.motor.moveAbs': (lambda MCR: MCR.focus.moveAbs(7700), True, err.MCRMoveError),
+    'MCRControl.motor.moveRel': (lambda MCR: MCR.focus.moveRel(-50), True, err.MCRMoveError),
+    'MCRControl.motor.state': (lambda MCR: MCR.IRC.state(2), True, err.MCRMoveError),
+    'MCRControl.motor.setRespectLimits': (lambda MCR: MCR.focus.setRespectLimits(False), True, err.MCRCommError),
+    'MCRControl.motor.setTrustedPosition': (lambda MCR: MCR.focus.setTrustedPosition(True, stepBudget=-1), False, err.MCRRangeError),
+    'MCRControl.motor.setMotorSpeed': (lambda MCR: MCR.focus.setMotorSpeed(99999), False, err.MCRRangeError),
+    'MCRControl.motor.setHomingSpeed': (lambda MCR: MCR.focus.setHomingSpeed(99999), False, err.MCRRangeError),
+    'MCRControl.motor.readMotorSetup': (lambda MCR: MCR.focus.readMotorSetup(refresh=True), True, err.MCRCommError),
+    'MCRControl.motor.writeMotorSetup': (lambda MCR: MCR.focus.writeMotorSetup(False, False, 8390, 100, 1500), True, err.MCRCommError),
+    'MCRControl.controllerClass.readFWRevision': (lambda MCR: MCR.MCRBoard.readFWRevision(), True, err.MCRError),
+    'MCRControl.controllerClass.readBoardSN': (lambda MCR: MCR.MCRBoard.readBoardSN(), True, err.MCRError),
+    'MCRControl.controllerClass.setCommunicationPath': (lambda MCR: MCR.MCRBoard.setCommunicationPath('CAN'), False, err.MCRError),
+}
+
+def decoratedFunctions() -> set[str]:
+    names = set()
+    for cls in (MCRControl, MCRControl.motor, MCRControl.controllerClass):
+        names.update(f.__qualname__ for f in vars(cls).values() if inspect.isfunction(f) and hasattr(f, '__wrapped__'))
+    return names
+
+def test_all_decorated_functions_tested():
+    assert decoratedFunctions() == set(FAILURES)
+
+@pytest.mark.parametrize('name', sorted(FAILURES))
+def test_failure_raises(makeBoard, name):
+    call, drop, exception = FAILURES[name]
+    MCR, board = makeBoard(raiseErrors=True)
+    MCR.focus.moveAbs(7800)
+    MCR.retryAttempts = 1
+    if drop:
+        board.setFaults(dropRate=1.0)
+    with pytest.raises(exception) as info:
+        call(MCR)
+    assert info.value.function == name
+    assert info.value.errNum < 0
+
+def test_success_returns_values(makeBoard):
+    MCR, board = makeBoard(raiseErrors=True)
+    assert MCR.checkBoardCommunication() is True
+    assert MCR.focus.moveAbs(6000) == 0
+    assert MCR.focus.moveRel(-100) == 0
+    assert MCR.moveGroup({MCR.focus: 5000, MCR.zoom: 1000}) == 0
+    assert MCR.IRC.state(2) == 2
+    assert MCR.focus.setRespectLimits(False) is False
+    assert MCR.focus.setRespectLimits(True) is True
+    assert MCR.iris.setRespectLimits(False) is None
+    assert MCR.focus.setTrustedPosition(False) == 0
+    assert MCR.focus.setMotorSpeed(1000) == 0
+    assert MCR.focus.setHomingSpeed(1000) == 0
+    assert MCR.focus.readMotorSetup(refresh=True)[0]
+    assert MCR.MCRBoard.readFWRevision().startswith('5.')
+    assert MCR.MCRBoard.readBoardSN() == '055-001234'
+    assert MCR.focus.home() == 0
+    assert MCR.errors.count() == 0
+
+def test_other_thread_errors_not_raised(makeBoard):
+    MCR, board = makeBoard(raiseErrors=True)
+    stop = threading.Event()
+    def saveErrors():
+        while not stop.is_set():
+            err.saveError(err.ERR_MOVE_TIMEOUT, err.MOD_MCR, err.errLine(), MCR.errors)
+    thread = threading.Thread(target=saveErrors)
+    thread.start()
+    try:
+        for i in range(20):
+            assert MCR.focus.moveRel(10 if i % 2 else -10, correctForBL=False) == 0
+    finally:
+        stop.set()
+        thread.join()
+    assert MCR.errors.count(err.ERR_MOVE_TIMEOUT) > 0
+
+def test_nested_call_raises_once(makeBoard):
+    # a failed call inside a decorated function is raised by the outer function
+    MCR, board = makeBoard(raiseErrors=True)
+    MCR.retryAttempts = 1
+    board.setFaults(dropRate=1.0)
+    with pytest.raises(err.MCRError) as info:
+        MCR.focusInit(8390, 7959)
+    assert info.value.function == 'MCRControl.focusInit'
+
+def test_init_failure_raises():
+    port, _ = simPort('dropRate=1')
+    with pytest.raises(err.MCRCommError):
+        TheiaMCR.MCRControl(port, logFiles=False, raiseErrors=True)
+
+def test_not_initialized_raises():
+    MCR = TheiaMCR.MCRControl(simPort()[0], logFiles=False, raiseErrors=True)
+    try:
+        with pytest.raises(err.MCRNotInitError):
+            MCR.focus.moveAbs(100)
+    finally:
+        MCR.close()
+
+def test_error_codes_without_raiseErrors(makeBoard):
+    MCR, board = makeBoard()
+    assert MCR.focus.setMotorSpeed(99999) == err.ERR_RANGE
+    assert MCR.MCRBoard.setCommunicationPath('CAN') is False
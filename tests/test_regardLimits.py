@@ -0,0 +1,31 @@
+# setRespectLimits: the PI limit flags are written with one motor setup command
+
+def test_single_write(makeBoard):
+    MCR, board = makeBoard()
+    motor = board.motors[1]
+    maxSteps, minSpeed, maxSpeed = motor.maxSteps, motor.minSpeed, motor.maxSpeed
+    commands = board.commandCount
+    assert MCR.focus.setRespectLimits(False) is False
+    assert board.commandCount == commands + 1
+    assert not motor.wideFarStop and not motor.teleNearStop
+    assert MCR.focus.setRespectLimits(True) is True
+    assert board.commandCount == commands + 2
+    assert motor.wideFarStop and not motor.teleNearStop
+    # the step and speed ranges are not changed
+    assert (motor.maxSteps, motor.minSpeed, motor.maxSpeed) == (maxSteps, minSpeed, maxSpeed)
+
+def test_setup_read_once(makeBoard):
+    # without the cached setup the motor setup is read from the board first
+    MCR, board = makeBoard()
+    MCR.zoom._motorSetup = None
+    commands = board.commandCount
+    assert MCR.zoom.setRespectLimits(False) is False
+    assert board.commandCount == commands + 2
+    assert MCR.zoom.setRespectLimits(True) is True
+    assert board.commandCount == commands + 3
+
+def test_no_limit_switch(makeBoard):
+    MCR, board = makeBoard()
+    commands = board.commandCount
+    assert MCR.iris.setRespectLimits(False) is None
+    assert board.commandCount == commands
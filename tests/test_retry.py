@@ -0,0 +1,58 @@
+# command retries and position re-sync after lost responses
+from TheiaMCR.TheiaMCR import RESPONSE_READ_TIME
+
+def test_retry_idempotent_command(makeBoard, dropResponses):
+    MCR, board = makeBoard()
+    dropResponses(board, 0x67, 2)
+    assert MCR.focus.readMotorSetup(refresh=True)[0]
+    assert board.droppedResponses == 2
+    assert MCR.metrics.snapshot()['commands']['0x67']['retries'] == 2
+
+def test_retry_attempts(makeBoard):
+    MCR, board = makeBoard()
+    MCR.retryAttempts = 2
+    board.setFaults(dropRate=1.0)
+    assert not MCR.focus.readMotorSetup(refresh=True)[0]
+    assert MCR.metrics.snapshot()['commands']['0x67']['retries'] == 1
+    board.setFaults(dropRate=0.0)
+    assert MCR.focus.readMotorSetup(refresh=True)[0]
+    assert MCR.boardCommunicationState
+
+def test_relative_move_not_retried(makeBoard, dropResponses):
+    # a relative move without response may have been done: it isn't sent again and the position needs a re-sync
+    MCR, board = makeBoard()
+    MCR.focus.moveAbs(5000)
+    assert not MCR.focus.positionResync
+    moves = board.motors[1].moveCount
+    dropResponses(board, 0x74)
+    assert MCR.focus.moveRel(-100, correctForBL=False) < 0
+    assert board.motors[1].moveCount == moves + 1
+    assert MCR.focus.positionResync
+    assert not MCR.focus.positionReferenced
+    assert MCR.metrics.snapshot()['resyncs'] == {'0x01': 1}
+
+    # moveAbs moves through the PI and clears the re-sync flag
+    assert MCR.focus.moveAbs(5000) == 0
+    assert not MCR.focus.positionResync
+    assert MCR.focus.positionReferenced
+    assert abs(board.motors[1].lensPos - 5000) <= 20
+
+def test_retried_move_not_timed(makeBoard, dropResponses):
+    # the move time model only observes moves that succeeded on the first attempt
+    MCR, board = makeBoard()
+    MCR.focus.moveAbs(7800)
+    observed = []
+    observe = MCR.focus.moveModel.observe
+    MCR.focus.moveModel.observe = lambda steps, speed, elapsed: observed.append(elapsed) or observe(steps, speed, elapsed)
+    dropResponses(board, 0x74)
+    assert MCR.focus.moveAbs(7700) == 0
+    assert MCR.metrics.snapshot()['commands']['0x73']['retries'] == 1
+    assert all(elapsed < RESPONSE_READ_TIME for elapsed in observed)
+
+def test_port_loss(makeBoard):
+    # the serial port is reopened before the retry
+    MCR, board = makeBoard()
+    restarts = MCR.boardCommunicationRestarts
+    board.losePort()
+    assert MCR.focus.readMotorSetup(refresh=True)[0]
+    assert MCR.boardCommunicationRestarts == restarts + 1
@@ -0,0 +1,103 @@
+# rotatingLogFiles: background writer thread and file rotation
+import importlib
+import logging
+import time
+import pytest
+import TheiaMCR
+from conftest import simPort
+
+rotLogFiles = importlib.import_module('TheiaMCR.rotatingLogFiles')     # the package exports the class with the module name
+
+@pytest.fixture
+def logger(tmp_path, monkeypatch):
+    # log files in the temporary folder (~/.local/share/TheiaMCR/log)
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path))
+    logger = logging.getLogger(f'TheiaMCR.test.{tmp_path.name}')
+    logger.propagate = False
+    return logger
+
+def readLog(handler) -> str:
+    with open(handler.filenames[handler.currentLogFileNum]) as f:
+        return f.read()
+
+def test_background_flush(logger):
+    handler = rotLogFiles.rotatingLogFiles(logger, 'background', background=True, flushInterval=0.05)
+    try:
+        for i in range(100):
+            logger.info(f'record {i}')
+        handler.flush()
+        assert readLog(handler).count(',record ') == 100
+        # the file is flushed by the writer thread when the queue is empty
+        logger.info('idle record')
+        time.sleep(0.3)
+        assert 'idle record' in readLog(handler)
+    finally:
+        handler.close()
+
+def test_close_writes_queued_records(logger):
+    handler = rotLogFiles.rotatingLogFiles(logger, 'close', background=True)
+    for i in range(10):
+        logger.info(f'record {i}')
+    handler.close()
+    assert handler.fileHandle is None
+    assert readLog(handler).count(',record ') == 10
+
+def test_close_timeout_leaves_file_to_writer(logger, monkeypatch):
+    # the file isn't closed while the writer thread is still writing, the writer closes it when it is done
+    monkeypatch.setattr(rotLogFiles, 'LOG_CLOSE_TIMEOUT', 0.05)
+    handler = rotLogFiles.rotatingLogFiles(logger, 'slow', background=True)
+    write = handler._write
+    def slowWrite(messages):
+        time.sleep(0.3)
+        write(messages)
+    handler._write = slowWrite
+    logger.info('slow record')
+    handler.close()
+    assert handler.fileHandle is not None
+    time.sleep(0.6)
+    assert handler.fileHandle is None
+    assert 'slow record' in readLog(handler)
+
+@pytest.mark.parametrize('backgroundLog', [False, True])
+def test_board_log_files(logger, backgroundLog):
+    # MCRControl writes the log file records when they are logged unless backgroundLog is set
+    MCR = TheiaMCR.MCRControl(simPort()[0], backgroundLog=backgroundLog)
+    try:
+        MCR.consoleLogHandler.setLevel(logging.CRITICAL)
+        assert (MCR.fileLogHandler._writer is not None) == backgroundLog
+    finally:
+        MCR.close()
+
+def test_rotation_max_bytes(logger):
+    handler = rotLogFiles.rotatingLogFiles(logger, 'bytes', maxLines=0, maxBytes=2000)
+    for i in range(100):
+        logger.info(f'record {i:03d}')
+    assert handler.currentLogFileBytes < 2000
+    handler.close()
+    for filename in handler.filenames:
+        with open(filename, 'rb') as f:
+            assert 0 < len(f.read()) <= 2000 + 100     # the record that reaches the limit is the last record
+    assert 'record 099' in readLog(handler)
+
+def test_rotation_max_lines(logger):
+    handler = rotLogFiles.rotatingLogFiles(logger, 'lines', maxLines=20)
+    logger.info('first\nrecord')         # a multi-line record counts each line
+    for i in range(30):
+        logger.info(f'record {i:03d}')
+    handler.close()
+    for filename in handler.filenames:
+        with open(filename) as f:
+            assert len(f.read().splitlines()) <= 20
+
+def test_existing_file_lines_counted(logger):
+    handler = rotLogFiles.rotatingLogFiles(logger, 'existing', maxLines=50)
+    for i in range(10):
+        logger.info(f'record {i}')
+    handler.close()
+    handler = rotLogFiles.rotatingLogFiles(logger, 'existing', maxLines=50)
+    try:
+        assert handler.currentLogFileNum == 0
+        assert handler.currentLogFileLine == 12         # two startup lines and the records
+    finally:
+        handler.close()
@@ -0,0 +1,17 @@
+# simulated MCR600 board (mcrsim:// ports)
+import subprocess
+import sys
+
+def test_package_import_keeps_url_handlers():
+    # the simulator URL handler is registered when the simulator is imported, not by importing the package
+    code = ('import serial, TheiaMCR; assert "TheiaMCR" not in serial.protocol_handler_packages; '
+        'import TheiaMCR.mcrSimulator; assert "TheiaMCR" in serial.protocol_handler_packages')
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+def test_lens_position(makeBoard):
+    MCR, board = makeBoard()
+    assert MCR.focus.moveAbs(5000) == 0
+    assert abs(board.motors[1].lensPos - 5000) <= 20
+    assert MCR.zoom.moveAbs(1000) == 0
+    assert abs(board.motors[2].lensPos - 1000) <= 20
+    assert board.commandCount > 0 and board.droppedResponses == 0
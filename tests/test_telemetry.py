@@ -0,0 +1,50 @@
+# command telemetry: records written by the boards and read back by the telemetry analyzer
+import asyncio
+import pytest
+import TheiaMCR
+from conftest import simPort
+np = pytest.importorskip('numpy')
+from TheiaMCR import telemetryAnalyzer
+
+def test_round_trip(makeBoard, tmp_path):
+    MCR, board = makeBoard(telemetry=str(tmp_path))
+    assert MCR.focus.home() == 0
+    assert MCR.focus.moveAbs(5000) == 0
+    assert MCR.focus.moveRel(-200, correctForBL=False) == 0
+    assert MCR.zoom.moveAbs(1000) == 0
+    MCR.telemetry.flush()
+    records = telemetryAnalyzer.loadTelemetry(telemetryAnalyzer.telemetryFiles([str(tmp_path)]))
+    assert records.size == MCR.telemetry.records
+    report = telemetryAnalyzer.analyze(records)
+    focus = report['motors']['focus']
+    assert focus['homings'] >= 1
+    assert focus['failed'] == 0 and focus['noResponse'] == 0
+    assert focus['travel'] > 0
+    assert not np.isnan(focus['predictionError']['p50'])
+    assert report['motors']['zoom']['travel'] > 0
+    assert '0x63' in report['other']
+
+def test_no_response_recorded(makeBoard, dropResponses, tmp_path):
+    MCR, board = makeBoard(telemetry=str(tmp_path))
+    MCR.focus.moveAbs(5000)
+    dropResponses(board, 0x74)
+    assert MCR.focus.moveRel(-100, correctForBL=False) < 0
+    MCR.telemetry.flush()
+    report = telemetryAnalyzer.analyze(telemetryAnalyzer.loadTelemetry(telemetryAnalyzer.telemetryFiles([str(tmp_path)])))
+    assert report['motors']['focus']['noResponse'] == 1
+
+def test_async_round_trip(tmp_path):
+    async def run():
+        async with TheiaMCR.AsyncMCRControl(simPort()[0], telemetry=str(tmp_path)) as MCR:
+            assert MCR.telemetry is not None
+            assert await MCR.focusInit(8390, 7959)
+            assert await MCR.focus.moveAbs(5000) == 0
+            assert await MCR.focus.moveRel(-100) == 0
+        return MCR.telemetry
+    assert asyncio.run(run()) is None
+    report = telemetryAnalyzer.analyze(telemetryAnalyzer.loadTelemetry(telemetryAnalyzer.telemetryFiles([str(tmp_path)])))
+    focus = report['motors']['focus']
+    assert focus['moves'] >= 2 and focus['failed'] == 0
+    assert focus['travel'] > 0
+    assert not np.isnan(focus['predictionError']['p50'])
+    assert report['other']
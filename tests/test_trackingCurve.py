@@ -0,0 +1,42 @@
+# tracking curves: focus interpolation and zoom ramps on the simulated board
+import math
+import pytest
+np = pytest.importorskip('numpy')
+import TheiaMCR.trackingCurve as tc
+
+ZOOM = [0, 1000, 2000]
+FOCUS = [[5000, 5400, 5200], [4000, 4300, 4100]]         # 1 m, infinity
+
+def test_focus_interpolation():
+    curve = tc.TrackingCurve(ZOOM, [1.0, math.inf], FOCUS, 'test lens')
+    assert curve.focusAt(500, math.inf) == 4150
+    assert curve.focusAt(500, 1.0) == 5200
+    assert curve.focusAt(500, 2.0) == 4675                     # linear in 1/distance
+    assert curve.focusAt(-100, math.inf) == 4000                # limited to the curve points
+    assert curve.focusAt(3000, 0.5) == 5200
+    assert curve.focusAt(np.array([0, 1500, 2000]), math.inf).tolist() == [4000, 4200, 4100]
+
+def test_curve_file(tmp_path):
+    filename = str(tmp_path / 'lens.json')
+    tc.TrackingCurve(ZOOM, [math.inf, 1.0], FOCUS[::-1], 'file lens').save(filename)
+    curve = tc.loadCurve('file lens', filename)
+    assert tc.loadCurve('file lens') is curve
+    assert curve.focusAt(1500, 1.0) == 5300
+    with pytest.raises(ValueError):
+        tc.TrackingCurve([0], [1.0], [[5000]])
+
+def test_follow_reversal(makeBoard, monkeypatch):
+    # the focus moves away from the PI then back towards it: the move reversing the direction is backlash corrected
+    MCR, board = makeBoard()
+    curve = tc.TrackingCurve(ZOOM, [1.0], [[5000, 4600, 5000]])
+    MCR.zoom.moveAbs(0)
+    MCR.focus.moveAbs(5000)
+    moves = []
+    moveRel = MCR.focus.moveRel
+    monkeypatch.setattr(MCR.focus, 'moveRel', lambda steps, correctForBL=True: moves.append((steps, correctForBL)) or moveRel(steps, correctForBL))
+    assert curve.follow(MCR, 2000, 1.0, stepSize=200) == 0
+    corrected = [i for i, (_, correctForBL) in enumerate(moves) if correctForBL]
+    first = next(i for i, (steps, _) in enumerate(moves) if steps > 0)
+    assert corrected == [first, len(moves) - 1]
+    assert (MCR.zoom.currentStep, MCR.focus.currentStep) == (2000, 5000)
+    assert abs(board.motors[1].lensPos - 5000) <= 20
@@ -0,0 +1,52 @@
+# trusted position mode: direct moveAbs moves until the step or move budget is used
+import pytest
+
+@pytest.fixture
+def referencedMoves(monkeypatch):
+    ''' count the moves through the PI (firmware 0x73 move) of a motor '''
+    def count(motor) -> list:
+        moves = []
+        moveTo = motor._motorMoveTo
+        monkeypatch.setattr(motor, '_motorMoveTo', lambda *args, **kwargs: moves.append(args) or moveTo(*args, **kwargs))
+        return moves
+    return count
+
+def test_move_budget(makeBoard, referencedMoves):
+    MCR, board = makeBoard()
+    assert MCR.focus.moveAbs(5000) == 0
+    referenced = referencedMoves(MCR.focus)
+    assert MCR.focus.setTrustedPosition(True, stepBudget=10000, moveBudget=3) == 0
+    for step in (5200, 4900, 5300):
+        assert MCR.focus.moveAbs(step) == 0
+        assert abs(board.motors[1].lensPos - step) <= 20
+    assert referenced == []
+    assert MCR.focus.movesSinceHome == 3
+
+    # the budget is used: the next move is referenced at the PI and resets the budget
+    assert MCR.focus.moveAbs(5000) == 0
+    assert len(referenced) == 1
+    assert MCR.focus.movesSinceHome == 0
+    assert abs(board.motors[1].lensPos - 5000) <= 20
+
+def test_step_budget(makeBoard, referencedMoves):
+    MCR, board = makeBoard()
+    assert MCR.focus.moveAbs(5000) == 0
+    referenced = referencedMoves(MCR.focus)
+    assert MCR.focus.setTrustedPosition(True, stepBudget=500, moveBudget=100) == 0
+    assert MCR.focus.moveAbs(4800) == 0
+    assert referenced == []
+    assert MCR.focus.moveAbs(5200) == 0
+    assert len(referenced) == 1
+    assert MCR.focus.stepsSinceHome == 0
+
+def test_failed_move_not_trusted(makeBoard, referencedMoves, dropResponses):
+    MCR, board = makeBoard()
+    assert MCR.focus.moveAbs(5000) == 0
+    referenced = referencedMoves(MCR.focus)
+    MCR.focus.setTrustedPosition(True)
+    dropResponses(board, 0x74)
+    assert MCR.focus.moveAbs(4800) < 0
+    assert not MCR.focus.positionReferenced
+    assert MCR.focus.moveAbs(4800) == 0
+    assert len(referenced) == 1
+    assert abs(board.motors[1].lensPos - 4800) <= 20